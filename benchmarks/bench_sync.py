@@ -0,0 +1,201 @@
+"""
+同步吞吐量压测: 本地 Tushare 替身服务 + 全量/增量同步
+
+在项目根目录执行:
+    # 写入 MySQL（application.ini 中的配置）
+    python -m benchmarks.bench_sync --start 20230101 --mid 20230630 --end 20231231
+    # 写入 SQLite, 不需要 MySQL
+    python -m benchmarks.bench_sync --db sqlite --latency 0.02 --quota 500/min
+
+启动 utils/tushare_replay.StandInServer 并把本进程的 Tushare 接口地址指向它，响应优先取 --cassette-dir 中
+录制的数据，未录制的查询按请求参数生成确定性的模拟数据（--codes 只股票），因此每次压测的数据量相同。
+每张表先全量同步 [start, mid]，再增量同步到 end，写入临时表 <table>__bench，
+输出每个阶段写入的记录数、rows/sec、calls/sec 和配额错误次数，测试完成后删除临时表；
+同步出错或有日期抓取失败的阶段标记为 FAILED，不输出吞吐量，全部表测试完成后以非 0 状态退出。
+按 ts_code 抓取的表（fina_indicator）使用模拟数据的股票池，历史条数记录写入临时目录，不影响本地的记录。
+
+默认忽略表的 interval/quota 限流，测量同步程序本身的吞吐；--keep-limits 保留限流配置。
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+from utils.checkpoint import CheckpointJournal
+from utils.shadow_load import _parse_create_table
+from utils.tushare_replay import StandInServer, CassetteStore, set_http_url, normalize_fields, normalize_params
+from utils.ts_code_planner import RowCountHistory
+from utils.tushare_sync import TushareSync
+from utils.universe import StockUniverse
+
+BENCH_SUFFIX = "__bench"
+SYNC_TABLES = ["daily", "stk_factor_pro", "fina_indicator"]
+_QUARTER_ENDS = ("0331", "0630", "0930", "1231")
+
+
+def table_columns(table_sql, table_name):
+    """
+    建表脚本中的字段名列表
+    """
+    _, definitions, _ = _parse_create_table(table_sql, table_name)
+    return [d.split("`")[1] for d in definitions if d.startswith("`")]
+
+
+class SyntheticTushare:
+    """
+    按请求参数生成确定性的模拟数据, 作为替身服务的 responder
+    """
+    def __init__(self, codes):
+        self.codes = [f"{i:06d}.SZ" for i in range(codes)]
+
+    def __call__(self, api_name, params, fields):
+        params = normalize_params(params, drop_page=True)
+        return self._generate(api_name, tuple(params.items()), normalize_fields(fields))
+
+    @lru_cache(maxsize=64)
+    def _generate(self, api_name, params, fields):
+        params = dict(params)
+        columns = [name for name in fields.split(",") if name] or ["ts_code"]
+        if api_name == "stock_basic":
+            keys = {"ts_code": self.codes, "exchange": ["SZSE"] * len(self.codes), "market": ["主板"] * len(self.codes),
+                    "list_status": ["L"] * len(self.codes), "list_date": ["19900101"] * len(self.codes),
+                    "delist_date": [None] * len(self.codes)}
+        elif "start_date" in params:
+            # 按 ts_code 和公告日期区间查询的财务类接口, 每个报告期一条
+            codes = params.get("ts_code", "").split(",") if params.get("ts_code") else self.codes
+            periods = [f"{year}{md}" for year in range(int(params["start_date"][:4]), int(params["end_date"][:4]) + 1)
+                       for md in _QUARTER_ENDS if params["start_date"] <= f"{year}{md}" <= params["end_date"]]
+            keys = {"ts_code": [c for c in codes for _ in periods],
+                    "ann_date": periods * len(codes),
+                    "end_date": periods * len(codes)}
+        else:
+            # 按日期查询的行情类接口, 周末没有数据
+            date = params.get("trade_date", "")
+            if not date or datetime.datetime.strptime(date, "%Y%m%d").weekday() >= 5:
+                return pd.DataFrame(columns=columns)
+            keys = {"ts_code": self.codes, "trade_date": [date] * len(self.codes)}
+
+        rows = len(keys["ts_code"])
+        rng = np.random.default_rng(zlib.crc32(f"{api_name}{params}".encode("utf-8")))
+        return pd.DataFrame({name: keys[name] if name in keys else rng.uniform(1, 100, rows).round(2)
+                             for name in columns})
+
+
+def prepare_sync(table, args, work_dir):
+    """
+    创建写入 <table>__bench 的 TushareSync 对象
+    """
+    sync = TushareSync(table)
+    bench_table = f"{table}{BENCH_SUFFIX}"
+    table_sql = sync._read_table_sql().replace(f"`{table}`", f"`{bench_table}`")
+    sync.table_name = bench_table
+    sync._journal = CheckpointJournal(os.path.join(work_dir, "bench_checkpoint.db"))
+    if sync.iteration == TushareSync.ITERATION_TS_CODE:
+        codes = SyntheticTushare(args.codes).codes
+        sync._universe = StockUniverse(pd.DataFrame({"ts_code": codes, "list_date": ["19900101"] * len(codes)}))
+        sync._row_count_history = RowCountHistory(os.path.join(work_dir, "bench_rows.db"))
+    # 替身服务非交易日返回空数据, 不依赖本地 trade_cal 表
+    sync.trade_days_only = False
+    if not args.keep_limits:
+        sync.interval, sync.quota = 0, ""
+
+    if args.db == "sqlite":
+        # SQLite 不支持 MySQL 建表语句, 只按字段名建表
+        columns = ", ".join(f'"{name}"' for name in table_columns(table_sql, bench_table))
+        sync._sqlalchemy_db_engine = sqlalchemy.create_engine(f"sqlite:///{os.path.join(work_dir, 'bench.db')}",
+                                                             future=True)
+        sync.write_mode = "to_sql"
+        # exec_sql 返回的结果在连接关闭后读取, SQLite 不支持
+        sync._fetch_one_from_db = lambda sql: sync._fetch_all_from_db(sql)[0][0]
+        sync._table_exist = lambda table_name="": sync._fetch_one_from_db(
+            f"SELECT COUNT(1) FROM sqlite_master WHERE type='table' AND name='{table_name or bench_table}'") > 0
+        sync.create_table = lambda drop_exist=True: sync.exec_sql(
+            f"DROP TABLE IF EXISTS {bench_table}; CREATE TABLE {bench_table} ({columns})")
+        sync.ensure_partitions = lambda: None
+    else:
+        sync._read_table_sql = lambda: table_sql
+        sync.create_table = lambda drop_exist=True: sync.exec_sql(table_sql)
+    return sync
+
+
+def sync_failure(sync):
+    """
+    同步阶段的失败原因, 成功时为空
+    """
+    if sync._sync_error is not None:
+        return str(sync._sync_error)
+    if sync._failed_dates:
+        return f"抓取失败 {sorted(sync._failed_dates)[:5]}"
+    return ""
+
+
+def measure(server, sync, func):
+    """
+    执行 func, 返回 (耗时, 调用次数, 写入记录数, 配额错误次数, 失败原因)
+    写入记录数为 func 返回的同步记录数, 而不是替身服务返回的记录数
+    """
+    calls, errors = server.calls, server.quota_errors
+    start = time.perf_counter()
+    rows = func()
+    elapsed = time.perf_counter() - start
+    return elapsed, server.calls - calls, rows or 0, server.quota_errors - errors, sync_failure(sync)
+
+
+def bench_sync_table(table, args, server, work_dir):
+    sync = prepare_sync(table, args, work_dir)
+    sync._BEGIN_DATE = args.start
+
+    def run(end_date, func):
+        sync.today = lambda without_dash=True: end_date
+        return func()
+
+    results = [("full", measure(server, sync, lambda: run(args.mid, sync.full_sync))),
+               ("incremental", measure(server, sync, lambda: run(args.end, sync.incremental_sync)))]
+    sync.exec_sql(f"DROP TABLE IF EXISTS {sync.table_name}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='同步吞吐量压测')
+    parser.add_argument('--db', type=str, default="mysql", choices=["mysql", "sqlite"], help='写入的数据库')
+    parser.add_argument('--tables', type=str, default=",".join(SYNC_TABLES), help='参与测试的表, 逗号分隔')
+    parser.add_argument('--start', type=str, default="20230101", help='全量同步开始日期')
+    parser.add_argument('--mid', type=str, default="20230331", help='全量同步结束日期, 增量同步从该日期开始')
+    parser.add_argument('--end', type=str, default="20230430", help='增量同步结束日期')
+    parser.add_argument('--codes', type=int, default=5000, help='模拟数据的股票数量')
+    parser.add_argument('--latency', type=float, default=0.0, help='替身服务每次请求的响应延迟(秒)')
+    parser.add_argument('--quota', type=str, default="", help='替身服务模拟的接口配额, 如 500/min, 超出时返回配额错误')
+    parser.add_argument('--cassette-dir', type=str, default="", help='优先回放的 cassette 目录')
+    parser.add_argument('--keep-limits', action='store_true', help='保留表的 interval/quota 限流配置')
+    args = parser.parse_args()
+
+    store = CassetteStore(args.cassette_dir) if args.cassette_dir else None
+    server = StandInServer(store, SyntheticTushare(args.codes), latency=args.latency, quota=args.quota).start()
+    set_http_url(server.url)
+    failed = False
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for table in args.tables.split(","):
+                results = bench_sync_table(table, args, server, work_dir)
+                for phase, (elapsed, calls, rows, errors, failure) in results:
+                    if failure:
+                        failed = True
+                        print(f"{table:<16} {phase:<12} FAILED: {failure}")
+                        continue
+                    elapsed = max(elapsed, 1e-9)
+                    print(f"{table:<16} {phase:<12} {rows} rows, {calls} calls, {elapsed:.2f}s, "
+                          f"{rows / elapsed:,.0f} rows/sec, {calls / elapsed:,.1f} calls/sec, {errors} quota errors")
+    finally:
+        set_http_url(None)
+        server.stop()
+    if failed:
+        sys.exit(1)
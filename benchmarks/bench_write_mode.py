@@ -0,0 +1,74 @@
+"""
+写库方式性能对比: to_sql vs load_data
+
+在项目根目录执行（需要 application.ini 中的 MySQL 配置）:
+    python -m benchmarks.bench_write_mode --rows 200000 --page 10000
+
+以 daily 表结构创建临时表 daily__bench，用随机生成的日线数据分别测试每种写库方式，
+输出每种方式的 rows/sec，测试完成后删除临时表
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.tushare_sync import TushareSync
+from utils.writers import WRITE_MODES, get_writer
+
+BENCH_TABLE = "daily__bench"
+
+
+def make_daily_data(rows):
+    """
+    生成 rows 条 daily 格式的随机数据, (ts_code, trade_date) 唯一
+    """
+    rng = np.random.default_rng(0)
+    codes = np.array([f"{i:06d}.SZ" for i in range(5000)])
+    close = rng.uniform(1, 100, rows).round(2)
+    return pd.DataFrame({
+        "ts_code": codes[np.arange(rows) % codes.size],
+        "trade_date": 20100101 + np.arange(rows) // codes.size,
+        "open": close,
+        "high": close,
+        "low": close,
+        "close": close,
+        "pre_close": close,
+        "change": 0.0,
+        "pct_chg": 0.0,
+        "vol": rng.uniform(0, 1e6, rows).round(2),
+        "amount": rng.uniform(0, 1e7, rows).round(3),
+    })
+
+
+def bench(sync, write_mode, data, page):
+    """
+    按 page 分页写入 data, 返回 rows/sec
+    """
+    engine = sync.get_db_engine()
+    table_sql = sync._read_table_sql().replace("`daily`", f"`{BENCH_TABLE}`")
+    sync.exec_sql(table_sql)
+
+    writer = get_writer(write_mode)
+    start = time.perf_counter()
+    for offset in range(0, len(data), page):
+        writer.write(engine, BENCH_TABLE, data.iloc[offset:offset + page], page, sync.get_logger())
+    elapsed = time.perf_counter() - start
+
+    sync.exec_sql(f"DROP TABLE IF EXISTS `{BENCH_TABLE}`")
+    return len(data) / elapsed if elapsed > 0 else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='写库方式性能对比')
+    parser.add_argument('--rows', type=int, default=100000, help='测试数据条数')
+    parser.add_argument('--page', type=int, default=10000, help='每页写入条数, 对应 limit')
+    parser.add_argument('--modes', type=str, default=",".join(WRITE_MODES.keys()), help='参与测试的写库方式, 逗号分隔')
+    args = parser.parse_args()
+
+    sync = TushareSync("daily")
+    data = make_daily_data(args.rows)
+    for mode in args.modes.split(","):
+        rate = bench(sync, mode, data, args.page)
+        print(f"{mode:<10} {args.rows} rows, {rate:,.0f} rows/sec")
@@ -4,6 +4,8 @@
 """
 
 import argparse
+import datetime
+import os
 
 from tables.bak_basic import bak_basic
 from tables.bak_daily import bak_daily
@@ -34,66 +36,176 @@ from tables.top_inst import top_inst
 from tables.top_list import top_list
 from tables.trade_cal import trade_cal
 from tables.weekly import weekly
+from utils.metrics import PROFILERS, profile, set_output_path, write_report
+from utils.orchestrator import SyncTask, run_tasks, configure_concurrency
+from utils.tushare_sync import TushareSync
+from utils.utils import get_cfg, get_logger
+
+
+# 基础表, 其余表依赖其数据（ts_code 列表、交易日历）
+BASIC = ['stock_basic']
+CALENDAR = ['trade_cal']
+
+# 常规表同步任务, 注释掉的表不同步
+NORMAL_TASKS = [
+    # SyncTask('stock_basic', stock_basic.sync),  # 沪深股票-基础信息-股票列表
+    # SyncTask('trade_cal', trade_cal.sync),  # 沪深股票-基础信息-交易日历
+    SyncTask('name_change', name_change.sync),  # 沪深股票-基础信息-股票曾用名
+    SyncTask('hs_const', hs_const.sync),  # 沪深股票-基础信息-沪深股通成份股
+    # SyncTask('stk_rewards', stk_rewards.sync, BASIC),  # 沪深股票-基础信息-管理层薪酬和持股
+    # SyncTask('daily', daily.sync, CALENDAR),  # 沪深股票-行情数据-A股日线行情
+    # SyncTask('weekly', weekly.sync, CALENDAR + ['daily']),  # 沪深股票-行情数据-A股周线行情 (由 daily 合成)
+    # SyncTask('monthly', monthly.sync, CALENDAR + ['daily']),  # 沪深股票-行情数据-A股月线行情 (由 daily 合成)
+    # SyncTask('money_flow', money_flow.sync, CALENDAR),  # 沪深股票-行情数据-个股资金流向
+    SyncTask('stk_limit', stk_limit.sync, CALENDAR),  # 沪深股票-行情数据-每日涨跌停价格
+    # SyncTask('money_flow_hsgt', money_flow_hsgt.sync, CALENDAR),  # 沪深股票-行情数据-沪深港通资金流向
+    # SyncTask('hsgt_top10', hsgt_top10.sync, CALENDAR),  # 沪深股票-行情数据-沪深股通十大成交股
+    # SyncTask('ggt_top10', ggt_top10.sync, CALENDAR),  # 沪深股票-行情数据-港股通十大成交股
+    # SyncTask('ggt_daily', ggt_daily.sync, CALENDAR),  # 沪深股票-行情数据-港股通每日成交统计
+    # SyncTask('forecast', forecast.sync),  # 沪深股票-财务数据-业绩预告
+    # SyncTask('express', express.sync),  # 沪深股票-财务数据-业绩快报
+    # SyncTask('fina_indicator', fina_indicator.sync, BASIC),  # 沪深股票-财务数据-财务指标数据
+    # SyncTask('fina_mainbz', fina_mainbz.sync, BASIC),  # 沪深股票-财务数据-主营业务构成
+    # SyncTask('disclosure_date', disclosure_date.sync),  # 沪深股票-财务数据-财报披露计划
+    # SyncTask('margin_detail', margin_detail.sync, CALENDAR),  # 沪深股票-市场参考数据-融资融券交易明细
+    # SyncTask('top_list', top_list.sync, CALENDAR),  # 沪深股票-市场参考数据-龙虎榜每日明细
+    # SyncTask('top_inst', top_inst.sync, CALENDAR),  # 沪深股票-市场参考数据-龙虎榜机构明细
+    # SyncTask('stk_holder_number', stk_holder_number.sync),  # 沪深股票-市场参考数据-股东人数
+]
+
+# 特殊表同步任务
+SPECIAL_TASKS = [
+    SyncTask('bak_basic', bak_basic.sync, CALENDAR),  # 沪深股票-基础信息-备用列表 （读取限制,每分钟调用2次, 每天最多访问该接口20次）
+    SyncTask('concept', concept.sync),  # 沪深股票-市场参考数据-概念股分类（已经停止维护）
+    SyncTask('concept_detail', concept_detail.sync, BASIC),  # 沪深股票-市场参考数据-概念股列表 （已经停止维护）
+    SyncTask('cyq_perf', cyq_perf.sync, CALENDAR),  # 沪深股票-特色数据-每日筹码及胜率（受限:5/min,10/h)
+    SyncTask('cyq_chips', cyq_chips.sync, CALENDAR),  # 沪深股票-特色数据-每日筹码分布 (受限:5/min,10/h)
+    SyncTask('bak_daily', bak_daily.sync, CALENDAR),  # 沪深股票-行情数据-备用行情
+]
+
+
+def with_profile(task, profiler, prefix):
+    """
+    在执行任务的线程中进行性能剖析, 每张表一个结果文件
+    """
+    suffix = 'prof' if profiler == 'cprofile' else 'html'
+    profile_file = f"{prefix}-{task.name}.{suffix}"
+
+    def func(drop_exist):
+        with profile(profiler, profile_file):
+            task.func(drop_exist)
+
+    return SyncTask(task.name, func, task.depends)
+
+
+def with_repair(task):
+    """
+    修复模式: 不同步新数据, 只重新抓取表中间缺失或记录偏少的单元, 见 TushareSync.repair
+    由本地数据生成的表（周线、月线、复权行情、本地技术因子）在来源表修复后一并更新
+    """
+    def func(drop_exist):
+        TushareSync(task.name).repair()
+
+    return SyncTask(task.name, func, task.depends)
+
+
+def run(tasks, drop_exist, workers, profiler=None):
+    cfg = get_cfg()
+    logger = get_logger('data_syn', cfg['logging']['filename'])
+    tushare, mysql = configure_concurrency(cfg, workers)
+    logger.info(f"并行同步 workers [{workers}], Tushare 连接上限 [{tushare}], MySQL 连接上限 [{mysql}]")
+
+    if profiler:
+        prefix = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs',
+                              f"profile-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}")
+        logger.info(f"性能剖析 [{profiler}], 结果文件 [{prefix}-<表名>]")
+        tasks = [with_profile(task, profiler, prefix) for task in tasks]
+    try:
+        run_tasks(tasks, drop_exist, workers, logger)
+    finally:
+        path = write_report(cfg)
+        if path:
+            logger.info(f"运行指标报告: [{path}]")
 
 
 # 全量历史初始化
-def sync(drop_exist):
-    # stock_basic.sync(drop_exist)  # 沪深股票-基础信息-股票列表
-    # trade_cal.sync(drop_exist)  # 沪深股票-基础信息-交易日历
-    name_change.sync(drop_exist)  # 沪深股票-基础信息-股票曾用名
-    hs_const.sync(drop_exist)  # 沪深股票-基础信息-沪深股通成份股
-    # stk_rewards.sync(drop_exist)  # 沪深股票-基础信息-管理层薪酬和持股
-    # daily.sync(drop_exist)  # 沪深股票-行情数据-A股日线行情
-    # weekly.sync(drop_exist)  # 沪深股票-行情数据-A股周线行情
-    # monthly.sync(drop_exist)  # 沪深股票-行情数据-A股月线行情
-    # money_flow.sync(drop_exist)  # 沪深股票-行情数据-个股资金流向
-    stk_limit.sync(drop_exist)  # 沪深股票-行情数据-每日涨跌停价格
-    # money_flow_hsgt.sync(drop_exist)  # 沪深股票-行情数据-沪深港通资金流向
-    # hsgt_top10.sync(drop_exist)  # 沪深股票-行情数据-沪深股通十大成交股
-    # ggt_top10.sync(drop_exist)  # 沪深股票-行情数据-港股通十大成交股
-    # ggt_daily.sync(drop_exist)  # 沪深股票-行情数据-港股通每日成交统计
-    # forecast.sync(drop_exist)  # 沪深股票-财务数据-业绩预告
-    # express.sync(drop_exist)  # 沪深股票-财务数据-业绩快报
-    # fina_indicator.sync(drop_exist)  # 沪深股票-财务数据-财务指标数据
-    # fina_mainbz.sync(drop_exist)  # 沪深股票-财务数据-主营业务构成
-    # disclosure_date.sync(drop_exist)  # 沪深股票-财务数据-财报披露计划
-    # margin_detail.sync(drop_exist)  # 沪深股票-市场参考数据-融资融券交易明细
-    # top_list.sync(drop_exist)  # 沪深股票-市场参考数据-龙虎榜每日明细
-    # top_inst.sync(drop_exist)  # 沪深股票-市场参考数据-龙虎榜机构明细
-    # stk_holder_number.sync(drop_exist)  # 沪深股票-市场参考数据-股东人数
-
-
-def sync_spc(drop_exist):
-    bak_basic.sync(drop_exist)  # 沪深股票-基础信息-备用列表 （读取限制,每分钟调用2次, 每天最多访问该接口20次）
-    concept.sync(drop_exist)  # 沪深股票-市场参考数据-概念股分类（已经停止维护）
-    concept_detail.sync(drop_exist)  # 沪深股票-市场参考数据-概念股列表 （已经停止维护）
-    cyq_perf.sync(drop_exist)  # 沪深股票-特色数据-每日筹码及胜率（受限:5/min,10/h)
-    cyq_chips.sync(drop_exist)  # 沪深股票-特色数据-每日筹码分布 (受限:5/min,10/h)
-    bak_daily.sync(drop_exist)  # 沪深股票-行情数据-备用行情
+def sync(drop_exist, workers=1, profiler=None):
+    run(NORMAL_TASKS, drop_exist, workers, profiler)
+
+
+def sync_spc(drop_exist, workers=1, profiler=None):
+    run(SPECIAL_TASKS, drop_exist, workers, profiler)
+
+
+def repair(workers=1, profiler=None):
+    run([with_repair(task) for task in NORMAL_TASKS + SPECIAL_TASKS], False, workers, profiler)
+
+
+def backfill(tables, start_year, end_year=None):
+    """
+    整年回补按年分区的表, 逐表串行, 见 TushareSync.backfill
+    """
+    cfg = get_cfg()
+    logger = get_logger('data_syn', cfg['logging']['filename'])
+    try:
+        for table_name in tables:
+            logger.info(f"整年回补 [{table_name}] {start_year} - {end_year or start_year}")
+            TushareSync(table_name).backfill(start_year, end_year)
+    finally:
+        path = write_report(cfg)
+        if path:
+            logger.info(f"运行指标报告: [{path}]")
 
 
 def use_age():
-    print('Useage: python data_syn.py --mode [init | append | init_spc | append_spc] [--drop_exist]')
+    print('Useage: python data_syn.py --mode [normal | special | repair] [--drop_exist] [--workers N] '
+          '[--metrics-out PATH] [--profile cprofile|pyinstrument]\n'
+          '        python data_syn.py --mode backfill --tables weekly,monthly --year YYYY [--end-year YYYY]')
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='sync mode args')
 
-    parser.add_argument('--mode', required=True, choices=['normal', 'special'],
+    parser.add_argument('--mode', required=True, choices=['normal', 'special', 'repair', 'backfill'],
                         type=str, default='',
                         help='同步模式: normal(同步常规表),'
-                             ' special(同步特殊表)')
+                             ' special(同步特殊表),'
+                             ' repair(修复常规表和特殊表中间缺失的数据, 不同步新数据),'
+                             ' backfill(整年回补 --tables 中按年分区的表)')
     parser.add_argument('--drop_exist', action='store_true',
                         help='初始化建表过程如果表已存在 Drop 后再建')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='并行同步的表数量, 默认 1 (逐表串行)')
+    parser.add_argument('--metrics-out', type=str, default='',
+                        help='运行指标报告路径, .prom 结尾时为 Prometheus textfile, 否则为 JSON; 默认使用 [metrics] path')
+    parser.add_argument('--tables', type=str, default='',
+                        help='backfill 模式回补的表, 逗号分隔, 如 weekly,monthly')
+    parser.add_argument('--year', type=int, default=None,
+                        help='backfill 模式回补的年份（分区）')
+    parser.add_argument('--end-year', type=int, default=None,
+                        help='backfill 模式回补的结束年份, 默认与 --year 相同')
+    parser.add_argument('--profile', choices=PROFILERS, default=None,
+                        help='性能剖析, 每张表的结果写入 logs 目录: cprofile 为 .prof 统计文件, pyinstrument 为 HTML 报告')
 
     args = parser.parse_args()
     mode = args.mode
     dropExist = args.drop_exist
-    print('Args: --mode [%s] --drop_exist [%s]' % (mode, dropExist))
+    workers = max(1, args.workers)
+    print('Args: --mode [%s] --drop_exist [%s] --workers [%d]' % (mode, dropExist, workers))
+    if args.metrics_out:
+        set_output_path(args.metrics_out)
 
     if mode == 'normal':
-        sync(dropExist)
+        sync(dropExist, workers, args.profile)
     elif mode == 'special':
-        sync_spc(dropExist)
+        sync_spc(dropExist, workers, args.profile)
+    elif mode == 'repair':
+        repair(workers, args.profile)
+    elif mode == 'backfill':
+        tables = [name.strip() for name in args.tables.split(',') if name.strip()]
+        if not tables or args.year is None:
+            use_age()
+        else:
+            backfill(tables, args.year, args.end_year)
     else:
         use_age()
@@ -3,6 +3,8 @@
 -- limit: 10000
 -- interval: 0.5
 -- is_increasing: True
+-- post_sync: adj_price
+-- repair_min_ratio: 0.9
 
 DROP TABLE IF EXISTS `adj_factor`;
 CREATE TABLE `adj_factor` (
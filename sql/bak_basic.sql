@@ -1,5 +1,10 @@
 -- stock.bak_basic definition
 
+-- begin_date: 20160101
+-- limit: 5000
+-- interval: 31
+-- quota: 2/min, 20/day
+
 DROP TABLE IF EXISTS `bak_basic`;
 CREATE TABLE `bak_basic`
 (
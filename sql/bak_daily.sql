@@ -1,5 +1,9 @@
 -- stock.bak_daily definition
 
+-- begin_date: 20170101
+-- limit: 5000
+-- interval: 15
+
 DROP TABLE IF EXISTS `bak_daily`;
 CREATE TABLE `bak_daily`
 (
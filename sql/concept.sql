@@ -1,5 +1,10 @@
 -- stock.concept definition
 
+-- limit: 5000
+-- interval: 0.5
+-- is_increasing: False
+-- shadow_load: true
+
 DROP TABLE IF EXISTS `concept`;
 CREATE TABLE `concept`
 (
@@ -1,5 +1,11 @@
 -- stock.concept_detail definition
 
+-- limit: 1000
+-- interval: 1
+-- iteration: ts_code
+-- ts_code_limit: 1
+-- is_increasing: False
+-- shadow_load: true
 
 DROP TABLE IF EXISTS `concept_detail`;
 CREATE TABLE `concept_detail`
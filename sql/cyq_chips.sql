@@ -1,5 +1,10 @@
 -- stock.cyq_chips definition
 
+-- begin_date: 20050101
+-- limit: 2000
+-- interval: 13
+-- quota: 5/min, 10/hour
+
 DROP TABLE IF EXISTS `cyq_chips`;
 CREATE TABLE `cyq_chips`
 (
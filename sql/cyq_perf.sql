@@ -1,5 +1,10 @@
 -- stock.cyq_perf definition
 
+-- begin_date: 20050101
+-- limit: 5000
+-- interval: 13
+-- quota: 5/min, 10/hour
+
 DROP TABLE IF EXISTS `cyq_perf`;
 CREATE TABLE `cyq_perf`
 (
@@ -3,6 +3,9 @@
 -- limit: 10000
 -- interval: 0.5
 -- is_increasing: True
+-- post_sync: adj_price
+-- write_mode: upsert
+-- repair_min_ratio: 0.9
 
 DROP TABLE IF EXISTS `daily`;
 CREATE TABLE `daily`
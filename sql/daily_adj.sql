@@ -0,0 +1,26 @@
+-- daily_adj, 复权行情（由 daily 和 adj_factor 计算, 不调用 Tushare）
+-- 由 daily / adj_factor 同步后的 post_sync: adj_price 维护, 见 utils/adj_price.py
+-- 前复权 qfq = 价格 * 复权因子 / 该股票最新一条日线的复权因子; 后复权 hfq = 价格 * 复权因子
+
+DROP TABLE IF EXISTS `daily_adj`;
+CREATE TABLE `daily_adj`
+(
+    `ts_code`      varchar(16)        DEFAULT NULL COMMENT '股票代码',
+    `trade_date`   int                DEFAULT NULL COMMENT '交易日期',
+    `adj_factor`   double             DEFAULT NULL COMMENT '复权因子',
+    `open_qfq`     double             DEFAULT NULL COMMENT '开盘价（前复权）',
+    `high_qfq`     double             DEFAULT NULL COMMENT '最高价（前复权）',
+    `low_qfq`      double             DEFAULT NULL COMMENT '最低价（前复权）',
+    `close_qfq`    double             DEFAULT NULL COMMENT '收盘价（前复权）',
+    `open_hfq`     double             DEFAULT NULL COMMENT '开盘价（后复权）',
+    `high_hfq`     double             DEFAULT NULL COMMENT '最高价（后复权）',
+    `low_hfq`      double             DEFAULT NULL COMMENT '最低价（后复权）',
+    `close_hfq`    double             DEFAULT NULL COMMENT '收盘价（后复权）',
+    `created_time` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    `updated_time` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '修改时间',
+    UNIQUE KEY `daily_adj_ts_code_idx` (`ts_code`, `trade_date`) USING BTREE,
+    KEY `daily_adj_trade_date_idx` (`trade_date`, `ts_code`) USING BTREE
+) ENGINE = InnoDB
+  DEFAULT CHARSET = utf8mb4
+  COMMENT ='A股复权行情'
+;
@@ -1,5 +1,10 @@
 -- stock.disclosure_date definition
 
+-- date_column: ann_date
+-- begin_date: 20100331
+-- limit: 1000
+-- interval: 0.4
+
 DROP TABLE IF EXISTS `disclosure_date`;
 CREATE TABLE `disclosure_date`
 (
@@ -1,5 +1,10 @@
 -- stock.express definition
 
+-- date_column: ann_date
+-- begin_date: 20040101
+-- limit: 2000
+-- interval: 2
+
 DROP TABLE IF EXISTS `express`;
 CREATE TABLE `express`
 (
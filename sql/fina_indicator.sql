@@ -1,5 +1,13 @@
 -- stock.fina_indicator definition
 
+-- date_column: ann_date
+-- begin_date: 20040101
+-- limit: 3000
+-- interval: 0.2
+-- iteration: ts_code
+-- date_step: 365
+-- ts_code_limit: 1000
+
 DROP TABLE IF EXISTS `fina_indicator`;
 CREATE TABLE `fina_indicator`
 (
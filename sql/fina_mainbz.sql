@@ -1,5 +1,14 @@
 -- stock.fina_mainbz definition
 
+-- date_column: end_date
+-- begin_date: 20000101
+-- limit: 1000
+-- interval: 1.1
+-- quota: 60/min
+-- iteration: ts_code
+-- date_step: 3650
+-- ts_code_limit: 1
+
 DROP TABLE IF EXISTS `fina_mainbz`;
 CREATE TABLE `fina_mainbz`
 (
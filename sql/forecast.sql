@@ -1,5 +1,10 @@
 -- stock.forecast definition
 
+-- date_column: ann_date
+-- begin_date: 19980405
+-- limit: 3500
+-- interval: 2
+
 DROP TABLE IF EXISTS `forecast`;
 CREATE TABLE `forecast`
 (
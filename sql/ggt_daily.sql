@@ -1,5 +1,9 @@
 -- stock.ggt_daily definition
 
+-- begin_date: 20100101
+-- limit: 1000
+-- interval: 35
+
 DROP TABLE IF EXISTS `ggt_daily`;
 CREATE TABLE `ggt_daily`
 (
@@ -1,5 +1,9 @@
 -- stock.ggt_top10 definition
 
+-- begin_date: 20150107
+-- limit: 1000
+-- interval: 35
+
 -- 原始数据存在脏数据, `ts_code`, `trade_date` 索引重复， 如 00700.HK-20161229
 DROP TABLE IF EXISTS `ggt_top10`;
 CREATE TABLE `ggt_top10`
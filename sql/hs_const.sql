@@ -1,5 +1,11 @@
 -- stock.hs_const definition
 
+-- limit: 5000
+-- interval: 0.5
+-- is_increasing: False
+-- shadow_load: true
+-- extra_params: [{"hs_type": "SZ", "is_new": "0"}, {"hs_type": "SZ", "is_new": "1"}, {"hs_type": "SH", "is_new": "0"}, {"hs_type": "SH", "is_new": "1"}]
+
 DROP TABLE IF EXISTS `hs_const`;
 CREATE TABLE `hs_const`
 (
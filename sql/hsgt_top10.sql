@@ -1,5 +1,9 @@
 -- stock.hsgt_top10 definition
 
+-- begin_date: 20141117
+-- limit: 5000
+-- interval: 0.2
+
 DROP TABLE IF EXISTS `hsgt_top10`;
 CREATE TABLE `hsgt_top10`
 (
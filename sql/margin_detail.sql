@@ -1,5 +1,9 @@
 -- stock.margin_detail definition
 
+-- begin_date: 20100101
+-- limit: 3000
+-- interval: 0.2
+
 DROP TABLE IF EXISTS `margin_detail`;
 CREATE TABLE `margin_detail`
 (
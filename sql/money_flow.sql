@@ -1,5 +1,11 @@
 -- stock.money_flow definition
 
+-- api_name: moneyflow
+-- begin_date: 19901219
+-- limit: 5000
+-- interval: 0.3
+-- repair_min_ratio: 0.9
+
 DROP TABLE IF EXISTS `money_flow`;
 CREATE TABLE `money_flow`
 (
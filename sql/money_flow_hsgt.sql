@@ -1,5 +1,10 @@
 -- stock.money_flow_hsgt definition
 
+-- api_name: moneyflow_hsgt
+-- begin_date: 20100101
+-- limit: 300
+-- interval: 0.2
+
 DROP TABLE IF EXISTS `money_flow_hsgt`;
 CREATE TABLE `money_flow_hsgt`
 (
@@ -1,5 +1,11 @@
 -- stock.monthly definition
 
+-- limit: 4500
+-- interval: 1
+-- write_mode: upsert
+-- resample_from: daily
+-- resample_period: month
+
 DROP TABLE IF EXISTS `monthly`;
 CREATE TABLE `monthly`
 (
@@ -1,5 +1,11 @@
 -- stock.name_change definition
 
+-- api_name: namechange
+-- limit: 10000
+-- interval: 0.5
+-- is_increasing: False
+-- shadow_load: true
+
 DROP TABLE IF EXISTS `name_change`;
 CREATE TABLE `name_change`
 (
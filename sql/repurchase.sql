@@ -1,5 +1,10 @@
 -- stock.repurchase definition
 
+-- date_column: ann_date
+-- begin_date: 20070101
+-- limit: 3000
+-- interval: 0.2
+
 DROP TABLE IF EXISTS `repurchase`;
 CREATE TABLE `repurchase`
 (
@@ -1,5 +1,10 @@
 -- stock.share_float definition
 
+-- date_column: ann_date
+-- begin_date: 20070101
+-- limit: 300
+-- interval: 2
+
 DROP TABLE IF EXISTS `share_float`;
 CREATE TABLE `share_float`
 (
@@ -3,6 +3,10 @@
 -- limit: 10000
 -- interval: 0.8
 -- is_increasing: True
+-- write_mode: load_data
+-- pipeline_workers: 1
+-- 改为 true 时由本地 daily / adj_factor 计算, 不再调用接口 (utils/factors.py)
+-- local_factors: false
 
 CREATE TABLE `stk_factor_pro`
 (
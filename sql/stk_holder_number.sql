@@ -1,5 +1,11 @@
 -- stock.stk_holder_number definition
 
+-- api_name: stk_holdernumber
+-- date_column: ann_date
+-- begin_date: 20070101
+-- limit: 3000
+-- interval: 0.5
+
 DROP TABLE IF EXISTS `stk_holder_number`;
 CREATE TABLE `stk_holder_number`
 (
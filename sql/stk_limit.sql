@@ -1,5 +1,9 @@
 -- stock.stk_limit definition
 
+-- begin_date: 20100101
+-- limit: 5000
+-- interval: 0.2
+
 DROP TABLE IF EXISTS `stk_limit`;
 CREATE TABLE `stk_limit`
 (
@@ -1,5 +1,13 @@
 -- stock.stk_rewards definition
 
+-- date_column: end_date
+-- begin_date: 20100101
+-- limit: 5000
+-- interval: 0.3
+-- iteration: ts_code
+-- date_step: 1
+-- ts_code_limit: 1000
+
 DROP TABLE IF EXISTS `stk_rewards`;
 CREATE TABLE `stk_rewards`
 (
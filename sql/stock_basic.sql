@@ -2,6 +2,7 @@
 -- limit: 20000
 -- interval: 0
 -- is_increasing: False
+-- shadow_load: true
 
 DROP TABLE IF EXISTS `stock_basic`;
 CREATE TABLE `stock_basic`
@@ -1,5 +1,9 @@
 -- stock.top_list definition
 
+-- begin_date: 20050101
+-- limit: 10000
+-- interval: 0.4
+
 DROP TABLE IF EXISTS `top_list`;
 CREATE TABLE `top_list`
 (
@@ -3,6 +3,7 @@
 -- limit: 20000
 -- interval: 0
 -- is_increasing: False
+-- shadow_load: true
 
 DROP TABLE IF EXISTS `trade_cal`;
 CREATE TABLE `trade_cal`
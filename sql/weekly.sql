@@ -1,5 +1,11 @@
 -- stock.weekly definition
 
+-- limit: 4500
+-- interval: 2
+-- write_mode: upsert
+-- resample_from: daily
+-- resample_period: week
+
 DROP TABLE IF EXISTS `weekly`;
 CREATE TABLE `weekly`
 (
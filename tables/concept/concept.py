@@ -14,34 +14,12 @@ tushare 接口说明：https://tushare.pro/document/2?doc_id=125
 已停止维护，仅进行初始化，最后维护时间2021年2月
 """
 
-import os
-from utils.utils import exec_create_table_script, get_tushare_api, get_mock_connection, get_logger
+from utils.tushare_sync import TushareSync
 
 
-# 全量初始化表数据
-def sync(drop_exist=True):
-    # 创建表
-    dir_path = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-    exec_create_table_script(dir_path, True)
-
-    # 创建 API / Connection / Logger 对象
-    ts_api = get_tushare_api()
-    connection = get_mock_connection()
-    logger = get_logger('concept', 'data_syn.log')
-
-    # 拉取数据
-    data = ts_api.concept(**{
-        "src": "",
-        "limit": "",
-        "offset": ""
-    }, fields=[
-        "code",
-        "name",
-        "src"
-    ])
-    size = data.last_valid_index() + 1
-    logger.info('Write [%d] records into table [%s] with [%s]' % (size, 'concept', connection.engine))
-    data.to_sql('concept', connection, index=False, if_exists='append', chunksize=5000)
+# 抓取方式、限流和开始日期等由 sql/concept.sql 中的注释声明
+def sync(drop_exist):
+    TushareSync('concept').sync(drop_exist)
 
 
 if __name__ == '__main__':
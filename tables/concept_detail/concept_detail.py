@@ -13,38 +13,25 @@
 
 已停止维护，仅进行初始化，最后维护时间2021年2月
 """
-import datetime
-import os
-from utils.utils import exec_create_table_script, exec_sync_with_ts_code
-
-
-# 全量初始化表数据
-def sync(drop_exist=True):
-    # 创建表
-    dir_path = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-    exec_create_table_script(dir_path, True)
-
-    limit = 1000
-    interval = 1
-    exec_sync_with_ts_code(
-        table_name='stk_rewards',
-        api_name='stk_rewards',
-        fields=[
-            "id",
-            "concept_name",
-            "ts_code",
-            "name",
-            "in_date",
-            "out_date"
-        ],
-        date_column='ann_date',
-        start_date=19970101,
-        end_date=str(datetime.datetime.now().strftime('%Y%m%d')),
-        date_step=36000,
-        limit=limit,
-        interval=interval,
-        ts_code_limit=1)
+from utils.tushare_sync import TushareSync
+
+
+class ConceptDetailSync(TushareSync):
+    """
+    接口返回的概念代码字段为 id, 表中字段为 code
+    """
+    def __init__(self):
+        super().__init__('concept_detail')
+        self.fields = ['id' if field == 'code' else field for field in self.fields]
+
+    def pre_process_data(self, data):
+        return data.rename(columns={'id': 'code'})
+
+
+# 按 ts_code 逐只查询, 抓取方式和限流由 sql/concept_detail.sql 中的注释声明
+def sync(drop_exist):
+    ConceptDetailSync().sync(drop_exist)
 
 
 if __name__ == '__main__':
-    sync()
+    sync(False)
@@ -17,52 +17,13 @@
 tushare 接口说明：https://tushare.pro/document/2?doc_id=294
 """
 
-import os
-import datetime
-from utils.utils import exec_create_table_script, exec_sync_with_spec_date_column
+from utils.tushare_sync import TushareSync
 
 
-# 全量初始化表数据
-def init(drop_exist):
-    # 创建表
-    dir_path = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-    exec_create_table_script(dir_path, drop_exist)
-
-    exec_sync_with_spec_date_column(
-        table_name='cyq_chips',
-        api_name='cyq_chips',
-        fields=[
-            "ts_code",
-            "trade_date",
-            "price",
-            "percent"
-        ],
-        date_column='trade_date',
-        start_date='20050101',
-        end_date=str(datetime.datetime.now().strftime('%Y%m%d')),
-        limit=2000,
-        interval=13
-    )
-
-
-# 增量追加表数据
-def append():
-    exec_sync_with_spec_date_column(
-        table_name='cyq_chips',
-        api_name='cyq_chips',
-        fields=[
-            "ts_code",
-            "trade_date",
-            "price",
-            "percent"
-        ],
-        date_column='trade_date',
-        start_date=str((datetime.datetime.now() + datetime.timedelta(days=0)).strftime('%Y%m%d')),
-        end_date=str(datetime.datetime.now().strftime('%Y%m%d')),
-        limit=2000,
-        interval=13
-    )
+# 抓取方式、限流和开始日期等由 sql/cyq_chips.sql 中的注释声明
+def sync(drop_exist):
+    TushareSync('cyq_chips').sync(drop_exist)
 
 
 if __name__ == '__main__':
-    append()
+    sync(False)
@@ -14,48 +14,12 @@
 tushare 接口说明：https://tushare.pro/document/2?doc_id=27
 """
 
-import os
-import datetime
-from utils.utils import exec_create_table_script, exec_sync_with_spec_date_column, query_last_sync_date, max_date, \
-    get_cfg, CONST_BEGIN_DATE
+from utils.tushare_sync import TushareSync
 
 
-def exec_sync(start_date, end_date):
-    exec_sync_with_spec_date_column(
-        table_name='daily',
-        api_name='daily',
-        fields=[
-            "ts_code",
-            "trade_date",
-            "open",
-            "high",
-            "low",
-            "close",
-            "pre_close",
-            "change",
-            "pct_chg",
-            "vol",
-            "amount"
-        ],
-        date_column='trade_date',
-        start_date=start_date,
-        end_date=end_date,
-        limit=5000,
-        interval=0.3)
-
+# 抓取方式、限流和开始日期等由 sql/daily.sql 中的注释声明
 def sync(drop_exist):
-    # 创建表
-    dir_path = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-    exec_create_table_script(dir_path, drop_exist)
-
-    # 查询历史最大同步日期
-    cfg = get_cfg()
-    date_query_sql = "select max(trade_date) date from %s.daily" % cfg['mysql']['database']
-    last_date = query_last_sync_date(date_query_sql)
-    start_date = max_date(last_date, CONST_BEGIN_DATE)
-    end_date = str(datetime.datetime.now().strftime('%Y%m%d'))
-
-    exec_sync(start_date, end_date)
+    TushareSync('daily').sync(drop_exist)
 
 
 if __name__ == '__main__':
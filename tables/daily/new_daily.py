@@ -18,9 +18,6 @@ import os
 import datetime
 from utils.tushare_sync import TushareSync
 
-from utils.utils import exec_create_table_script, exec_sync_with_spec_date_column, query_last_sync_date, max_date, \
-    get_cfg, CONST_BEGIN_DATE
-
 class DailySync(TushareSync):
     def __init__(self, end_date=""):
         fields=[
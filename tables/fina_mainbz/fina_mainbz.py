@@ -13,53 +13,13 @@
 tushare 接口说明：https://tushare.pro/document/2?doc_id=79
 """
 
-import os
-import datetime
+from utils.tushare_sync import TushareSync
 
-from utils.utils import exec_create_table_script, query_last_sync_date, max_date, get_cfg, exec_sync_with_ts_code
 
-
-def exec_sync(start_date, end_date):
-    exec_sync_with_ts_code(
-        table_name='fina_mainbz',
-        api_name='fina_mainbz',
-        fields=[
-            "ts_code",
-            "end_date",
-            "bz_item",
-            "bz_sales",
-            "bz_profit",
-            "bz_cost",
-            "curr_type",
-            "bz_code",
-            "update_flag"
-        ],
-        date_column='end_date',
-        start_date=start_date,
-        end_date=end_date,
-        date_step=3650,
-        limit=1000,
-        interval=1.1,
-        ts_code_limit=1
-    )
-
-
-# 全量初始化表数据
+# 抓取方式、限流和开始日期等由 sql/fina_mainbz.sql 中的注释声明
 def sync(drop_exist):
-    # 创建表
-    dir_path = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-    exec_create_table_script(dir_path, drop_exist)
-
-    # 查询历史最大同步日期
-    begin_date = '20000101'
-    cfg = get_cfg()
-    date_query_sql = "select max(end_date) date from %s.fina_mainbz" % cfg['mysql']['database']
-    last_date = query_last_sync_date(date_query_sql)
-    start_date = max_date(last_date, begin_date)
-    end_date = str(datetime.datetime.now().strftime('%Y%m%d'))
-
-    exec_sync(start_date, end_date)
+    TushareSync('fina_mainbz').sync(drop_exist)
 
 
 if __name__ == '__main__':
-    sync(True)
+    sync(False)
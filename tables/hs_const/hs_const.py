@@ -12,41 +12,12 @@
 tushare 接口说明： https://tushare.pro/document/2?doc_id=104
 """
 
-import os
-from utils.utils import exec_create_table_script, get_tushare_api, get_mock_connection, get_logger
+from utils.tushare_sync import TushareSync
 
 
-# 全量初始化表数据
+# 抓取方式、限流和开始日期等由 sql/hs_const.sql 中的注释声明
 def sync(drop_exist):
-    dir_path = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-    exec_create_table_script(dir_path, drop_exist)
-
-    ts_api = get_tushare_api()
-    connection = get_mock_connection()
-    logger = get_logger('hs_const', 'data_syn.log')
-
-    fields = 'ts_code,hs_type,in_date,out_date,is_new'
-    logger.info("Query data from tushare with api[hs_const], fields[%s]" % fields)
-
-    data = ts_api.hs_const(hs_type='SZ', is_new='0', fields=fields)
-    logger.info('Write [%d] records into table [stock_basic] with [%s], where condition[hs_type=SZ, is_new=0]'
-                % (data.last_valid_index() + 1, connection.engine))
-    data.to_sql('hs_const', connection, index=False, if_exists='append', chunksize=5000)
-
-    data = ts_api.hs_const(hs_type='SZ', is_new='1', fields=fields)
-    logger.info('Write [%d] records into table [stock_basic] with [%s], where condition[hs_type=SZ, is_new=1]'
-                % (data.last_valid_index() + 1, connection.engine))
-    data.to_sql('hs_const', connection, index=False, if_exists='append', chunksize=5000)
-
-    data = ts_api.hs_const(hs_type='SH', is_new='0', fields=fields)
-    logger.info('Write [%d] records into table [stock_basic] with [%s], where condition[hs_type=SH, is_new=0]'
-                % (data.last_valid_index() + 1, connection.engine))
-    data.to_sql('hs_const', connection, index=False, if_exists='append', chunksize=5000)
-
-    data = ts_api.hs_const(hs_type='SH', is_new='1', fields=fields)
-    logger.info('Write [%d] records into table [stock_basic] with [%s], where condition[hs_type=SH, is_new=1]'
-                % (data.last_valid_index() + 1, connection.engine))
-    data.to_sql('hs_const', connection, index=False, if_exists='append', chunksize=5000)
+    TushareSync('hs_const').sync(drop_exist)
 
 
 if __name__ == '__main__':
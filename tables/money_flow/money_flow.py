@@ -13,63 +13,13 @@
 tushare 接口说明：https://tushare.pro/document/2?doc_id=170
 """
 
-import datetime
-import os
+from utils.tushare_sync import TushareSync
 
-from utils.utils import exec_create_table_script, exec_sync_with_spec_date_column, get_cfg, query_last_sync_date, \
-    max_date
 
-
-def exec_sync(start_date, end_date):
-    exec_sync_with_spec_date_column(
-        table_name='money_flow',
-        api_name='moneyflow',
-        fields=[
-            "ts_code",
-            "trade_date",
-            "buy_sm_vol",
-            "buy_sm_amount",
-            "sell_sm_vol",
-            "sell_sm_amount",
-            "buy_md_vol",
-            "buy_md_amount",
-            "sell_md_vol",
-            "sell_md_amount",
-            "buy_lg_vol",
-            "buy_lg_amount",
-            "sell_lg_vol",
-            "sell_lg_amount",
-            "buy_elg_vol",
-            "buy_elg_amount",
-            "sell_elg_vol",
-            "sell_elg_amount",
-            "net_mf_vol",
-            "net_mf_amount",
-            "trade_count"
-        ],
-        date_column='trade_date',
-        start_date=start_date,
-        end_date=end_date,
-        limit=5000,
-        interval=0.3)
-
-
-# 全量初始化表数据
+# 抓取方式、限流和开始日期等由 sql/money_flow.sql 中的注释声明
 def sync(drop_exist):
-    # 创建表
-    dir_path = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-    exec_create_table_script(dir_path, drop_exist)
-
-    # 查询历史最大同步日期
-    begin_date = '19901219'
-    cfg = get_cfg()
-    date_query_sql = "select max(trade_date) date from %s.money_flow" % cfg['mysql']['database']
-    last_date = query_last_sync_date(date_query_sql)
-    start_date = max_date(last_date, begin_date)
-    end_date = str(datetime.datetime.now().strftime('%Y%m%d'))
-
-    exec_sync(start_date, end_date)
+    TushareSync('money_flow').sync(drop_exist)
 
 
 if __name__ == '__main__':
-    sync(True)
+    sync(False)
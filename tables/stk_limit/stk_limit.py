@@ -14,45 +14,12 @@
 tushare 接口说明： https://tushare.pro/document/2?doc_id=183
 """
 
-import datetime
-import os
+from utils.tushare_sync import TushareSync
 
-from utils.utils import exec_create_table_script, exec_sync_with_spec_date_column, get_cfg, query_last_sync_date, \
-    max_date, CONST_BEGIN_DATE
 
-
-def exec_sync(start_date, end_date):
-    exec_sync_with_spec_date_column(
-        table_name='stk_limit',
-        api_name='stk_limit',
-        fields=[
-            "trade_date",
-            "ts_code",
-            "up_limit",
-            "down_limit",
-            "pre_close"
-        ],
-        date_column='trade_date',
-        start_date=start_date,
-        end_date=end_date,
-        limit=5000,
-        interval=0.2)
-
-
-# 全量初始化表数据
+# 抓取方式、限流和开始日期等由 sql/stk_limit.sql 中的注释声明
 def sync(drop_exist):
-    # 创建表
-    dir_path = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-    exec_create_table_script(dir_path, drop_exist)
-
-    # 查询历史最大同步日期
-    cfg = get_cfg()
-    date_query_sql = "select max(trade_date) date from %s.stk_limit" % cfg['mysql']['database']
-    last_date = query_last_sync_date(date_query_sql)
-    start_date = max_date(last_date, CONST_BEGIN_DATE)
-    end_date = str(datetime.datetime.now().strftime('%Y%m%d'))
-
-    exec_sync(start_date, end_date)
+    TushareSync('stk_limit').sync(drop_exist)
 
 
 if __name__ == '__main__':
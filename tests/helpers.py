@@ -0,0 +1,17 @@
+class FakeClock:
+    """
+    测试用时钟: 调用或 monotonic() 返回当前时间, sleep() 直接推进时间并累计等待秒数
+    """
+    def __init__(self, now=0.0):
+        self.now = now
+        self.slept = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from utils.adaptive import AdaptiveController, AdaptiveStore, is_quota_error, TIGHTEN_AFTER
+from utils.rate_limiter import RateLimiter
+
+
+def fetch_day(controller, total, cap):
+    """
+    模拟按 offset 分页抓取一天的数据, 接口单次最多返回 cap 条, 返回每页的 (limit, 条数)
+    """
+    pages, offset = [], 0
+    while True:
+        requested = controller.page_size()
+        rows = max(0, min(requested, cap, total - offset))
+        controller.on_page(rows, requested, 0.1)
+        pages.append((requested, rows))
+        offset += rows
+        if not controller.has_more(rows, requested):
+            return pages, offset
+
+
+class TestAdaptiveController(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "adaptive_state.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_grow_until_cap(self):
+        """测试整页返回时 limit 翻倍, 探明接口上限后固定, 不会漏数据"""
+        controller = AdaptiveController("daily", limit=1000, interval=0.5, store=AdaptiveStore(self.path))
+        pages, fetched = fetch_day(controller, total=15000, cap=6000)
+        self.assertEqual(fetched, 15000)
+        self.assertEqual(pages[:4], [(1000, 1000), (2000, 2000), (4000, 4000), (8000, 6000)])
+        self.assertEqual(controller.cap, 6000)
+        self.assertEqual(controller.page_size(), 6000)
+
+        # 探明上限后, 不足上限的页即为当日最后一页
+        pages, fetched = fetch_day(controller, total=6500, cap=6000)
+        self.assertEqual((pages, fetched), ([(6000, 6000), (6000, 500)], 6500))
+
+    def test_probe_short_page(self):
+        """测试不足 limit 的页无法确定是否为接口上限时多抓取一页确认, 之后不再重复确认"""
+        controller = AdaptiveController("daily", limit=10000, interval=0.5)
+        self.assertEqual(fetch_day(controller, total=5000, cap=6000), ([(10000, 5000), (10000, 0)], 5000))
+        self.assertIsNone(controller.cap)
+        self.assertEqual(fetch_day(controller, total=4000, cap=6000), ([(10000, 4000)], 4000))
+
+    def test_backoff_and_tighten(self):
+        """测试配额错误时间隔加倍并指数退避, 连续快速调用后间隔缩小"""
+        limiter = RateLimiter.from_interval(0.5)
+        controller = AdaptiveController("daily", limit=1000, interval=0.5, limiter=limiter)
+        error = Exception("抱歉，您每分钟最多访问该接口500次")
+        self.assertTrue(is_quota_error(error))
+        self.assertFalse(is_quota_error(Exception("timeout")))
+
+        self.assertEqual(controller.on_error(Exception("timeout"), 2.5), 2.5)
+        self.assertEqual(controller.on_error(error, 2.5), 1.0)
+        self.assertEqual(controller.on_error(error, 2.5), 2.0)
+        self.assertEqual(controller.interval, 2.0)
+        self.assertEqual(limiter.buckets[0].period, 2.0)
+
+        for _ in range(TIGHTEN_AFTER):
+            controller.on_page(10, 1000, 0.1)
+        self.assertEqual(controller.interval, 1.8)
+        self.assertEqual(limiter.buckets[0].period, 1.8)
+
+    def test_persist(self):
+        """测试学到的参数按接口保存, 下次从学到的值开始"""
+        controller = AdaptiveController("daily", limit=1000, interval=0.5, store=AdaptiveStore(self.path))
+        fetch_day(controller, total=15000, cap=6000)
+
+        controller = AdaptiveController("daily", limit=1000, interval=0.5, store=AdaptiveStore(self.path))
+        self.assertEqual((controller.page_size(), controller.cap), (6000, 6000))
+        controller = AdaptiveController("weekly", limit=1000, interval=0.5, store=AdaptiveStore(self.path))
+        self.assertEqual((controller.page_size(), controller.cap), (1000, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import sqlite3
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from utils import adj_price
+from utils.adj_price import adjust_prices, changed_codes
+from utils.post_sync import get_post_sync_hooks
+
+
+def daily_with_factors(codes, dates, closes, factors):
+    return pd.DataFrame({"ts_code": codes, "trade_date": dates, "open": closes, "high": closes,
+                         "low": closes, "close": closes, "adj_factor": factors})
+
+
+def sqlite_sync(tables):
+    """
+    以内存 SQLite 代替 MySQL 的 sync, tables 为 {表名: DataFrame}
+    """
+    conn = sqlite3.connect(":memory:")
+    for name, data in tables.items():
+        columns = ", ".join(f"{column} INTEGER" if column == "trade_date" else column for column in data.columns)
+        conn.execute(f"CREATE TABLE {name} ({columns})")
+        conn.executemany(f"INSERT INTO {name} VALUES ({', '.join('?' * len(data.columns))})",
+                         data.astype(object).values.tolist())
+    sync = MagicMock()
+    sync._table_exist.return_value = True
+    sync._fetch_all_from_db.side_effect = lambda sql: conn.execute(sql).fetchall()
+    sync._fetch_one_from_db.side_effect = lambda sql: conn.execute(sql).fetchone()[0]
+    sync.exec_sql.side_effect = conn.execute
+    return sync, conn
+
+
+class TestAdjPrice(unittest.TestCase):
+    def test_adjust_prices(self):
+        """测试后复权为价格乘因子, 前复权以每只股票最新一条的因子为基准, 缺失的因子沿用之前的值"""
+        data = daily_with_factors(["a", "a", "a", "b"], [20240103, 20240102, 20240104, 20240102],
+                                  [11.0, 10.0, 5.5, 3.0], [1.0, 1.0, 2.0, None])
+        result = adjust_prices(data, prev_factors={"b": 4.0})
+        self.assertEqual(result["trade_date"].tolist(), [20240102, 20240103, 20240104, 20240102])
+        self.assertEqual(result["close_hfq"].tolist(), [10.0, 11.0, 11.0, 12.0])
+        self.assertEqual(result["close_qfq"].tolist(), [5.0, 5.5, 5.5, 3.0])
+
+        # 没有之前的因子时用之后的因子, 完全没有因子的股票不返回
+        data = daily_with_factors(["a", "a", "c"], [20240102, 20240103, 20240102], [10.0, 10.0, 1.0],
+                                  [None, 2.0, None])
+        result = adjust_prices(data)
+        self.assertEqual(result["ts_code"].tolist(), ["a", "a"])
+        self.assertEqual(result["adj_factor"].tolist(), [2.0, 2.0])
+
+    def test_changed_codes(self):
+        """测试只有最新复权因子变化的股票需要重算, 新上市的股票不需要"""
+        adjusted = adjust_prices(daily_with_factors(["a", "b", "c"], [20240105] * 3, [1.0] * 3, [1.0, 2.5, 1.0]))
+        self.assertEqual(changed_codes(adjusted, {"a": 1.0, "b": 2.0}), ["b"])
+        self.assertEqual(changed_codes(adjusted, {}), [])
+
+    def test_refresh_incremental(self):
+        """测试增量维护: 只计算到两表都已同步的日期, 追加因子未变化股票的新日期, 因子变化的股票删除后重算全部历史"""
+        sync = MagicMock()
+        sync._table_exist.return_value = True
+        sync._fetch_one_from_db.side_effect = [20240104, 20240108, 20240105]
+        new = daily_with_factors(["a", "b"], [20240105, 20240105], [10.0, 20.0], [1.0, 2.0])
+        with patch.object(adj_price, "latest_factors", return_value={"a": 1.0, "b": 1.0}), \
+                patch.object(adj_price, "read_daily", return_value=new) as read, \
+                patch.object(adj_price, "_write") as write, \
+                patch.object(adj_price, "_recompute", return_value=3) as recompute:
+            self.assertEqual(adj_price.refresh(sync), 4)
+        read.assert_called_once_with(sync, "trade_date>'20240104' AND trade_date<='20240105'")
+        self.assertEqual(write.call_args[0][1]["ts_code"].tolist(), ["a"])
+        recompute.assert_called_once_with(sync, ["b"], delete=True, end_date="20240105")
+
+    def test_refresh_waits_for_factors(self):
+        """测试 adj_factor 还没有同步到 daily_adj 最大日期之后时不计算, 不沿用旧因子"""
+        sync = MagicMock()
+        sync._table_exist.return_value = True
+        sync._fetch_one_from_db.side_effect = [20240104, 20240105, 20240104]
+        with patch.object(adj_price, "read_daily") as read:
+            self.assertEqual(adj_price.refresh(sync), 0)
+        read.assert_not_called()
+
+    def test_refresh_fills_holes(self):
+        """测试 daily_adj 已越过的日期在 daily 中补上后, 相关股票自该日起重新计算, 其他股票不变"""
+        data = daily_with_factors(["a"] * 3 + ["b"] * 3, [20240102, 20240103, 20240104] * 2,
+                                  [10.0, 11.0, 12.0, 20.0, 21.0, 22.0], [1.0, 1.0, 2.0, 1.0, 1.0, 1.0])
+        expected = adjust_prices(data)
+        # a 在 20240103 同步失败时计算的 daily_adj
+        filled = (data["ts_code"] == "a") & (data["trade_date"] == 20240103)
+        sync, conn = sqlite_sync({"daily": data.drop(columns="adj_factor"),
+                                  "adj_factor": data[["ts_code", "trade_date", "adj_factor"]],
+                                  "daily_adj": adjust_prices(data[~filled])})
+        self.assertEqual(adj_price.find_holes(sync, "daily_adj", 20240104), {"a": 20240103})
+
+        def write(sync, data):
+            conn.executemany(f"INSERT INTO daily_adj VALUES ({', '.join('?' * len(data.columns))})",
+                             data.astype(object).values.tolist())
+
+        with patch.object(adj_price, "_write", side_effect=write):
+            self.assertEqual(adj_price.refresh(sync), 2)
+        result = pd.DataFrame(conn.execute("SELECT * FROM daily_adj ORDER BY ts_code, trade_date").fetchall(),
+                              columns=adj_price.COLUMNS)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+        self.assertEqual(adj_price.find_holes(sync, "daily_adj", 20240104), {})
+
+    def test_post_sync_hooks(self):
+        """测试按名称获取 post_sync 处理, 未知名称抛出异常"""
+        self.assertEqual(get_post_sync_hooks(" adj_price, "), [("adj_price", adj_price.refresh)])
+        self.assertEqual(get_post_sync_hooks(""), [])
+        with self.assertRaises(Exception):
+            get_post_sync_hooks("unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from utils.checkpoint import CheckpointJournal
+
+
+class TestCheckpointJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "checkpoints", "sync_checkpoint.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_resume(self):
+        """测试中断后按原日期范围续传, 已完成单元跳过, 未完成单元从记录的 offset 继续"""
+        journal = CheckpointJournal(self.path)
+        self.assertEqual(journal.begin_run("daily", "20240101", "20240110"), ("20240101", "20240110", False))
+        journal.save_progress("daily", "20240102", 5432, done=True)
+        journal.save_progress("daily", "20240103", 5000)
+
+        # 模拟进程重启
+        journal = CheckpointJournal(self.path)
+        self.assertTrue(journal.has_run("daily"))
+        self.assertEqual(journal.begin_run("daily", "20240105", "20240112"), ("20240101", "20240112", True))
+        self.assertEqual(journal.unit_state("daily", "20240102"), (5432, True))
+        self.assertEqual(journal.unit_state("daily", "20240103"), (5000, False))
+        self.assertEqual(journal.unit_state("daily", "20240104"), (0, False))
+
+    def test_finish_run(self):
+        """测试任务完成后清除记录, 下次同步重新开始"""
+        journal = CheckpointJournal(self.path)
+        journal.begin_run("daily", "20240101", "20240110")
+        journal.save_progress("daily", "20240102", 100, done=True)
+        journal.finish_run("daily")
+        self.assertFalse(journal.has_run("daily"))
+        self.assertEqual(journal.unit_state("daily", "20240102"), (0, False))
+        self.assertEqual(journal.begin_run("daily", "20240111", "20240112"), ("20240111", "20240112", False))
+
+    def test_repaired_dates(self):
+        """测试修复日期按表分别记录, 重复记录只保留一条, 进程重启后仍在, 清除后不再返回"""
+        journal = CheckpointJournal(self.path)
+        journal.add_repaired_dates("weekly", ["20240104", "20240103"])
+        journal.add_repaired_dates("weekly", [20240103])
+        journal.add_repaired_dates("monthly", ["20240103"])
+
+        journal = CheckpointJournal(self.path)
+        self.assertEqual(journal.repaired_dates("weekly"), ["20240103", "20240104"])
+        journal.clear_repaired_dates("weekly", ["20240103"])
+        self.assertEqual(journal.repaired_dates("weekly"), ["20240104"])
+        self.assertEqual(journal.repaired_dates("monthly"), ["20240103"])
+
+    def test_repaired_rows(self):
+        """测试记录单元修复时抓取到的记录数, 再次修复时覆盖"""
+        journal = CheckpointJournal(self.path)
+        journal.save_repaired_rows("daily", "20150708", 1500)
+        journal.save_repaired_rows("daily", "20150708", 1520)
+        self.assertEqual(CheckpointJournal(self.path).repaired_rows("daily"), {"20150708": 1520})
+        self.assertEqual(journal.repaired_rows("money_flow"), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from utils.db import clear_cfg_cache, dispose_engines, get_pooled_engine, load_cfg, raw_connection
+
+
+class TestDb(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        dispose_engines()
+        clear_cfg_cache()
+        self.tmp_dir.cleanup()
+
+    def test_load_cfg_cached(self):
+        """测试同一配置文件只解析一次, 清除缓存后重新读取"""
+        path = os.path.join(self.tmp_dir.name, "application.ini")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[mysql]\npool_size=3\n")
+        cfg = load_cfg(path)
+        self.assertIs(load_cfg(path), cfg)
+        self.assertEqual(cfg["mysql"].getint("pool_size"), 3)
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[mysql]\npool_size=8\n")
+        self.assertEqual(load_cfg(path)["mysql"].getint("pool_size"), 3)
+        clear_cfg_cache()
+        self.assertEqual(load_cfg(path)["mysql"].getint("pool_size"), 8)
+
+    def test_pooled_connection_reused(self):
+        """测试相同地址共用一个 engine, 借出的连接归还后被复用"""
+        url = f"sqlite:///{os.path.join(self.tmp_dir.name, 'pool.db')}"
+        engine = get_pooled_engine(url, pool_size=2)
+        self.assertIs(get_pooled_engine(url, pool_size=2), engine)
+
+        with raw_connection(engine) as conn:
+            first = conn.dbapi_connection
+            cursor = conn.cursor()
+            cursor.execute("CREATE TABLE t (v INTEGER)")
+            cursor.execute("INSERT INTO t VALUES (1)")
+            conn.commit()
+            cursor.close()
+        self.assertEqual(engine.pool.checkedout(), 0)
+
+        with raw_connection(engine) as conn:
+            self.assertIs(conn.dbapi_connection, first)
+            cursor = conn.cursor()
+            cursor.execute("SELECT v FROM t")
+            self.assertEqual(cursor.fetchall(), [(1,)])
+            cursor.close()
+        self.assertEqual(engine.pool.checkedin(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
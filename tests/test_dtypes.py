@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.dtypes import coerce_dtypes, parse_column_type
+
+
+class TestDtypes(unittest.TestCase):
+    def test_parse_column_type(self):
+        """测试从字段定义行中取出类型名"""
+        self.assertEqual(parse_column_type("`trade_date`   int   DEFAULT NULL COMMENT '交易日期',"), "int")
+        self.assertEqual(parse_column_type("`ts_code` varchar(64) COMMENT '股票代码',"), "varchar")
+        self.assertEqual(parse_column_type("`amount` DECIMAL(20,4) DEFAULT NULL,"), "decimal")
+        self.assertEqual(parse_column_type("`holder_num` int(11) UNSIGNED DEFAULT NULL,"), "int unsigned")
+
+    def test_coerce_dtypes(self):
+        """测试按字段类型向量化转换: 日期转 int32, float 转 float32, ts_code 转 category, 有空值时为可空整数"""
+        data = pd.DataFrame({
+            "ts_code": ["000001.SZ", "000001.SZ", "600000.SH"],
+            "trade_date": ["20240102", "20240103", "20240104"],
+            "ann_date": ["20240102", None, "20240104"],
+            "close": [10.5, 10.6, 10.7],
+            "vol": ["1.5", "2", None],
+            "name": ["a", "b", "c"],
+        })
+        types = {"ts_code": "varchar", "trade_date": "int", "ann_date": "int", "close": "float",
+                 "vol": "double", "name": "varchar"}
+        result = coerce_dtypes(data, types)
+        self.assertEqual(result["trade_date"].dtype, np.int32)
+        self.assertEqual(result["trade_date"].tolist(), [20240102, 20240103, 20240104])
+        self.assertEqual(str(result["ann_date"].dtype), "Int32")
+        self.assertTrue(pd.isna(result["ann_date"][1]))
+        self.assertEqual(result["close"].dtype, np.float32)
+        self.assertEqual(result["vol"].dtype, np.float64)
+        self.assertIsInstance(result["ts_code"].dtype, pd.CategoricalDtype)
+        self.assertEqual(result["name"].tolist(), ["a", "b", "c"])
+        self.assertLess(result.memory_usage(deep=True).sum(), data.memory_usage(deep=True).sum())
+        # 原数据不变
+        self.assertEqual(data["trade_date"].tolist(), ["20240102", "20240103", "20240104"])
+
+    def test_keep_unconvertible_columns(self):
+        """测试有无法转换的值时该列保持原样"""
+        data = pd.DataFrame({"trade_date": ["20240102", "unknown"], "vol": [1.5, 2.0], "pe": ["-", "1.2"]})
+        result = coerce_dtypes(data, {"trade_date": "int", "vol": "int", "pe": "double"})
+        self.assertEqual(result["trade_date"].tolist(), ["20240102", "unknown"])
+        self.assertEqual(result["vol"].tolist(), [1.5, 2.0])
+        self.assertEqual(result["pe"].tolist(), ["-", "1.2"])
+
+    def test_keep_out_of_range_columns(self):
+        """测试超出整数类型范围或 unsigned 字段有负数时该列保持原样, 不溢出"""
+        data = pd.DataFrame({"vol": [3e9, 1.0], "num": [-1, 2], "amount": [3e9, None], "big": [2 ** 63 - 1, 0]})
+        result = coerce_dtypes(data, {"vol": "int", "num": "int unsigned", "amount": "int unsigned", "big": "bigint"})
+        self.assertEqual(result["vol"].tolist(), [3e9, 1.0])
+        self.assertEqual(result["num"].tolist(), [-1, 2])
+        self.assertEqual(str(result["amount"].dtype), "Int64")
+        self.assertEqual(result["amount"][0], 3000000000)
+        self.assertEqual(result["big"].dtype, np.int64)
+        self.assertEqual(result["big"][0], 2 ** 63 - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+from utils import factors
+from utils.factors import COLUMNS, compute_factors, reconcile
+from utils.tushare_sync import TushareSync
+
+
+def random_daily(codes, days, split=None):
+    """
+    随机日线, split 之后的日期复权因子翻倍（除权）
+    """
+    rng = np.random.default_rng(0)
+    frames = []
+    for code in codes:
+        close = 20 + np.cumsum(rng.normal(0, 0.2, days))
+        dates = np.arange(days) + 20200101
+        frames.append(pd.DataFrame({
+            "ts_code": code, "trade_date": dates, "open": close, "high": close + 0.3, "low": close - 0.3,
+            "close": close, "pre_close": np.concatenate([[close[0]], close[:-1]]), "change": 0.0, "pct_chg": 0.0,
+            "vol": 100.0, "amount": 1000.0,
+            "adj_factor": np.where(dates > split, 2.0, 1.0) if split else 1.0}))
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestFactors(unittest.TestCase):
+    def test_compute_factors(self):
+        """测试 MA / MACD / KDJ 与逐只股票按定义计算的结果一致, 字段与 stk_factor_pro 相同"""
+        data = random_daily(["a", "b"], 300, split=20200201)
+        result = compute_factors(data.sample(frac=1, random_state=1))
+        self.assertEqual(list(result.columns), COLUMNS)
+        self.assertTrue(result["pe_ttm"].isna().all())
+
+        for _, group in result.groupby("ts_code"):
+            close = group["close_qfq"]
+            self.assertEqual(group["ma_qfq_20"].isna().sum(), 19)
+            np.testing.assert_allclose(group["ma_qfq_20"].dropna(), close.rolling(20).mean().dropna())
+
+            dif = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+            dea = dif.ewm(span=9, adjust=False).mean()
+            np.testing.assert_allclose(group["macd_qfq"], (dif - dea) * 2)
+
+            highest = group["high_qfq"].rolling(9, min_periods=1).max()
+            lowest = group["low_qfq"].rolling(9, min_periods=1).min()
+            k, d, expected_k, expected_d = 50.0, 50.0, [], []
+            for rsv in ((close - lowest) / (highest - lowest) * 100):
+                k = (2 * k + rsv) / 3
+                d = (2 * d + k) / 3
+                expected_k.append(k)
+                expected_d.append(d)
+            np.testing.assert_allclose(group["kdj_k_qfq"], expected_k)
+            np.testing.assert_allclose(group["kdj_qfq"], 3 * np.array(expected_k) - 2 * np.array(expected_d))
+
+        # 前复权以最新因子为基准, 除权前的价格减半
+        first = result[(result["ts_code"] == "a") & (result["trade_date"] == 20200101)].iloc[0]
+        self.assertAlmostEqual(first["close_qfq"], data["close"].iloc[0] / 2)
+        self.assertAlmostEqual(first["pre_close_qfq"], data["pre_close"].iloc[0] / 2)
+
+    def test_warmup_window(self):
+        """测试只用预热窗口计算的新日期与全量计算一致"""
+        data = random_daily(["a", "b"], 700)
+        full = compute_factors(data)
+        warm = compute_factors(data[data["trade_date"] >= 20200101 + 700 - factors.WARMUP_DAYS])
+        merged = full.merge(warm, on=["ts_code", "trade_date"], suffixes=("_full", "_warm"))
+        merged = merged[merged["trade_date"] == merged["trade_date"].max()]
+        for name in factors.FACTOR_COLUMNS:
+            np.testing.assert_allclose(merged[f"{name}_warm"], merged[f"{name}_full"], rtol=1e-8)
+
+    def test_reconcile(self):
+        """测试核对报告按字段统计核对条数、不一致条数和最大误差, 两边任一为空的值不参与核对"""
+        local = compute_factors(random_daily(["a"], 30))
+        remote = local.copy()
+        remote.loc[remote.index[-1], "macd_qfq"] += 1
+        remote.loc[remote.index[-2], "close_qfq"] += 0.005
+        report = reconcile(local, remote).set_index("column")
+        self.assertEqual(report.loc["macd_qfq", "mismatched"], 1)
+        self.assertAlmostEqual(report.loc["macd_qfq", "max_abs_diff"], 1)
+        self.assertEqual(report.loc["close_qfq", "mismatched"], 0)
+        self.assertEqual(report.loc["ma_qfq_5", "compared"], 26)
+        self.assertNotIn("pe_ttm", report.index)
+
+    def test_refresh_incremental(self):
+        """测试增量计算: 读取预热窗口, 只写入最大日期之后的记录, 因子变化的股票重算"""
+        sync = MagicMock()
+        sync._table_exist.return_value = True
+        sync.table_name = "stk_factor_pro"
+        sync._fetch_one_from_db.side_effect = [20200130, 20200131, 20200131, 20200105]
+        data = random_daily(["a", "b"], 31)
+        data.loc[(data["ts_code"] == "b") & (data["trade_date"] == 20200131), "adj_factor"] = 1.5
+        with patch.object(factors, "latest_factors", return_value={"a": 1.0, "b": 1.0}), \
+                patch.object(factors, "read_daily", return_value=data) as read, \
+                patch.object(factors, "_write") as write, \
+                patch.object(factors, "_recompute", return_value=31) as recompute:
+            self.assertEqual(factors.refresh(sync), 32)
+        sync.create_table.assert_called_once_with(drop_exist=False)
+        read.assert_called_once_with(sync, "trade_date>='20200105' AND trade_date<='20200131'", factors.DAILY_COLUMNS)
+        written = write.call_args[0][1]
+        self.assertEqual(written[["ts_code", "trade_date"]].values.tolist(), [["a", 20200131]])
+        recompute.assert_called_once_with(sync, ["b"], delete=True, end_date="20200131")
+
+    def test_refresh_fills_holes(self):
+        """测试最大日期之前补上的日线: 从缺失日期的预热窗口读取, 删除并写入该股票自该日起的记录"""
+        sync = MagicMock()
+        sync._table_exist.return_value = True
+        sync.table_name = "stk_factor_pro"
+        sync._fetch_one_from_db.side_effect = [20200131, 20200131, 20200131]
+        data = random_daily(["a"], 31)
+        with patch.object(factors, "find_holes", return_value={"a": 20200110}), \
+                patch.object(factors, "warmup_start", return_value=20200101) as warmup, \
+                patch.object(factors, "read_daily", return_value=data) as read, \
+                patch.object(factors, "_write") as write:
+            self.assertEqual(factors.refresh(sync), 22)
+        warmup.assert_called_once_with(sync, "20200110")
+        read.assert_called_once_with(sync, "ts_code IN ('a') AND trade_date<='20200131' AND trade_date>='20200101'",
+                                     factors.DAILY_COLUMNS)
+        sync.exec_sql.assert_called_once_with(
+            "DELETE FROM stk_factor_pro WHERE ts_code IN ('a') AND trade_date<='20200131' AND trade_date>='20200110'")
+        written = write.call_args[0][1]
+        expected = compute_factors(data)
+        pd.testing.assert_frame_equal(written.reset_index(drop=True),
+                                      expected[expected["trade_date"] >= 20200110].reset_index(drop=True))
+
+    def test_local_factors_flag(self):
+        """测试 local_factors 默认关闭, 开启后 sync 由本地计算, 不调用 Tushare"""
+        with patch.object(TushareSync, "sql_folder", return_value="sql"):
+            sync = TushareSync("stk_factor_pro")
+        self.assertFalse(sync.local_factors)
+        sync.local_factors = True
+        with patch("utils.tushare_sync.refresh_factors") as refresh, \
+                patch.object(sync, "incremental_sync") as incremental, \
+                patch("utils.tushare_sync.write_report", return_value=None):
+            sync.sync()
+        refresh.assert_called_once_with(sync, rebuild=False)
+        incremental.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
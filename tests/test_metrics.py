@@ -0,0 +1,58 @@
+import json
+import os
+import pstats
+import tempfile
+import unittest
+
+from utils.metrics import SyncMetrics, profile
+from helpers import FakeClock
+
+
+class TestSyncMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.clock = FakeClock(100.0)
+        self.metrics = SyncMetrics(clock=self.clock)
+        self.metrics.inc("calls", "daily", "daily", 2)
+        self.metrics.inc("rows", "daily", "daily", 6000)
+        with self.metrics.timer("fetch_seconds", "daily", "daily"):
+            self.clock.now += 0.3
+        self.metrics.observe("fetch_seconds", "daily", "daily", 20)
+        self.metrics.inc("calls", "money_flow", "moneyflow")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_json_report(self):
+        """测试 JSON 运行报告按表和接口汇总计数器与耗时"""
+        path = os.path.join(self.tmp_dir.name, "metrics.json")
+        self.metrics.write(path)
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+        daily = report["tables"][0]
+        self.assertEqual((daily["table"], daily["api"], daily["calls"], daily["rows"]), ("daily", "daily", 2, 6000))
+        self.assertEqual(daily["fetch_seconds"], {"count": 2, "sum": 20.3, "max": 20.0, "avg": 10.15})
+        self.assertEqual(report["tables"][1]["api"], "moneyflow")
+
+    def test_prometheus_textfile(self):
+        """测试 Prometheus textfile 格式, 分桶计数累计"""
+        text = self.metrics.to_prometheus()
+        self.assertIn('tushare_sync_calls_total{table="daily",api="daily"} 2', text)
+        self.assertIn('tushare_sync_fetch_seconds_bucket{table="daily",api="daily",le="0.5"} 1', text)
+        self.assertIn('tushare_sync_fetch_seconds_bucket{table="daily",api="daily",le="30"} 2', text)
+        self.assertIn('tushare_sync_fetch_seconds_bucket{table="daily",api="daily",le="+Inf"} 2', text)
+        self.assertIn('tushare_sync_fetch_seconds_count{table="daily",api="daily"} 2', text)
+
+    def test_cprofile(self):
+        """测试 cProfile 剖析结果写入文件"""
+        path = os.path.join(self.tmp_dir.name, "profile.prof")
+        with profile("cprofile", path):
+            sorted(range(1000), reverse=True)
+        self.assertGreater(pstats.Stats(path).total_calls, 0)
+        with self.assertRaises(Exception):
+            with profile("perf", path):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+
+from utils import concurrency
+from utils.orchestrator import SyncTask, run_tasks
+
+
+class TestOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.order = []
+        self.lock = threading.Lock()
+
+    def make(self, name, seconds=0.0, error=None):
+        def func(drop_exist):
+            time.sleep(seconds)
+            if error:
+                raise Exception(error)
+            with self.lock:
+                self.order.append(name)
+        return func
+
+    def test_dependencies(self):
+        """测试依赖的表完成后才开始同步, 不在任务列表中的依赖视为已满足"""
+        tasks = [
+            SyncTask("daily", self.make("daily"), depends=["trade_cal"]),
+            SyncTask("trade_cal", self.make("trade_cal", 0.05)),
+            SyncTask("fina_mainbz", self.make("fina_mainbz"), depends=["stock_basic"]),
+        ]
+        elapsed = run_tasks(tasks, workers=3)
+        self.assertEqual(set(elapsed), {"daily", "trade_cal", "fina_mainbz"})
+        self.assertLess(self.order.index("trade_cal"), self.order.index("daily"))
+
+    def test_parallel(self):
+        """测试多个任务并行执行, 总耗时接近最慢的任务"""
+        tasks = [SyncTask(f"t{i}", self.make(f"t{i}", 0.2)) for i in range(4)]
+        start = time.time()
+        run_tasks(tasks, workers=4)
+        self.assertLess(time.time() - start, 0.6)
+
+    def test_failure_skips_dependents(self):
+        """测试任务失败时跳过依赖它的任务, 其余任务继续执行"""
+        tasks = [
+            SyncTask("trade_cal", self.make("trade_cal", error="boom")),
+            SyncTask("daily", self.make("daily"), depends=["trade_cal"]),
+            SyncTask("name_change", self.make("name_change")),
+        ]
+        with self.assertRaises(Exception) as ctx:
+            run_tasks(tasks, workers=2)
+        self.assertIn("trade_cal", str(ctx.exception))
+        self.assertIn("daily", str(ctx.exception))
+        self.assertEqual(self.order, ["name_change"])
+
+
+class TestConcurrency(unittest.TestCase):
+    def tearDown(self):
+        concurrency.configure()
+
+    def test_slot_limit(self):
+        """测试同时占用的连接名额不超过上限"""
+        concurrency.configure(tushare=2)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def work():
+            with concurrency.slot(concurrency.TUSHARE):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.05)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(peak[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils.parquet_sink import partition_keys, merge_partition, available, ParquetSink
+
+
+class TestParquetSink(unittest.TestCase):
+    def test_partition_keys(self):
+        """测试按年月分区"""
+        data = pd.DataFrame({"trade_date": ["20231229", "2024-01-02", 20240201]})
+        years, months = partition_keys(data, "trade_date")
+        self.assertEqual(list(zip(years, months)), [("2023", "12"), ("2024", "01"), ("2024", "02")])
+
+    def test_merge_partition(self):
+        """测试重新同步的日期覆盖旧数据, 本次已写出的日期保留"""
+        existing = pd.DataFrame({"ts_code": ["a", "a", "b"], "trade_date": ["20240102", "20240103", "20240103"]})
+        new = pd.DataFrame({"ts_code": ["c"], "trade_date": ["20240103"]})
+
+        merged = merge_partition(existing, new, "trade_date")
+        self.assertEqual(list(merged["ts_code"]), ["a", "c"])
+
+        merged = merge_partition(existing, new, "trade_date", keep_dates={"20240103"})
+        self.assertEqual(list(merged["ts_code"]), ["a", "a", "b", "c"])
+
+    def test_merge_partition_by_ts_code(self):
+        """测试按 (日期, ts_code) 覆盖时只替换重新抓取的股票, 同日其他股票保留"""
+        existing = pd.DataFrame({"ts_code": ["a", "b", "b"], "trade_date": ["20240103", "20240102", "20240103"],
+                                 "close": [1.0, 2.0, 3.0]})
+        new = pd.DataFrame({"ts_code": ["b"], "trade_date": ["20240103"], "close": [4.0]})
+        merged = merge_partition(existing, new, "trade_date", key_columns=["trade_date", "ts_code"])
+        self.assertEqual(merged[["ts_code", "close"]].values.tolist(), [["b", 2.0], ["a", 1.0], ["b", 4.0]])
+
+    @unittest.skipUnless(available(), "未安装 pyarrow")
+    def test_write_partitions(self):
+        """测试只重写涉及的分区"""
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as root:
+            sink = ParquetSink(root, "daily", ["ts_code", "trade_date", "close"], "trade_date")
+            sink.write(pd.DataFrame({"ts_code": ["a", "a"], "trade_date": ["20231229", "20240102"],
+                                     "close": [1.0, 2.0], "extra": [0, 0]}))
+            sink.close()
+
+            sink.write(pd.DataFrame({"ts_code": ["a"], "trade_date": ["20240102"], "close": [3.0]}))
+            sink.close()
+
+            dec = pq.read_table(os.path.join(root, "daily", "year=2023", "month=12", "part-0.parquet")).to_pandas()
+            jan = pq.read_table(os.path.join(root, "daily", "year=2024", "month=01", "part-0.parquet")).to_pandas()
+            self.assertEqual(list(dec.columns), ["ts_code", "trade_date", "close"])
+            self.assertEqual(list(dec["close"]), [1.0])
+            self.assertEqual(list(jan["close"]), [3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from utils.partition import partition_date_range, missing_partitions_sql, PartitionBackfill
+
+TABLE_SQL = """
+CREATE TABLE `weekly`
+(
+    `ts_code`    varchar(16) DEFAULT NULL COMMENT '股票代码',
+    `trade_date` int         DEFAULT NULL COMMENT '交易日期',
+    UNIQUE KEY `weekly_ts_code_idx` (`ts_code`, `trade_date`) USING BTREE,
+    KEY `weekly_trade_date_idx` (`trade_date`) USING BTREE
+) ENGINE = InnoDB
+    /*!50100 PARTITION BY RANGE (`trade_date`)
+    (PARTITION p2022 VALUES LESS THAN (20221231) ENGINE = InnoDB,
+    PARTITION p2023 VALUES LESS THAN (20231231) ENGINE = InnoDB) */;
+"""
+
+PARTITIONS = [("p2022", "20221231"), ("p2023", "20231231")]
+
+
+class TestPartition(unittest.TestCase):
+    def test_partition_date_range(self):
+        """测试分区日期范围: pYYYY 包含 [上一分区上界, YYYY1231)"""
+        self.assertEqual(partition_date_range(PARTITIONS, "p2023"), ("20221231", "20231230"))
+        self.assertEqual(partition_date_range(PARTITIONS, "p2022"), ("19700101", "20221230"))
+        with self.assertRaises(Exception):
+            partition_date_range(PARTITIONS, "p2024")
+
+    def test_missing_partitions_sql(self):
+        """测试追加未来年份的分区"""
+        self.assertEqual(
+            missing_partitions_sql("weekly", PARTITIONS, 2024),
+            ["ALTER TABLE `weekly` ADD PARTITION (PARTITION p2024 VALUES LESS THAN (20241231), "
+             "PARTITION p2025 VALUES LESS THAN (20251231))"])
+        self.assertEqual(missing_partitions_sql("weekly", PARTITIONS + [("p2025", "20251231")], 2024), [])
+        self.assertEqual(missing_partitions_sql("weekly", PARTITIONS + [("pmax", "MAXVALUE")], 2030), [])
+        self.assertEqual(missing_partitions_sql("daily", [], 2030), [])
+
+    def test_backfill_statements(self):
+        """测试孪生表去掉分区和二级索引, 补建索引后交换分区并删除孪生表"""
+        executed = []
+        backfill = PartitionBackfill("weekly", TABLE_SQL, executed.append, lambda sql: PARTITIONS)
+        self.assertEqual(backfill.date_range(2023), ("20221231", "20231230"))
+        self.assertEqual(backfill.prepare(2023), "weekly__p2023")
+        backfill.finish(2023)
+        self.assertEqual(executed, [
+            "DROP TABLE IF EXISTS `weekly__p2023`",
+            "CREATE TABLE `weekly__p2023` LIKE `weekly`",
+            "ALTER TABLE `weekly__p2023` REMOVE PARTITIONING",
+            "ALTER TABLE `weekly__p2023` DROP INDEX `weekly_ts_code_idx`, DROP INDEX `weekly_trade_date_idx`",
+            "ALTER TABLE `weekly__p2023` ADD UNIQUE KEY `weekly_ts_code_idx` (`ts_code`, `trade_date`) USING BTREE, "
+            "ADD KEY `weekly_trade_date_idx` (`trade_date`) USING BTREE",
+            "ALTER TABLE `weekly` EXCHANGE PARTITION p2023 WITH TABLE `weekly__p2023`",
+            "DROP TABLE IF EXISTS `weekly__p2023`",
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
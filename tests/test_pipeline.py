@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+
+from utils.pipeline import FetchWritePipeline
+
+
+class TestFetchWritePipeline(unittest.TestCase):
+    def test_ordered_completion(self):
+        """测试单元完成回调按抓取顺序执行"""
+        def write(page):
+            # 第一天的数据写得最慢
+            time.sleep(0.05 if page[0] == "d1" else 0)
+            return len(page)
+
+        units = [("d1", [["d1"] * 3]), ("d2", [["d2"] * 2, ["d2"]]), ("d3", [])]
+        done = []
+        total = FetchWritePipeline(write, workers=3).run(units, lambda key, rows: done.append((key, rows)))
+
+        self.assertEqual(done, [("d1", 3), ("d2", 3), ("d3", 0)])
+        self.assertEqual(total, 6)
+
+    def test_backpressure(self):
+        """测试队列满时抓取端阻塞"""
+        release = threading.Event()
+        fetched = []
+
+        def pages():
+            for i in range(10):
+                fetched.append(i)
+                yield [i]
+
+        def write(page):
+            release.wait()
+            return 1
+
+        pipeline = FetchWritePipeline(write, workers=1, queue_size=2)
+        t = threading.Thread(target=pipeline.run, args=([("d1", pages())],))
+        t.start()
+        time.sleep(0.1)
+        # 1 页正在写, 2 页在队列中, 1 页等待入队
+        self.assertLessEqual(len(fetched), 4)
+        release.set()
+        t.join()
+        self.assertEqual(len(fetched), 10)
+
+    def test_write_error(self):
+        """测试写库异常会中止流水线并抛出"""
+        def write(page):
+            raise ValueError("db down")
+
+        with self.assertRaises(ValueError):
+            FetchWritePipeline(write).run([("d1", [[1], [2]]), ("d2", [[3]])])
+
+
+if __name__ == '__main__':
+    unittest.main()
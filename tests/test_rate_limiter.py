@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+
+from utils.rate_limiter import parse_quota, RateLimiter, get_rate_limiter
+from helpers import FakeClock
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        patcher_m = patch('utils.rate_limiter.time.monotonic', self.clock.monotonic)
+        patcher_s = patch('utils.rate_limiter.time.sleep', self.clock.sleep)
+        patcher_m.start()
+        patcher_s.start()
+        self.addCleanup(patcher_m.stop)
+        self.addCleanup(patcher_s.stop)
+
+    def test_parse_quota(self):
+        """测试配额解析"""
+        self.assertEqual(parse_quota("5/min, 10/hour"), [(5, 60), (10, 3600)])
+        self.assertEqual(parse_quota("2/min and 20/day"), [(2, 60), (20, 86400)])
+        self.assertEqual(parse_quota("3/10s"), [(3, 10)])
+        with self.assertRaises(Exception):
+            parse_quota("5/week")
+
+    def test_multi_window(self):
+        """测试多窗口配额: 5/min, 10/hour"""
+        limiter = RateLimiter.from_quota("5/min, 10/hour")
+        waits = [limiter.acquire() for _ in range(11)]
+
+        # 前 5 次无需等待, 第 6 次等到分钟窗口释放
+        self.assertEqual(waits[:5], [0.0] * 5)
+        self.assertEqual(waits[5], 60)
+        # 第 11 次受小时窗口限制
+        self.assertEqual(self.clock.now - 1000.0, 3600)
+
+    def test_interval_counts_response_time(self):
+        """测试按间隔限流时，响应耗时计入间隔"""
+        limiter = RateLimiter.from_interval(2)
+        limiter.acquire()
+        self.clock.now += 1.5  # 接口响应耗时
+        self.assertEqual(limiter.acquire(), 0.5)
+
+    def test_shared_limiter(self):
+        """测试同一接口共享限流器"""
+        self.assertIs(get_rate_limiter("cyq_perf", "5/min"), get_rate_limiter("cyq_perf", "5/min"))
+        self.assertEqual(RateLimiter.from_interval(0).acquire(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from utils.checkpoint import CheckpointJournal
+from utils.repair import find_gap_dates, find_missing_codes, listed_counts
+from utils.tushare_sync import TushareSync
+
+
+class TestRepair(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(TushareSync, "sql_folder", return_value="sql")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_listed_counts(self):
+        """测试按上市、退市日期统计每天在市的股票数, 退市当天仍计入"""
+        data = pd.DataFrame({"list_date": ["20240101", "20240103", None],
+                             "delist_date": [None, "20240104", None]})
+        counts = listed_counts(data, ["20240102", "20240104", "20240105"])
+        self.assertEqual(counts.to_dict(), {20240102: 2, 20240104: 3, 20240105: 2})
+
+    def test_find_gap_dates(self):
+        """测试没有记录的交易日为 missing, 记录数低于预期比例的为 short, 未声明比例时只检查缺失"""
+        counts = {"20240102": 100, 20240103: 50, 20240105: 95}
+        open_dates = ["20240102", "20240103", "20240104", "20240105"]
+        gaps = find_gap_dates(counts, open_dates, {20240102: 100, 20240103: 100, 20240104: 100, 20240105: 100}, 0.9)
+        self.assertEqual(gaps.values.tolist(), [[20240103, 50, 100, "short"], [20240104, 0, 100, "missing"]])
+
+        gaps = find_gap_dates(counts, open_dates)
+        self.assertEqual(gaps["date"].tolist(), [20240104])
+
+        # 之前修复时只抓取到 50 条（停牌）的日期不再算 short, 记录数减少后重新算
+        expected = {20240102: 100, 20240103: 100, 20240104: 100, 20240105: 100}
+        gaps = find_gap_dates(counts, open_dates, expected, 0.9, {"20240103": 50, "20240104": 80})
+        self.assertEqual(gaps["date"].tolist(), [20240104])
+        gaps = find_gap_dates(counts, open_dates, expected, 0.9, {"20240103": 60})
+        self.assertEqual(gaps["date"].tolist(), [20240103, 20240104])
+
+    def test_find_missing_codes(self):
+        """测试股票池中没有记录的股票, 保持股票池顺序"""
+        self.assertEqual(find_missing_codes({"b": 3, "c": 0}, ["c", "a", "b"]), ["c", "a"])
+
+    def test_repair_dates(self):
+        """测试按日抓取的表只重新抓取缺口日期, 记录偏少的日期先清理再抓取, 记录重新抓取到的记录数"""
+        sync = TushareSync("daily")
+        sync.repair_min_ratio = 0.9
+        sync.write_mode = "to_sql"
+        sync._logger = MagicMock()
+        sync._journal = MagicMock()
+        sync._journal.repaired_rows.return_value = {}
+        calendar = MagicMock()
+        calendar.open_dates.return_value = ["20240102", "20240103", "20240104"]
+        universe = MagicMock()
+        universe.data = pd.DataFrame({"list_date": ["20200101"] * 10, "delist_date": [None] * 10})
+        fetched = []
+
+        def pages(unit, offset=0):
+            fetched.append(unit)
+            yield unit, 0, pd.DataFrame({"ts_code": ["a"] * 10})
+
+        with patch.object(sync, "_table_exist", return_value=True), \
+                patch.object(sync, "_fetch_one_from_db", side_effect=[20240102, 20240104]), \
+                patch.object(sync, "_fetch_all_from_db", return_value=[(20240102, 10), (20240103, 5)]), \
+                patch.object(sync, "exec_sql") as exec_sql, \
+                patch.object(sync, "get_db_engine"), \
+                patch.object(sync, "_iter_day_pages", side_effect=pages), \
+                patch.object(sync, "_write_page", side_effect=lambda page: len(page[2])), \
+                patch("utils.tushare_sync.TradeCalendar", return_value=calendar), \
+                patch("utils.tushare_sync.get_universe", return_value=universe), \
+                patch.object(sync, "_repair_derived") as repair_derived:
+            self.assertEqual(sync.repair(), 20)
+        self.assertEqual(fetched, ["20240103", "20240104"])
+        exec_sql.assert_called_once_with("DELETE FROM daily WHERE trade_date='20240103'")
+        repair_derived.assert_called_once_with(["20240103", "20240104"])
+        self.assertEqual([call[0] for call in sync._journal.save_repaired_rows.call_args_list],
+                         [("daily", "20240103", 10), ("daily", "20240104", 10)])
+
+    def test_repair_ts_codes(self):
+        """测试按 ts_code 抓取的表只按日期窗口分批抓取没有记录的股票"""
+        sync = TushareSync("fina_indicator")
+        sync.ts_code_limit = 2
+        sync._logger = MagicMock()
+        universe = MagicMock()
+        universe.codes.return_value = ["a", "b", "c", "d"]
+        fetched = []
+
+        def pages(unit, offset=0):
+            fetched.append(sync._unit_params[unit])
+            return iter([])
+
+        sink = MagicMock()
+        with patch.object(sync, "_table_exist", return_value=True), \
+                patch.object(sync, "_fetch_all_from_db", return_value=[("b", 4)]), \
+                patch.object(sync, "_iter_day_pages", side_effect=pages), \
+                patch.object(sync, "get_parquet_sink", return_value=sink), \
+                patch("utils.tushare_sync.get_universe", return_value=universe), \
+                patch.object(sync, "_repair_derived") as repair_derived:
+            self.assertEqual(sync.repair("20230101", "20231231"), 0)
+        sink.close.assert_called_once()
+        repair_derived.assert_called_once_with([])
+        self.assertEqual(fetched, [{"start_date": "20230101", "end_date": "20231231", "ts_code": "a,c"},
+                                   {"start_date": "20230101", "end_date": "20231231", "ts_code": "d"}])
+
+    def test_repair_skips_non_increasing(self):
+        """测试非递增表跳过修复, 不查询缺口"""
+        sync = TushareSync("stock_basic")
+        sync._logger = MagicMock()
+        with patch.object(sync, "_table_exist", return_value=True), \
+                patch.object(sync, "_fetch_all_from_db") as fetch_all:
+            self.assertEqual(sync.repair(), 0)
+        fetch_all.assert_not_called()
+
+    def test_repair_derived(self):
+        """测试来源表修复后执行 post_sync, 为合成表记录修复日期并修复由其生成的表"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sync = TushareSync("daily")
+            sync._logger = MagicMock()
+            sync._journal = CheckpointJournal(os.path.join(tmp_dir, "sync_checkpoint.db"))
+            self.assertEqual(sync.derived_tables(), ["monthly", "weekly"])
+            with patch.object(sync, "run_post_sync") as post_sync, \
+                    patch.object(TushareSync, "_table_exist", return_value=True), \
+                    patch.object(TushareSync, "repair") as repair:
+                sync._repair_derived(["20240103"])
+            post_sync.assert_called_once()
+            self.assertEqual(repair.call_count, 2)
+            self.assertEqual(sync._journal.repaired_dates("weekly"), ["20240103"])
+            self.assertEqual(sync._journal.repaired_dates("monthly"), ["20240103"])
+
+    def test_repair_resampled(self):
+        """测试合成表重新合成修复日期所在的周期, 完成后清除记录; 没有修复日期时不合成"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sync = TushareSync("weekly")
+            sync._logger = MagicMock()
+            sync._journal = CheckpointJournal(os.path.join(tmp_dir, "sync_checkpoint.db"))
+            sync._journal.add_repaired_dates("weekly", ["20240103", "20240105", "20240131"])
+            with patch.object(sync, "_table_exist", return_value=True), \
+                    patch.object(sync, "get_db_engine"), \
+                    patch("utils.tushare_sync.TradeCalendar"), \
+                    patch.object(sync, "_write_resampled", return_value=5) as write:
+                self.assertEqual(sync.repair(), 10)
+                self.assertEqual([call[0][:2] for call in write.call_args_list],
+                                 [("20240101", "20240107"), ("20240129", "20240204")])
+                self.assertEqual(sync._journal.repaired_dates("weekly"), [])
+                self.assertEqual(sync.repair(), 0)
+
+        sync = TushareSync("monthly")
+        self.assertEqual(sync._period_end("20240201"), "20240229")
+        self.assertEqual(sync._period_end("20241201"), "20241231")
+
+
+if __name__ == '__main__':
+    unittest.main()
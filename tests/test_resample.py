@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from utils.resample import compare_bars, period_start, resample_bars
+from utils.trade_calendar import PERIOD_MONTH, PERIOD_WEEK, period_calendar
+from utils.tushare_sync import TushareSync
+
+OPEN_DATES = ["20231229", "20240102", "20240103", "20240104", "20240105", "20240108", "20240109"]
+
+
+def periods(period):
+    return period_calendar(pd.DataFrame({"cal_date": OPEN_DATES, "is_open": 1}), period)
+
+
+def daily_bars():
+    return pd.DataFrame({
+        "ts_code": ["000001.SZ"] * 5 + ["600000.SH"] * 2,
+        "trade_date": ["20231229", "20240102", "20240103", "20240105", "20240108", "20240102", "20240105"],
+        "open": [9.0, 10.0, 11.0, 12.0, 13.0, 5.0, 5.5],
+        "high": [9.5, 11.0, 12.5, 12.8, 13.5, 5.6, 6.0],
+        "low": [8.8, 9.8, 10.5, 11.5, 12.9, 4.9, 5.4],
+        "close": [10.0, 10.8, 12.0, 12.5, 13.2, 5.5, 5.9],
+        "pre_close": [9.0, 10.0, 10.8, 12.0, 12.5, 5.0, 5.5],
+        "vol": [1.0, 100.0, 200.0, 300.0, 50.0, 10.0, 20.0],
+        "amount": [1.0, 1000.0, 2000.0, 3000.0, 500.0, 50.0, 100.0],
+    })
+
+
+class TestResample(unittest.TestCase):
+    def test_periods(self):
+        """测试周期第一天, 周从周一开始"""
+        self.assertEqual(period_start("20240103", PERIOD_WEEK), "20240101")
+        self.assertEqual(period_start("20231231", PERIOD_WEEK), "20231225")
+        self.assertEqual(period_start("20240115", PERIOD_MONTH), "20240101")
+
+    def test_resample_week(self):
+        """测试由日线合成周线: 首日开盘、最高、最低、末日收盘、首日昨收、合计成交量; 未结束的周截至最新交易日"""
+        bars = resample_bars(daily_bars(), periods(PERIOD_WEEK), PERIOD_WEEK)
+        self.assertEqual(bars["trade_date"].tolist(), [20231229, 20240105, 20240108, 20240105])
+        week = bars.iloc[1]
+        self.assertEqual((week["open"], week["high"], week["low"], week["close"]), (10.0, 12.8, 9.8, 12.5))
+        self.assertEqual((week["pre_close"], week["vol"], week["amount"]), (10.0, 600.0, 6000.0))
+        self.assertAlmostEqual(week["change"], 2.5)
+        self.assertAlmostEqual(week["pct_chg"], 25.0)
+        # 600000.SH 周五停牌时 trade_date 仍为该周最后一个交易日
+        self.assertEqual(bars.iloc[3]["ts_code"], "600000.SH")
+
+    def test_resample_month(self):
+        """测试由日线合成月线"""
+        bars = resample_bars(daily_bars(), periods(PERIOD_MONTH), PERIOD_MONTH, as_of="20240109")
+        self.assertEqual(bars["trade_date"].tolist(), [20231229, 20240109, 20240109])
+        self.assertEqual(bars.iloc[1]["vol"], 650.0)
+        self.assertEqual(bars.iloc[1]["close"], 13.2)
+
+    def test_compare_bars(self):
+        """测试与接口数据比较: 误差范围内视为一致, 价格不同或只在一边存在的记录返回"""
+        local = resample_bars(daily_bars(), periods(PERIOD_WEEK), PERIOD_WEEK)
+        remote = local.copy()
+        remote.loc[0, "close"] += 0.001
+        self.assertEqual(len(compare_bars(local, remote)), 0)
+
+        remote.loc[1, "high"] = 13.0
+        remote = remote.drop(index=3)
+        diff = compare_bars(local, remote)
+        self.assertEqual(diff["trade_date"].tolist(), [20240105, 20240105])
+        self.assertEqual(diff.iloc[0]["high_remote"], 13.0)
+
+    def test_resample_chunks(self):
+        """测试合成范围按年切分, 切分点对齐到周一"""
+        with patch.object(TushareSync, "sql_folder", return_value="sql"):
+            sync = TushareSync("weekly")
+        self.assertEqual((sync.resample_from, sync.resample_period), ("daily", PERIOD_WEEK))
+        chunks = list(sync._iter_resample_chunks("20231225", "20250110"))
+        self.assertEqual(chunks, [("20231225", "20231231"), ("20240101", "20241229"), ("20241230", "20250110")])
+
+
+    def test_backfill_resampled(self):
+        """测试由日线合成的表整年回补时在本地合成, 只写入 trade_date 在分区范围内的记录, 不调用 Tushare"""
+        with patch.object(TushareSync, "sql_folder", return_value="sql"):
+            sync = TushareSync("weekly")
+        sync._logger = MagicMock()
+        backfill = MagicMock()
+        backfill.date_range.return_value = ("20240101", "20240107")
+        backfill.prepare.return_value = "weekly__p2024"
+        writer = MagicMock()
+        calendar = MagicMock()
+        calendar.period_calendar.return_value = periods(PERIOD_WEEK)
+        daily = daily_bars()
+        with patch.object(sync, "get_partition_backfill", return_value=backfill), \
+                patch.object(sync, "get_writer", return_value=writer), \
+                patch.object(sync, "get_db_engine"), \
+                patch.object(sync, "get_parquet_sink", return_value=None), \
+                patch.object(sync, "_fetch_all_from_db", return_value=daily.values.tolist()) as fetch, \
+                patch.object(sync, "_iter_day_pages") as pages, \
+                patch("utils.tushare_sync.TradeCalendar", return_value=calendar):
+            self.assertEqual(sync.backfill(2024), 2)
+        pages.assert_not_called()
+        self.assertIn("trade_date>='20240101' AND trade_date<='20240207'", fetch.call_args[0][0])
+        written = writer.write.call_args[0][2]
+        self.assertEqual(writer.write.call_args[0][1], "weekly__p2024")
+        self.assertEqual(written[["ts_code", "trade_date"]].astype(str).values.tolist(),
+                         [["000001.SZ", "20240105"], ["600000.SH", "20240105"]])
+        backfill.finish.assert_called_once_with(2024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from utils.response_cache import ResponseCache, expires_at
+from helpers import FakeClock
+
+FIELDS = ["ts_code", "close"]
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.clock = FakeClock(time.mktime((2024, 1, 10, 16, 0, 0, 0, 0, -1)))
+        self.data = pd.DataFrame({"ts_code": ["000001.SZ", "000002.SZ"], "close": [10.5, None]})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_expires_at(self):
+        """测试按交易日查询的已收盘数据永久有效, 当天、日期窗口、无日期参数和空结果短期有效"""
+        now = self.clock()
+        self.assertIsNone(expires_at({"trade_date": "20240109"}, self.data, now, 600))
+        self.assertEqual(expires_at({"trade_date": "20240110"}, self.data, now, 600), now + 600)
+        self.assertEqual(expires_at({"start_date": "20230101", "end_date": "20240110"}, self.data, now, 600), now + 600)
+        self.assertEqual(expires_at({"start_date": "20200101", "end_date": "20201231"}, self.data, now, 600), now + 600)
+        self.assertEqual(expires_at({"ann_date": "20200101"}, self.data, now, 600), now + 600)
+        self.assertEqual(expires_at({"list_status": "L"}, self.data, now, 600), now + 600)
+        self.assertEqual(expires_at({"trade_date": "20240109"}, self.data.iloc[:0], now, 600), now + 600)
+
+    def test_get_put(self):
+        """测试命中缓存, 当天数据过期后失效"""
+        cache = ResponseCache(self.tmp_dir.name, recent_ttl=600, clock=self.clock)
+        closed = {"trade_date": "20240109", "offset": 0, "limit": 100}
+        today = {"trade_date": "20240110", "offset": 0, "limit": 100}
+        self.assertIsNone(cache.get("daily", closed, FIELDS))
+        cache.put("daily", closed, FIELDS, self.data)
+        cache.put("daily", today, FIELDS, self.data)
+
+        cached = cache.get("daily", closed, FIELDS)
+        self.assertEqual(list(cached["ts_code"]), ["000001.SZ", "000002.SZ"])
+        self.assertTrue(pd.isna(cached["close"][1]))
+        self.assertIsNone(cache.get("daily", dict(closed, offset=100), FIELDS))
+
+        self.clock.now += 601
+        self.assertIsNone(cache.get("daily", today, FIELDS))
+        self.assertIsNotNone(cache.get("daily", closed, FIELDS))
+
+    def test_lru_eviction(self):
+        """测试超出大小上限时淘汰最久未访问的数据"""
+        cache = ResponseCache(self.tmp_dir.name, clock=self.clock)
+        for date in ("20240102", "20240103"):
+            cache.put("daily", {"trade_date": date}, FIELDS, self.data)
+            self.clock.now += 1
+        # 访问 20240102, 20240103 成为最久未访问的数据
+        cache.get("daily", {"trade_date": "20240102"}, FIELDS)
+        self.clock.now += 1
+
+        cache.max_size = cache.size()
+        cache.put("daily", {"trade_date": "20240104"}, FIELDS, self.data)
+        self.assertIsNone(cache.get("daily", {"trade_date": "20240103"}, FIELDS))
+        self.assertIsNotNone(cache.get("daily", {"trade_date": "20240102"}, FIELDS))
+        self.assertIsNotNone(cache.get("daily", {"trade_date": "20240104"}, FIELDS))
+        self.assertLessEqual(cache.size(), cache.max_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from utils.shadow_load import build_staging_sql, swap_sql, ShadowLoader
+
+TABLE_SQL = """
+-- is_increasing: False
+DROP TABLE IF EXISTS `stock_basic`;
+CREATE TABLE `stock_basic`
+(
+    `ts_code` varchar(16) DEFAULT NULL COMMENT 'TS代码(含后缀, 如 000001.SZ)',
+    `name`    varchar(64) DEFAULT NULL COMMENT '名称',
+    PRIMARY KEY (`ts_code`),
+    KEY `stock_basic_name` (`name`, `ts_code`) USING BTREE
+) ENGINE = InnoDB COMMENT ='基础信息';
+"""
+
+
+class TestShadowLoad(unittest.TestCase):
+    def test_build_staging_sql(self):
+        """测试 staging 建表语句: 改表名, 推迟二级索引, 保留主键"""
+        create_sql, index_sql = build_staging_sql(TABLE_SQL, "stock_basic")
+        self.assertTrue(create_sql.startswith("CREATE TABLE `stock_basic__staging` ("))
+        self.assertIn("COMMENT 'TS代码(含后缀, 如 000001.SZ)'", create_sql)
+        self.assertIn("PRIMARY KEY (`ts_code`)\n) ENGINE = InnoDB COMMENT ='基础信息'", create_sql)
+        self.assertNotIn("stock_basic_name", create_sql)
+        self.assertEqual(index_sql,
+                         "ALTER TABLE `stock_basic__staging` ADD KEY `stock_basic_name` (`name`, `ts_code`) USING BTREE")
+
+        create_sql, index_sql = build_staging_sql(TABLE_SQL, "stock_basic", defer_indexes=False)
+        self.assertIn("stock_basic_name", create_sql)
+        self.assertEqual(index_sql, "")
+
+    def test_swap_sql(self):
+        """测试原子切换语句"""
+        self.assertEqual(swap_sql("stock_basic", False), ["RENAME TABLE `stock_basic__staging` TO `stock_basic`"])
+        self.assertIn("RENAME TABLE `stock_basic` TO `stock_basic__old`, `stock_basic__staging` TO `stock_basic`",
+                      swap_sql("stock_basic", True))
+
+    def test_failed_index_keeps_live_table(self):
+        """测试补建索引失败时删除 staging 表, 不切换线上表"""
+        executed = []
+
+        def exec_sql(sql):
+            executed.append(sql)
+            if sql.startswith("ALTER TABLE"):
+                raise Exception("Duplicate entry")
+
+        loader = ShadowLoader("stock_basic", TABLE_SQL, exec_sql, lambda name: True)
+        self.assertEqual(loader.prepare(), "stock_basic__staging")
+        with self.assertRaises(Exception):
+            loader.finish()
+        self.assertFalse(any(sql.startswith("RENAME") for sql in executed))
+        self.assertEqual(executed[-1], "DROP TABLE IF EXISTS `stock_basic__staging`")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from utils.tushare_sync import TushareSync
+
+
+class TestSyncUnits(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(TushareSync, "sql_folder", return_value="sql")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_flags(self):
+        """测试各表 SQL 脚本中声明的抓取方式、开始日期和参数"""
+        sync = TushareSync("fina_mainbz")
+        self.assertEqual(sync.iteration, TushareSync.ITERATION_TS_CODE)
+        self.assertEqual((sync.date_column, sync.date_step, sync.ts_code_limit), ("end_date", 3650, 1))
+        self.assertEqual((sync.BEGIN_DATE, sync.quota), ("20000101", "60/min"))
+        self.assertFalse(sync.trade_days_only)
+
+        sync = TushareSync("money_flow")
+        self.assertEqual((sync.api_name, sync.iteration, sync.BEGIN_DATE), ("moneyflow", TushareSync.ITERATION_DAY, "19901219"))
+        self.assertTrue(sync.trade_days_only)
+        self.assertFalse(TushareSync("express").trade_days_only)
+
+        sync = TushareSync("hs_const")
+        self.assertFalse(sync.is_increasing)
+        self.assertEqual(len(sync.extra_params), 4)
+        self.assertEqual(sync.extra_params[0], {"hs_type": "SZ", "is_new": "0"})
+
+    def test_window_units(self):
+        """测试按 date_step 切分日期窗口, 查询参数为 start_date / end_date"""
+        sync = TushareSync("daily")
+        sync.iteration, sync.date_step = TushareSync.ITERATION_WINDOW, 10
+        units = list(sync._iter_sync_units("20240101", "20240125"))
+        self.assertEqual(units, ["20240101-20240110", "20240111-20240120", "20240121-20240125"])
+        self.assertEqual(sync._unit_params["20240121-20240125"], {"start_date": "20240121", "end_date": "20240125"})
+
+    def test_ts_code_units(self):
+        """测试按日期窗口 + ts_code 批次生成同步单元, 批次按股票池和历史条数规划"""
+        sync = TushareSync("fina_indicator")
+        sync.date_step, sync.ts_code_limit = 366, 2
+        sync._logger = MagicMock()
+        universe = MagicMock()
+        universe.codes.return_value = ["000001.SZ", "000002.SZ", "600000.SH"]
+        history = MagicMock()
+        history.rates.return_value = {}
+        with patch("utils.tushare_sync.get_universe", return_value=universe), \
+                patch("utils.tushare_sync.get_row_count_history", return_value=history):
+            units = list(sync._iter_sync_units("20240101", "20241231"))
+
+        self.assertEqual(units, ["20240101-20241231|000001.SZ~000002.SZ", "20240101-20241231|600000.SH~600000.SH"])
+        universe.codes.assert_called_once_with(start_date="20240101", end_date="20241231")
+        history.rates.assert_called_once_with("fina_indicator")
+        self.assertEqual(sync._unit_params[units[0]]["ts_code"], "000001.SZ,000002.SZ")
+
+        with patch.object(sync, "query_tushare_params", return_value=pd.DataFrame()) as query:
+            sync._query_unit(units[1], 0)
+        query.assert_called_once_with({"start_date": "20240101", "end_date": "20241231", "ts_code": "600000.SH"},
+                                      offset=0)
+
+    def test_resume_cleans_pending_units(self):
+        """测试续传时未完成的单元先清理已写入的数据再从头抓取, upsert 时从记录的 offset 继续"""
+        sync = TushareSync("daily")
+        sync._logger = MagicMock()
+        sync._checkpoint_run = True
+        sync.write_mode = "to_sql"
+        journal = MagicMock()
+        journal.unit_state.side_effect = lambda table, unit: {"20240102": (5000, True), "20240103": (3000, False)}.get(
+            unit, (0, False))
+        with patch.object(sync, "_iter_sync_units", return_value=["20240102", "20240103", "20240104"]), \
+                patch.object(sync, "get_journal", return_value=journal), \
+                patch.object(sync, "exec_sql") as exec_sql:
+            self.assertEqual(list(sync._iter_pending_dates("20240102", "20240104", resume=True)),
+                             [("20240103", 0), ("20240104", 0)])
+            self.assertEqual(exec_sql.call_args_list[0][0][0], "DELETE FROM daily WHERE trade_date='20240103'")
+            self.assertEqual(exec_sql.call_count, 2)
+
+            sync._writer = None
+            sync.write_mode = "upsert"
+            exec_sql.reset_mock()
+            self.assertEqual(list(sync._iter_pending_dates("20240102", "20240104", resume=True)),
+                             [("20240103", 3000), ("20240104", 0)])
+            exec_sql.assert_not_called()
+
+        sync._unit_params["20240101-20241231|a~b"] = {"start_date": "20240101", "end_date": "20241231", "ts_code": "a,b"}
+        self.assertEqual(sync._unit_delete_sql("20240101-20241231|a~b"),
+                         "DELETE FROM daily WHERE trade_date>='20240101' AND trade_date<='20241231' "
+                         "AND ts_code IN ('a','b')")
+
+    def test_update_pages_each_param_set(self):
+        """测试 update 按每组 extra_params 分页抓取, 不足一页时结束"""
+        sync = TushareSync("hs_const")
+        sync.limit = 2
+        pages = {("SZ", "0"): [2, 1], ("SZ", "1"): [0], ("SH", "0"): [2, 0], ("SH", "1"): [1]}
+        calls = []
+
+        def query(params, offset=0):
+            calls.append((params["hs_type"], params["is_new"], offset))
+            rows = pages[(params["hs_type"], params["is_new"])].pop(0)
+            return pd.DataFrame({"ts_code": [params["hs_type"]] * rows})
+
+        with patch.object(sync, "query_tushare_params", side_effect=query):
+            data = sync._query_all()
+        self.assertEqual(len(data), 6)
+        self.assertEqual(calls, [("SZ", "0", 0), ("SZ", "0", 2), ("SZ", "1", 0),
+                                 ("SH", "0", 0), ("SH", "0", 2), ("SH", "1", 0)])
+
+        with patch.object(sync, "query_tushare_params", return_value=None):
+            with self.assertRaises(Exception):
+                sync._query_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
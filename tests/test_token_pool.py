@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from utils.token_pool import TokenClient, TokenPool, is_auth_error
+from helpers import FakeClock
+
+
+class TestTokenPool(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        for target in ('utils.rate_limiter.time.monotonic', 'utils.token_pool.time.monotonic'):
+            patcher = patch(target, self.clock.monotonic)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch('utils.token_pool.time.sleep', self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_pool(self, count, api_name):
+        # 每个用例使用不同的接口名, 避免共用进程内的限流器
+        clients = [TokenClient(f"{api_name}-token{i}", MagicMock()) for i in range(count)]
+        return TokenPool(clients, clock=self.clock.monotonic)
+
+    def test_scale_with_tokens(self):
+        """测试调用分配给剩余配额最多的 token, 吞吐量随 token 数线性增加"""
+        pool = self.make_pool(3, "pool_scale")
+        names = [pool.acquire("cyq_chips", quota="2/min").name for _ in range(6)]
+        self.assertEqual(self.clock.now, 1000.0)
+        self.assertEqual(sorted(names), sorted([client.name for client in pool.clients] * 2))
+
+        # 全部 token 用完配额后等待窗口释放
+        pool.acquire("cyq_chips", quota="2/min")
+        self.assertEqual(self.clock.now, 1060.0)
+
+    def test_health(self):
+        """测试配额错误冷却该接口, token 无效时停用, 全部停用后抛出异常"""
+        pool = self.make_pool(2, "pool_health")
+        first, second = pool.clients
+        first.api.query.side_effect = Exception("抱歉，您每分钟最多访问该接口5次")
+        with self.assertRaises(Exception):
+            pool.call(first, "cyq_chips", {}, [])
+        self.assertEqual({pool.acquire("cyq_chips").name for _ in range(3)}, {second.name})
+        self.assertEqual(pool.acquire("daily").name, first.name)
+
+        self.assertTrue(is_auth_error(Exception("您的token不对，请确认。")))
+        second.api.query.side_effect = Exception("您的token不对，请确认。")
+        with self.assertRaises(Exception):
+            pool.call(second, "daily", {}, [])
+        self.assertTrue(second.disabled)
+        first.disabled = True
+        with self.assertRaises(Exception):
+            pool.acquire("daily")
+
+
+if __name__ == '__main__':
+    unittest.main()
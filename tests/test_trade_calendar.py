@@ -0,0 +1,64 @@
+import unittest
+
+import pandas as pd
+import sqlalchemy
+
+from utils.trade_calendar import PERIOD_MONTH, PERIOD_WEEK, TradeCalendar, clear_cache, period_calendar
+
+
+class TestTradeCalendar(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+        self.engine = sqlalchemy.create_engine("sqlite://")
+        with self.engine.begin() as conn:
+            conn.execute(sqlalchemy.text(
+                "CREATE TABLE trade_cal (exchange varchar(64), cal_date int, is_open varchar(64))"))
+            # 2024-01-05 周五开市, 01-06/07 周末休市, 01-08 周一开市
+            for cal_date, is_open in [(20240105, "1"), (20240106, "0"), (20240107, "0"), (20240108, "1")]:
+                conn.execute(sqlalchemy.text("INSERT INTO trade_cal VALUES ('SSE', :d, :o)"),
+                             {"d": cal_date, "o": is_open})
+
+    def tearDown(self):
+        clear_cache()
+
+    def test_iter_dates(self):
+        """测试只返回交易日, 日历未覆盖的日期按自然日返回"""
+        calendar = TradeCalendar(self.engine)
+        self.assertEqual(calendar.open_dates("20240104", "20240110"),
+                         ["20240104", "20240105", "20240108", "20240109", "20240110"])
+        self.assertFalse(calendar.is_open("20240106"))
+        self.assertTrue(calendar.is_open("20240109"))
+
+    def test_missing_calendar(self):
+        """测试交易日历为空时按自然日返回"""
+        calendar = TradeCalendar(self.engine, exchange="SZSE")
+        self.assertEqual(calendar.open_dates("20240105", "20240107"), ["20240105", "20240106", "20240107"])
+
+    def test_period_calendar(self):
+        """测试周、月交易日历: 周按 ISO 年-周分组, 跨年的周归入同一周, 休市日不计入"""
+        trade_cal = pd.DataFrame({
+            "cal_date": ["20240102", "20231229", "20231230", "20240105", "20240108", "20240201"],
+            "is_open": ["1", "1", "0", "1", "1", "1"],
+        })
+        weeks = period_calendar(trade_cal, PERIOD_WEEK)
+        self.assertEqual(weeks["period"].tolist(), [202352, 202401, 202402, 202405])
+        self.assertEqual(weeks["start_date"].tolist(), [20231229, 20240102, 20240108, 20240201])
+        self.assertEqual(weeks["end_date"].tolist(), [20231229, 20240105, 20240108, 20240201])
+        self.assertEqual(weeks["days"].tolist(), [1, 2, 1, 1])
+
+        months = period_calendar(trade_cal, PERIOD_MONTH)
+        self.assertEqual(months["period"].tolist(), [202312, 202401, 202402])
+        self.assertEqual(months["end_date"].tolist(), [20231229, 20240108, 20240201])
+        self.assertEqual(len(period_calendar(trade_cal[trade_cal["is_open"] == "0"], PERIOD_MONTH)["period"]), 0)
+
+    def test_cached_period_calendar(self):
+        """测试按交易所缓存周交易日历, 日历为空时返回 None"""
+        calendar = TradeCalendar(self.engine)
+        weeks = calendar.period_calendar(PERIOD_WEEK)
+        self.assertEqual(weeks["end_date"].tolist(), [20240105, 20240108])
+        self.assertIs(calendar.period_calendar(PERIOD_WEEK), weeks)
+        self.assertIsNone(TradeCalendar(self.engine, exchange="SZSE").period_calendar(PERIOD_WEEK))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils.ts_code_planner import RowCountHistory, RowCountRecorder, plan_batches, window_days
+
+
+class TestTsCodePlanner(unittest.TestCase):
+    def test_plan_batches(self):
+        """测试按预计条数装批, 不超过一页和每批股票数上限; 没有历史记录时按固定数量切片"""
+        codes = ["a", "b", "c", "d", "e"]
+        self.assertEqual(plan_batches(codes, {}, 365, 3000, 2), [["a", "b"], ["c", "d"], ["e"]])
+
+        # 每天 4 条, 一年 1460 条, 一页 3000 条装 2 只; 没有历史的 e 按中位数估算
+        rates = {"a": 4.0, "b": 4.0, "c": 0.0, "d": 4.0}
+        self.assertEqual(plan_batches(codes, rates, 365, 3000, 1000), [["a", "b", "c"], ["d", "e"]])
+        self.assertEqual(plan_batches(codes, rates, 365, 3000, 2), [["a", "b"], ["c", "d"], ["e"]])
+        # 单只股票超过一页时独占一批
+        self.assertEqual(plan_batches(["a", "b"], {"a": 100.0, "b": 1.0}, 365, 3000, 10), [["a"], ["b"]])
+
+    def test_history(self):
+        """测试记录每只股票的条数和天数, 没有返回数据的股票也计入天数"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history = RowCountHistory(os.path.join(tmp_dir, "checkpoints", "ts_code_rows.db"))
+            recorder = RowCountRecorder()
+            days = window_days("20230101", "20231231")
+            self.assertEqual(days, 365)
+            recorder.add_rows(pd.DataFrame({"ts_code": ["a", "a", "b"]}))
+            recorder.add_rows(pd.DataFrame({"ts_code": ["a"]}))
+            recorder.add_window(["a", "b", "c"], days)
+            history.record("fina_indicator", recorder.observations)
+            history.record("fina_indicator", {"a": (5, 365)})
+
+            rates = history.rates("fina_indicator")
+            self.assertAlmostEqual(rates["a"], 8 / 730)
+            self.assertAlmostEqual(rates["b"], 1 / 365)
+            self.assertEqual(rates["c"], 0)
+            self.assertEqual(history.rates("fina_mainbz"), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import configparser
+import tempfile
+import unittest
+
+import pandas as pd
+import tushare as ts
+
+from utils.tushare_replay import (CassetteStore, RecordingApi, ReplayApi, StandInServer, build_tushare_api,
+                                  cassette_key)
+
+
+class FakeApi:
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def query(self, api_name, fields="", **kwargs):
+        self.calls += 1
+        return self.data
+
+
+class TestTushareReplay(unittest.TestCase):
+    def test_cassette_key(self):
+        """测试 cassette key 与参数顺序、字段格式和 DataApi 自动加入的参数无关"""
+        key = cassette_key("daily", {"trade_date": "20240102", "offset": 0}, ["ts_code", "close"])
+        self.assertEqual(key, cassette_key("daily", {"offset": 0, "trade_date": "20240102", "ts_type_name": "x"},
+                                           "ts_code, close"))
+        self.assertNotEqual(key, cassette_key("daily", {"trade_date": "20240102", "offset": 10}, ["ts_code", "close"]))
+
+    def test_record_and_replay(self):
+        """测试录制的响应可以原样回放, 未录制的查询抛出异常"""
+        data = pd.DataFrame({"ts_code": ["000001.SZ", "000002.SZ"], "close": [10.5, None]})
+        with tempfile.TemporaryDirectory() as path:
+            store = CassetteStore(path)
+            api = RecordingApi(FakeApi(data), store)
+            api.daily(trade_date="20240102", offset=0, limit=100, fields=["ts_code", "close"])
+
+            replayed = ReplayApi(store).query("daily", trade_date="20240102", offset=0, limit=100,
+                                              fields=["ts_code", "close"])
+            self.assertEqual(list(replayed["ts_code"]), ["000001.SZ", "000002.SZ"])
+            self.assertTrue(pd.isna(replayed["close"][1]))
+            with self.assertRaises(Exception):
+                ReplayApi(store).query("daily", trade_date="20240103", offset=0, limit=100, fields=["ts_code", "close"])
+
+    def test_build_tushare_api(self):
+        """测试按 [tushare] mode 构建接口对象"""
+        cfg = configparser.ConfigParser()
+        cfg.read_dict({"tushare": {"token": "x", "mode": "replay"}})
+        self.assertIsInstance(build_tushare_api(cfg), ReplayApi)
+        cfg["tushare"]["mode"] = "record"
+        self.assertIsInstance(build_tushare_api(cfg), RecordingApi)
+        cfg["tushare"]["mode"] = "unknown"
+        with self.assertRaises(Exception):
+            build_tushare_api(cfg)
+
+    def test_stand_in_server(self):
+        """测试 DataApi 通过替身服务分页查询, 超出配额时返回错误"""
+        data = pd.DataFrame({"ts_code": [f"{i:06d}.SZ" for i in range(5)], "trade_date": ["20240102"] * 5})
+        with tempfile.TemporaryDirectory() as path:
+            store = CassetteStore(path)
+            store.put("daily", {"trade_date": "20240102"}, "ts_code,trade_date", data, paged=False)
+            server = StandInServer(store, quota="3/min").start()
+            try:
+                api = ts.pro_api(token="x")
+                api._DataApi__http_url = server.url
+                pages = [api.query("daily", trade_date="20240102", offset=offset, limit=2, fields="ts_code,trade_date")
+                         for offset in (0, 2, 4)]
+                self.assertEqual([len(page) for page in pages], [2, 2, 1])
+                self.assertEqual(list(pages[1]["ts_code"]), ["000002.SZ", "000003.SZ"])
+                with self.assertRaises(Exception):
+                    api.query("daily", trade_date="20240102", offset=0, limit=2, fields="ts_code,trade_date")
+                self.assertEqual((server.calls, server.rows, server.quota_errors), (4, 5, 1))
+            finally:
+                server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
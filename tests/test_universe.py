@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from utils.tushare_sync import TushareSync
+from utils.universe import StockUniverse, UniverseService
+from helpers import FakeClock
+
+STOCK_BASIC = pd.DataFrame({
+    "ts_code": ["a", "b", "c", "d", "e"],
+    "exchange": ["SSE", "SZSE", "SSE", "SZSE", "BSE"],
+    "market": ["主板", "创业板", "主板", "主板", "北交所"],
+    "list_date": [20000101, "20240301", "20000101", "2000-01-01", None],
+    "delist_date": [None, None, 20221231, "20230601", None],
+})
+
+
+class TestUniverse(unittest.TestCase):
+    def test_codes(self):
+        """测试按日期窗口、交易所、市场过滤, 日期可以是整数或带横线的字符串"""
+        universe = StockUniverse(STOCK_BASIC)
+        self.assertEqual(universe.codes(), ["a", "b", "c", "d", "e"])
+        self.assertEqual(universe.codes(start_date="20230101", end_date="20231231"), ["a", "d", "e"])
+        self.assertEqual(universe.listed_at("20230701"), ["a", "e"])
+        self.assertEqual(universe.codes(exchange="SSE"), ["a", "c"])
+        self.assertEqual(universe.codes(start_date="20230101", market="主板"), ["a", "d"])
+
+    def test_service(self):
+        """测试 ttl 内共用缓存, 本地没有数据时使用下一个加载函数"""
+        calls = []
+
+        def load_from_db():
+            calls.append("db")
+            return pd.DataFrame(columns=["ts_code"])
+
+        def load_from_tushare():
+            calls.append("tushare")
+            return STOCK_BASIC
+
+        clock = FakeClock()
+        service = UniverseService([load_from_db, load_from_tushare], ttl=60, clock=clock)
+        self.assertEqual(len(service.get()), 5)
+        clock.now = 59
+        service.get()
+        self.assertEqual(calls, ["db", "tushare"])
+        clock.now = 60
+        service.get()
+        self.assertEqual(calls, ["db", "tushare", "db", "tushare"])
+
+        service.invalidate()
+        service.get()
+        self.assertEqual(len(calls), 6)
+
+    def test_update_stock_basic_invalidates(self):
+        """测试 stock_basic 更新完成后清除股票池缓存, 其他表不清除"""
+        service = MagicMock()
+        for table, expected in [("stock_basic", 1), ("hs_const", 1)]:
+            with patch.object(TushareSync, "sql_folder", return_value="sql"):
+                sync = TushareSync(table)
+            sync._logger = MagicMock()
+            sync.shadow_load = False
+            with patch.object(sync, "create_table"), \
+                    patch.object(sync, "_query_all", return_value=STOCK_BASIC), \
+                    patch.object(sync, "save_datafame_to_db"), \
+                    patch.object(sync, "get_parquet_sink", return_value=None), \
+                    patch("utils.tushare_sync.get_universe_service", return_value=service):
+                sync.update()
+            self.assertEqual(service.invalidate.call_count, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import io
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from utils.writers import dataframe_to_tsv, get_writer, build_upsert_sql, LoadDataWriter, LoadDataWarning, ToSqlWriter, \
+    UpsertWriter
+
+
+class TestWriters(unittest.TestCase):
+    def test_dataframe_to_tsv(self):
+        """测试 TSV 转义与 NULL 输出"""
+        data = pd.DataFrame({
+            "ts_code": ["000001.SZ", "a\tb", None],
+            "close": [1.5, None, 3.0],
+        })
+        buf = io.StringIO()
+        dataframe_to_tsv(data, buf)
+        self.assertEqual(buf.getvalue(), "000001.SZ\t1.5\na\\tb\t\\N\n\\N\t3.0\n")
+
+    def test_get_writer(self):
+        """测试写库模式选择"""
+        self.assertIsInstance(get_writer(""), ToSqlWriter)
+        self.assertIsInstance(get_writer("LOAD_DATA"), LoadDataWriter)
+        self.assertIsInstance(get_writer("upsert"), UpsertWriter)
+        with self.assertRaises(Exception):
+            get_writer("unknown")
+
+    def test_load_data_fallback(self):
+        """测试 LOAD DATA 失败后回退到 to_sql"""
+        engine = MagicMock()
+        engine.raw_connection.side_effect = Exception("local_infile disabled")
+        fallback = MagicMock()
+        writer = LoadDataWriter(fallback=fallback)
+        data = pd.DataFrame({"ts_code": ["000001.SZ"]})
+
+        writer.write(engine, "daily", data, 100)
+        writer.write(engine, "daily", data, 100)
+
+        self.assertEqual(engine.raw_connection.call_count, 1)
+        self.assertEqual(fallback.write.call_count, 2)
+
+    def test_load_data_errors(self):
+        """测试非 local_infile 的错误直接抛出且不回退, 导入产生警告时回滚并抛出"""
+        engine = MagicMock()
+        engine.raw_connection.side_effect = Exception(1062, "Duplicate entry")
+        fallback = MagicMock()
+        writer = LoadDataWriter(fallback=fallback)
+        data = pd.DataFrame({"ts_code": ["000001.SZ"]})
+        with self.assertRaises(Exception):
+            writer.write(engine, "daily", data, 100)
+        fallback.write.assert_not_called()
+        self.assertFalse(writer._disabled)
+
+        engine = MagicMock()
+        conn = engine.raw_connection.return_value
+        conn.cursor.return_value.fetchall.return_value = [("Warning", 1062, "Duplicate entry 'x' for key 'PRIMARY'")]
+        with self.assertRaises(LoadDataWarning):
+            writer.write(engine, "daily", data, 100)
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+        conn.reset_mock()
+        conn.cursor.return_value.fetchall.return_value = []
+        writer.write(engine, "daily", data, 100)
+        conn.commit.assert_called_once()
+        fallback.write.assert_not_called()
+
+    def test_build_upsert_sql(self):
+        """测试多行 upsert 语句"""
+        self.assertEqual(
+            build_upsert_sql("daily", ["ts_code", "close"], 2),
+            "INSERT INTO `daily` (`ts_code`,`close`) VALUES (%s,%s),(%s,%s) "
+            "ON DUPLICATE KEY UPDATE `ts_code`=VALUES(`ts_code`),`close`=VALUES(`close`)")
+
+    def test_upsert_batches(self):
+        """测试 upsert 按批写入, 空值转为 None"""
+        engine = MagicMock()
+        cursor = engine.raw_connection.return_value.cursor.return_value
+        data = pd.DataFrame({"ts_code": ["a", "b", "c"], "close": [1.5, None, 3.0]})
+
+        UpsertWriter().write(engine, "daily", data, 2)
+
+        self.assertEqual(cursor.execute.call_count, 2)
+        first_sql, first_params = cursor.execute.call_args_list[0][0]
+        self.assertIn("VALUES (%s,%s),(%s,%s) ON DUPLICATE KEY UPDATE", first_sql)
+        self.assertEqual(first_params, ["a", 1.5, "b", None])
+        self.assertEqual(cursor.execute.call_args_list[1][0][1], ["c", 3.0])
+        engine.raw_connection.return_value.commit.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+"""
+自适应分页大小与调用间隔
+
+limit、interval 原来都是人工调出来的固定值（-- limit / -- interval 声明或 TushareSync._LIMIT）。
+声明 -- adaptive: true 的表在抓取循环中由 AdaptiveController 调整:
+
+1. 分页大小: 整页返回（rows_count == limit）且尚未探明接口单次返回上限时，下一页的 limit 翻倍（不超过 MAX_LIMIT）；
+   返回条数少于 limit 时，可能是当日数据已取完，也可能是接口上限（如 daily 单次最多 6000 条），
+   无法区分时（条数不小于已确认的最大返回条数）继续抓取下一页确认:
+   下一页有数据说明该条数就是接口上限，之后 limit 固定为该值；没有数据则当日已取完
+2. 调用间隔: 连续 TIGHTEN_AFTER 次快速（耗时不超过 FAST_LATENCY 秒）且无错误的调用后，间隔缩小 10%，不低于 MIN_INTERVAL；
+   只调整按 interval 限流的接口，声明了 quota 的接口仍按配额限流
+3. 退避: 配额/频率类错误（"每分钟最多访问"、"too many requests" 等）时间隔加倍，并按连续错误次数指数退避等待；
+   其他错误仍按原来的 interval * 5 等待后重试
+4. 学到的 limit、interval、接口上限按 api_name 保存在 JSON 文件中，下次同步从学到的值开始
+
+配置:
+    [adaptive]
+    filename=adaptive_state.json  # 位于 checkpoints 目录
+
+使用示例:
+    controller = AdaptiveController("daily", limit=5000, interval=0.5, store=AdaptiveStore(path), limiter=limiter)
+    limit = controller.page_size()
+    ... 抓取 ...
+    controller.on_page(rows_count, limit, latency)
+    if not controller.has_more(rows_count, limit):
+        break
+"""
+
+import json
+import os
+import re
+import threading
+
+MAX_LIMIT = 100000
+MIN_INTERVAL = 0.05
+MAX_INTERVAL = 60.0
+FAST_LATENCY = 1.0
+TIGHTEN_AFTER = 20
+TIGHTEN_RATIO = 0.9
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 120.0
+
+_QUOTA_ERROR = re.compile(r"最多访问|访问频率|频繁|too many requests|rate limit|\b429\b", re.IGNORECASE)
+
+
+def is_quota_error(error):
+    """
+    是否为配额/频率类错误
+    """
+    return error is not None and _QUOTA_ERROR.search(str(error)) is not None
+
+
+class AdaptiveStore:
+    """
+    按 api_name 保存学到的参数, 多个同步对象共用一个文件
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError):
+                self._state = {}
+
+    def get(self, api_name):
+        with self._lock:
+            return dict(self._state.get(api_name, {}))
+
+    def save(self, api_name, state):
+        with self._lock:
+            self._state[api_name] = dict(state)
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_adaptive_store(path):
+    """
+    获取共享的 AdaptiveStore, 同一进程内相同文件共用
+    """
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = AdaptiveStore(path)
+        return _stores[path]
+
+
+class AdaptiveController:
+    def __init__(self, api_name, limit, interval, store=None, limiter=None, logger=None):
+        """
+        :param api_name: Tushare 接口名, 学到的参数按接口保存
+        :param limit: 配置的分页大小, 没有学到的值时使用
+        :param interval: 配置的调用间隔, 没有学到的值时使用
+        :param store: AdaptiveStore, 为 None 时不保存
+        :param limiter: 按 interval 限流的 RateLimiter, 间隔变化时同步调整; 按 quota 限流时传 None
+        :param logger: 日志对象
+        """
+        self.api_name = api_name
+        self.store = store
+        self.limiter = limiter
+        self.logger = logger
+        state = store.get(api_name) if store else {}
+        self.limit = int(state.get("limit", limit))
+        self.interval = float(state.get("interval", interval))
+        self.cap = state.get("cap")  # 探明的接口单次返回上限
+        self.safe = int(state.get("safe", 0))  # 已确认不超过接口上限的最大返回条数
+        if self.cap is not None:
+            self.limit = min(self.limit, int(self.cap))
+        self._probe = None  # 等待下一页确认是否为接口上限的条数
+        self._fast_calls = 0
+        self._errors = 0
+        self._set_limiter_interval()
+
+    def page_size(self):
+        return self.limit
+
+    def on_page(self, rows_count, requested, latency):
+        """
+        记录一次成功的调用
+
+        :param rows_count: 返回条数
+        :param requested: 请求的 limit
+        :param latency: 调用耗时(秒)
+        """
+        changed = False
+        self._errors = 0
+
+        if self._probe is not None:
+            probe, self._probe = self._probe, None
+            if rows_count > 0:
+                # 上一页不足 limit 但还有数据, 上一页条数就是接口上限
+                self.cap, self.limit = probe, probe
+                self._log(f"探明接口单次返回上限 [{probe}] 条")
+            else:
+                self.safe = max(self.safe, probe)
+            changed = True
+
+        if rows_count >= requested:
+            if rows_count > self.safe:
+                self.safe, changed = rows_count, True
+            if self.cap is None and self.limit < MAX_LIMIT:
+                self.limit = min(self.limit * 2, MAX_LIMIT)
+                changed = True
+        elif self.cap is None and rows_count > 0 and rows_count >= self.safe:
+            self._probe = rows_count
+
+        if latency <= FAST_LATENCY:
+            self._fast_calls += 1
+            if self._fast_calls >= TIGHTEN_AFTER and self.interval > MIN_INTERVAL:
+                self._fast_calls = 0
+                self.interval = max(MIN_INTERVAL, round(self.interval * TIGHTEN_RATIO, 4))
+                self._set_limiter_interval()
+                changed = True
+        else:
+            self._fast_calls = 0
+
+        if changed:
+            self._save()
+
+    def has_more(self, rows_count, requested):
+        """
+        当前日期是否还需要抓取下一页
+        """
+        if self._probe is not None:
+            return True
+        full = requested if self.cap is None else min(requested, self.cap)
+        return rows_count > 0 and rows_count >= full
+
+    def on_error(self, error, default_wait):
+        """
+        记录一次失败的调用
+
+        :return: 重试前等待的秒数
+        """
+        self._fast_calls = 0
+        if not is_quota_error(error):
+            return default_wait
+        self._errors += 1
+        self.interval = min(MAX_INTERVAL, max(self.interval * 2, MIN_INTERVAL))
+        self._set_limiter_interval()
+        self._save()
+        wait = min(MAX_BACKOFF, BACKOFF_BASE * 2 ** (self._errors - 1))
+        self._log(f"超出接口配额, 间隔调整为 [{self.interval}] 秒, 等待 [{wait}] 秒后重试", warning=True)
+        return wait
+
+    def _set_limiter_interval(self):
+        if self.limiter is not None:
+            self.limiter.set_interval(self.interval)
+
+    def _save(self):
+        if self.store is not None:
+            self.store.save(self.api_name, {"limit": self.limit, "interval": self.interval,
+                                            "cap": self.cap, "safe": self.safe})
+
+    def _log(self, msg, warning=False):
+        if self.logger:
+            (self.logger.warning if warning else self.logger.info)(f"[{self.api_name}] {msg}")
@@ -0,0 +1,260 @@
+"""
+复权行情
+
+daily 为不复权行情，adj_factor 为复权因子，研究时每次查询都要在 SQL 中按 (ts_code, trade_date) 关联两张大表计算复权价格。
+daily / adj_factor 同步完成后（SQL 脚本 `-- post_sync: adj_price`）由本模块增量维护 daily_adj 表:
+
+    后复权 hfq = 价格 * 复权因子
+    前复权 qfq = 价格 * 复权因子 / 该股票最新一条日线的复权因子
+
+增量规则:
+1. daily_adj 为空时按 ts_code 分批全量计算
+2. 否则只读取 daily_adj 最大日期之后的日线和复权因子，在 pandas 中关联，不在 MySQL 中做大表关联
+   只计算到 daily 和 adj_factor 都已同步到的日期（两表最大日期中较小的一个）：daily 先于 adj_factor 同步完成时，
+   新日期的复权因子还不存在，留到 adj_factor 同步后的下一次计算，避免沿用旧因子写入后不再重算
+3. 某只股票最新的复权因子与 daily_adj 中该股票最后一条记录的因子不同（发生除权除息）时，
+   该股票的前复权价格全部变化，删除后重新计算整个历史；其他股票只追加新日期
+4. daily_adj 最大日期之前 daily 和 adj_factor 中都有、daily_adj 中没有的记录（同步失败的日期之后补上、repair 补数），
+   由 find_holes 按日期比较记录数找出，相关股票自最早缺失的日期起重新计算
+范围内个别复权因子缺失的日期沿用该股票之前的因子。
+
+使用示例:
+    adjusted = adjust_prices(daily.merge(adj_factor, on=["ts_code", "trade_date"], how="left"))
+    refresh(TushareSync("daily"))
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.concurrency import slot, MYSQL
+from utils.metrics import get_metrics
+from utils.writers import get_writer
+
+TABLE = "daily_adj"
+SOURCE_TABLES = ["daily", "adj_factor"]
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+COLUMNS = (["ts_code", "trade_date", "adj_factor"] + [f"{name}_qfq" for name in PRICE_COLUMNS]
+           + [f"{name}_hfq" for name in PRICE_COLUMNS])
+CODE_BATCH = 200 # 全量或重算时每批读取的股票数
+DATE_BATCH = 20 # 查找缺失记录时每批读取的日期数
+FACTOR_RTOL = 1e-9 # 复权因子相对误差在此范围内视为未变化
+
+# daily 和 adj_factor 并行同步时, 同一时间只有一个任务维护 daily_adj
+_lock = threading.Lock()
+
+
+def adjust_prices(data, prev_factors=None):
+    """
+    计算前复权、后复权价格
+
+    :param data: 包含 ts_code, trade_date, open, high, low, close, adj_factor 的日线, 复权因子可以缺失
+    :param prev_factors: {ts_code: 之前的复权因子}, 填充股票开头缺失的因子
+    :return: 列为 COLUMNS 的 DataFrame, 按 ts_code, trade_date 排序; 无法确定复权因子的记录不返回
+    """
+    data = data.sort_values(["ts_code", "trade_date"], kind="stable").reset_index(drop=True)
+    codes = data["ts_code"]
+    factor = pd.to_numeric(data["adj_factor"]).astype(np.float64).groupby(codes).ffill()
+    if prev_factors:
+        factor = factor.fillna(codes.map(prev_factors))
+    factor = factor.groupby(codes).bfill()
+
+    data = data.assign(adj_factor=factor)[factor.notna()]
+    base = data["adj_factor"].groupby(data["ts_code"]).transform("last")
+    result = data[["ts_code", "trade_date", "adj_factor"]].copy()
+    for name in PRICE_COLUMNS:
+        hfq = pd.to_numeric(data[name]).astype(np.float64) * data["adj_factor"]
+        result[f"{name}_hfq"] = hfq
+        result[f"{name}_qfq"] = hfq / base
+    return result[COLUMNS].reset_index(drop=True)
+
+
+def changed_codes(adjusted, prev_factors):
+    """
+    最新复权因子与之前记录的因子不同的股票, 之前没有记录的股票不算
+    """
+    if len(adjusted) == 0 or not prev_factors:
+        return []
+    latest = adjusted.groupby("ts_code", sort=True)["adj_factor"].last()
+    prev = pd.Series(prev_factors, dtype=np.float64).reindex(latest.index)
+    mask = prev.notna().to_numpy() & ~np.isclose(latest.to_numpy(), prev.to_numpy(), rtol=FACTOR_RTOL, atol=0)
+    return latest.index[mask].tolist()
+
+
+def in_codes(codes):
+    """
+    ts_code IN (...) 条件
+    """
+    return "ts_code IN (" + ",".join(f"'{code}'" for code in codes) + ")"
+
+
+def in_dates(dates):
+    """
+    trade_date IN (...) 条件
+    """
+    return "trade_date IN (" + ",".join(f"'{date}'" for date in dates) + ")"
+
+
+def read_daily(sync, where, columns=None):
+    """
+    读取日线和复权因子并在 pandas 中关联
+
+    :param sync: TushareSync 对象, 使用其数据库连接
+    :param where: 两张表共用的查询条件, 如 trade_date>'20240105'
+    :param columns: 日线中除 ts_code, trade_date 外读取的字段, 默认 PRICE_COLUMNS
+    :return: DataFrame, 复权因子缺失时为空值
+    """
+    columns = columns or PRICE_COLUMNS
+    names = ",".join(f"`{name}`" for name in columns)
+    daily = pd.DataFrame(sync._fetch_all_from_db(f"SELECT ts_code, trade_date, {names} FROM daily WHERE {where}"),
+                         columns=["ts_code", "trade_date"] + columns)
+    factors = pd.DataFrame(sync._fetch_all_from_db(
+        f"SELECT ts_code, trade_date, adj_factor FROM adj_factor WHERE {where}"),
+        columns=["ts_code", "trade_date", "adj_factor"])
+    for data in (daily, factors):
+        data["trade_date"] = pd.to_numeric(data["trade_date"]).astype(np.int64)
+        data["ts_code"] = data["ts_code"].astype(str)
+    # adj_factor 表没有唯一键, 重复记录取最后一条
+    factors = factors.drop_duplicates(["ts_code", "trade_date"], keep="last")
+    return daily.merge(factors, on=["ts_code", "trade_date"], how="left")
+
+
+def latest_factors(sync, table=TABLE):
+    """
+    表中每只股票最后一条记录的复权因子, 即计算前复权价格时使用的基准
+    """
+    rows = sync._fetch_all_from_db(
+        f"SELECT t.ts_code, t.adj_factor FROM {table} t JOIN "
+        f"(SELECT ts_code, MAX(trade_date) trade_date FROM {table} GROUP BY ts_code) m "
+        f"ON t.ts_code=m.ts_code AND t.trade_date=m.trade_date")
+    return {ts_code: float(factor) for ts_code, factor in rows}
+
+
+def _write(sync, data):
+    if len(data) == 0:
+        return
+    with slot(MYSQL), get_metrics().timer("write_seconds", TABLE, "adj_price"):
+        get_writer("upsert").write(sync.get_db_engine(), TABLE, data, sync.limit, sync.get_logger())
+    get_metrics().inc("rows", TABLE, "adj_price", len(data))
+
+
+def complete_date(sync):
+    """
+    daily 和 adj_factor 都已同步到的最后日期, 任一表为空时为空
+    """
+    dates = [sync._fetch_one_from_db(f"SELECT MAX(trade_date) FROM {table}") for table in SOURCE_TABLES]
+    return None if None in dates else str(min(int(date) for date in dates))
+
+
+def _date_counts(sync, table, last_date):
+    rows = sync._fetch_all_from_db(
+        f"SELECT trade_date, COUNT(*) FROM {table} WHERE trade_date<='{last_date}' GROUP BY trade_date")
+    return {int(date): int(count) for date, count in rows}
+
+
+def _keys(sync, table, where):
+    return {(str(ts_code), int(date)) for ts_code, date in
+            sync._fetch_all_from_db(f"SELECT ts_code, trade_date FROM {table} WHERE {where}")}
+
+
+def find_holes(sync, table, last_date):
+    """
+    table 截至 last_date 缺失的记录: daily 和 adj_factor 中都有、table 中没有的 (ts_code, trade_date)
+
+    先按日期比较三张表的记录数, 只读取 table 记录数偏少的日期的股票代码, 不在 MySQL 中做大表关联
+
+    :return: {ts_code: 最早缺失的日期}
+    """
+    daily, factors, target = (_date_counts(sync, name, last_date) for name in SOURCE_TABLES + [table])
+    dates = sorted(date for date, count in daily.items() if target.get(date, 0) < min(count, factors.get(date, 0)))
+    holes = {}
+    for i in range(0, len(dates), DATE_BATCH):
+        where = in_dates(dates[i:i + DATE_BATCH])
+        daily_keys, factor_keys, target_keys = (_keys(sync, name, where) for name in SOURCE_TABLES + [table])
+        for ts_code, trade_date in sorted((daily_keys & factor_keys) - target_keys):
+            holes.setdefault(ts_code, trade_date)
+    return holes
+
+
+def fill_holes(sync, holes, end_date, recompute):
+    """
+    按最早缺失的日期分组, 删除并重新计算股票自该日起截至 end_date 的记录
+
+    :param holes: find_holes 的结果
+    :param recompute: 所在模块的 _recompute
+    :return: 写入记录数
+    """
+    starts = {}
+    for ts_code, trade_date in sorted(holes.items()):
+        starts.setdefault(trade_date, []).append(ts_code)
+    return sum(recompute(sync, codes, delete=True, end_date=end_date, start_date=str(start))
+               for start, codes in sorted(starts.items()))
+
+
+def _recompute(sync, codes, delete, end_date, start_date=None):
+    """
+    按批重新计算股票截至 end_date 的历史, 指定 start_date 时只计算该日起的记录; delete 为 True 时先删除已有记录
+    """
+    count = 0
+    for i in range(0, len(codes), CODE_BATCH):
+        where = f"{in_codes(codes[i:i + CODE_BATCH])} AND trade_date<='{end_date}'"
+        if start_date is not None:
+            where += f" AND trade_date>='{start_date}'"
+        adjusted = adjust_prices(read_daily(sync, where))
+        if delete:
+            sync.exec_sql(f"DELETE FROM {TABLE} WHERE {where}")
+        _write(sync, adjusted)
+        count += len(adjusted)
+    return count
+
+
+def refresh(sync):
+    """
+    post_sync 处理: 增量维护 daily_adj
+
+    :param sync: 触发的 TushareSync 对象, 使用其数据库连接和日志
+    :return: 写入记录数
+    """
+    logger = sync.get_logger()
+    with _lock:
+        missing = [table for table in SOURCE_TABLES if not sync._table_exist(table)]
+        if missing:
+            logger.info(f"[{', '.join(missing)}] 表不存在, 跳过复权行情计算")
+            return 0
+        if not sync._table_exist(TABLE):
+            with open(os.path.join(os.getcwd(), sync.sql_folder(), f"{TABLE}.sql"), "r", encoding="utf-8") as f:
+                sync.exec_sql(f.read())
+
+        last_date = sync._fetch_one_from_db(f"SELECT MAX(trade_date) FROM {TABLE}")
+        end_date = complete_date(sync)
+        if end_date is None:
+            logger.info("daily 或 adj_factor 表为空, 跳过复权行情计算")
+            return 0
+        if last_date is None:
+            codes = sorted(row[0] for row in sync._fetch_all_from_db("SELECT DISTINCT ts_code FROM daily"))
+            count = _recompute(sync, codes, delete=False, end_date=end_date)
+            logger.info(f"复权行情全量计算完成, 截至 {end_date}, [{len(codes)}] 只股票, 写入 [{count}] 条记录")
+            return count
+        holes = find_holes(sync, TABLE, min(int(last_date), int(end_date)))
+        if int(end_date) <= int(last_date) and not holes:
+            logger.info(f"daily / adj_factor 截至 {end_date}, 没有 {last_date} 之后的完整数据, 跳过复权行情计算")
+            return 0
+
+        appended, changed = [], []
+        if int(end_date) > int(last_date):
+            prev_factors = latest_factors(sync)
+            adjusted = adjust_prices(read_daily(sync, f"trade_date>'{last_date}' AND trade_date<='{end_date}'"),
+                                     prev_factors)
+            changed = changed_codes(adjusted, prev_factors)
+            # 有缺失记录的股票由 fill_holes 一并计算新日期
+            appended = adjusted[~adjusted["ts_code"].isin(changed + list(holes))]
+            _write(sync, appended)
+        holes = {ts_code: date for ts_code, date in holes.items() if ts_code not in changed}
+        count = (len(appended) + _recompute(sync, changed, delete=True, end_date=end_date)
+                 + fill_holes(sync, holes, end_date, _recompute))
+        logger.info(f"复权行情增量计算完成, {last_date} - {end_date} 追加 [{len(appended)}] 条, "
+                    f"复权因子变化重算 [{len(changed)}] 只股票, 补算缺失记录 [{len(holes)}] 只股票, "
+                    f"共写入 [{count}] 条记录")
+        return count
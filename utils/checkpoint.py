@@ -0,0 +1,161 @@
+"""
+断点续传日志
+
+在本地 SQLite 文件中记录每张表一次同步任务（run）的日期范围，以及任务内每个同步单元（unit）的进度。
+同步单元由调用方定义，如某一天 "20240102"，或某个日期窗口内的一批 ts_code "20240101-20241231|000001.SZ~600000.SH"；
+单元进度为下一页的 offset 以及是否已完成。
+
+同步中断后再次执行时:
+1. begin_run 返回未完成任务的原始日期范围，调用方据此续传，不再清理历史数据
+2. 已完成的单元直接跳过，未完成的单元从记录的 offset 继续抓取
+3. 全部单元完成后调用 finish_run 清除该表的记录
+
+注意: 写库成功与记录进度之间进程中断时，该页数据会在续传时重复抓取一次;
+TushareSync 续传时对写库方式不是幂等的表先清理未完成单元的数据再从头抓取，不使用记录的 offset
+
+另外记录来源表缺口修复（repair）重新抓取过的日期，按由其合成的表分别保存，合成表重新合成所在周期后清除;
+合成中断时下次修复继续处理，修复过的日期不会丢失; 以及每个单元修复时重新抓取到的记录数，见 utils/repair.py
+
+使用示例:
+    journal = CheckpointJournal("checkpoints/sync_checkpoint.db")
+    start_date, end_date, resumed = journal.begin_run("daily", "20100101", "20241231")
+    offset, done = journal.unit_state("daily", "20240102")
+    journal.save_progress("daily", "20240102", offset=5000)
+    journal.save_progress("daily", "20240102", offset=5432, done=True)
+    journal.finish_run("daily")
+    journal.add_repaired_dates("weekly", ["20240102"])
+    journal.clear_repaired_dates("weekly", journal.repaired_dates("weekly"))
+"""
+
+import contextlib
+import os
+import sqlite3
+import threading
+
+
+class CheckpointJournal:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        dir_name = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(dir_name):
+            os.makedirs(dir_name)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS sync_run ("
+                         "table_name TEXT PRIMARY KEY, start_date TEXT, end_date TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS sync_unit ("
+                         "table_name TEXT, unit_key TEXT, next_offset INTEGER, done INTEGER, "
+                         "PRIMARY KEY (table_name, unit_key))")
+            conn.execute("CREATE TABLE IF NOT EXISTS repaired_date ("
+                         "table_name TEXT, trade_date TEXT, PRIMARY KEY (table_name, trade_date))")
+            conn.execute("CREATE TABLE IF NOT EXISTS repaired_unit ("
+                         "table_name TEXT, unit_key TEXT, rows INTEGER, PRIMARY KEY (table_name, unit_key))")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def has_run(self, table_name):
+        """
+        是否存在未完成的同步任务
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM sync_run WHERE table_name=?", (table_name,)).fetchone()
+        return row is not None
+
+    def begin_run(self, table_name, start_date, end_date):
+        """
+        开始同步任务；存在未完成任务时继续该任务，结束日期取两者的较大值
+
+        Returns:
+            (start_date, end_date, resumed): 实际同步的日期范围，是否为续传
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT start_date, end_date FROM sync_run WHERE table_name=?",
+                               (table_name,)).fetchone()
+            if row is None:
+                conn.execute("DELETE FROM sync_unit WHERE table_name=?", (table_name,))
+                conn.execute("INSERT INTO sync_run VALUES (?, ?, ?)", (table_name, start_date, end_date))
+                return start_date, end_date, False
+
+            run_start, run_end = row
+            if end_date > run_end:
+                run_end = end_date
+                conn.execute("UPDATE sync_run SET end_date=? WHERE table_name=?", (run_end, table_name))
+            return run_start, run_end, True
+
+    def finish_run(self, table_name):
+        """
+        同步任务完成（或表被重建），清除该表的全部记录
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM sync_run WHERE table_name=?", (table_name,))
+            conn.execute("DELETE FROM sync_unit WHERE table_name=?", (table_name,))
+
+    def unit_state(self, table_name, unit_key):
+        """
+        Returns:
+            (next_offset, done): 未记录的单元返回 (0, False)
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT next_offset, done FROM sync_unit WHERE table_name=? AND unit_key=?",
+                               (table_name, unit_key)).fetchone()
+        if row is None:
+            return 0, False
+        return int(row[0]), bool(row[1])
+
+    def save_progress(self, table_name, unit_key, offset, done=False):
+        """
+        记录单元进度: 下一页的 offset, 是否已完成
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO sync_unit VALUES (?, ?, ?, ?)",
+                         (table_name, unit_key, int(offset), 1 if done else 0))
+
+    def add_repaired_dates(self, table_name, dates):
+        """
+        记录需要由 table_name 重新处理的来源表修复日期
+        """
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO repaired_date VALUES (?, ?)",
+                             [(table_name, str(date)) for date in dates])
+
+    def repaired_dates(self, table_name):
+        """
+        Returns:
+            list: 按日期排序的修复日期
+        """
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT trade_date FROM repaired_date WHERE table_name=? ORDER BY trade_date",
+                                (table_name,)).fetchall()
+        return [row[0] for row in rows]
+
+    def clear_repaired_dates(self, table_name, dates):
+        """
+        清除已处理的修复日期
+        """
+        with self._lock, self._connect() as conn:
+            conn.executemany("DELETE FROM repaired_date WHERE table_name=? AND trade_date=?",
+                             [(table_name, str(date)) for date in dates])
+
+    def save_repaired_rows(self, table_name, unit_key, rows):
+        """
+        记录单元修复时重新抓取到的记录数
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO repaired_unit VALUES (?, ?, ?)", (table_name, unit_key, int(rows)))
+
+    def repaired_rows(self, table_name):
+        """
+        Returns:
+            dict: {单元: 修复时重新抓取到的记录数}
+        """
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT unit_key, rows FROM repaired_unit WHERE table_name=?",
+                                (table_name,)).fetchall()
+        return {unit_key: int(count) for unit_key, count in rows}
@@ -0,0 +1,53 @@
+"""
+全局并发上限
+
+多张表并行同步时，限制同一进程内同时访问 Tushare 和 MySQL 的连接数，
+避免并行度提高后触发 Tushare 的并发限制或占满数据库连接。
+
+默认不限制，由编排器（见 utils/orchestrator.py）按配置调用 configure 设置上限:
+    [concurrency]
+    tushare=4
+    mysql=4
+
+使用示例:
+    configure(tushare=4, mysql=4)
+    with slot(TUSHARE):
+        data = ts_api.query(...)
+    with slot(MYSQL):
+        data.to_sql(...)
+"""
+
+import contextlib
+import threading
+
+TUSHARE = "tushare"
+MYSQL = "mysql"
+
+_semaphores = {}
+_lock = threading.Lock()
+
+
+def configure(tushare=0, mysql=0):
+    """
+    设置全局并发上限, 0 表示不限制
+    """
+    with _lock:
+        for resource, limit in ((TUSHARE, tushare), (MYSQL, mysql)):
+            limit = int(limit or 0)
+            if limit > 0:
+                _semaphores[resource] = threading.BoundedSemaphore(limit)
+            else:
+                _semaphores.pop(resource, None)
+
+
+@contextlib.contextmanager
+def slot(resource):
+    """
+    占用一个 resource 连接名额, 名额用尽时阻塞等待
+    """
+    semaphore = _semaphores.get(resource)
+    if semaphore is None:
+        yield
+        return
+    with semaphore:
+        yield
@@ -0,0 +1,127 @@
+"""
+进程内共享的配置与数据库连接池
+
+旧的 utils/utils.py 中 exec_mysql_sql、query_table_is_exist、query_last_sync_date 等每次调用都新建一个 pymysql 连接，
+get_mock_connection 每次调用都新建一个 SQLAlchemy engine，get_cfg() 每次调用都重新解析 application.ini；
+一次同步 25 张表会反复建立、断开连接。
+
+1. load_cfg: 按文件路径缓存 ConfigParser，同一进程只解析一次
+2. get_engine: 按数据库地址共享一个带连接池的 engine，连接用完归还连接池而不是断开
+3. raw_connection: 从连接池借出 DBAPI 连接（cursor / commit 用法与 pymysql 相同），退出时归还
+
+配置:
+    [mysql]
+    pool_size=5         # 连接池保持的连接数, 不小于 [concurrency] mysql
+    max_overflow=10     # 连接池满时最多额外创建的连接数
+    pool_recycle=3600   # 连接使用超过该秒数后重建, 避免被 MySQL wait_timeout 断开
+
+使用示例:
+    cfg = load_cfg("application.ini")
+    with raw_connection(cfg) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+"""
+
+import configparser
+import contextlib
+import os
+import threading
+
+import sqlalchemy
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 3600
+
+_configs = {}
+_configs_lock = threading.Lock()
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def load_cfg(path):
+    """
+    读取配置文件, 同一路径只解析一次
+    """
+    path = os.path.abspath(path)
+    with _configs_lock:
+        if path not in _configs:
+            cfg = configparser.ConfigParser()
+            cfg.read(path)
+            _configs[path] = cfg
+        return _configs[path]
+
+
+def clear_cfg_cache():
+    """
+    清除配置缓存, 配置文件修改后重新读取
+    """
+    with _configs_lock:
+        _configs.clear()
+
+
+def db_url(cfg):
+    """
+    由 [mysql] 配置生成数据库地址
+    """
+    mysql = cfg['mysql']
+    return (f"mysql://{mysql['user']}:{mysql['password']}@{mysql['host']}:{mysql['port']}/{mysql['database']}"
+            f"?charset=utf8&use_unicode=1")
+
+
+def get_pooled_engine(url, pool_size=DEFAULT_POOL_SIZE, max_overflow=DEFAULT_MAX_OVERFLOW,
+                      pool_recycle=DEFAULT_POOL_RECYCLE, connect_args=None):
+    """
+    获取共享的 engine, 同一进程内相同地址共用一个连接池
+
+    :param url: 数据库地址
+    :param pool_size: 连接池保持的连接数
+    :param max_overflow: 连接池满时最多额外创建的连接数
+    :param pool_recycle: 连接使用超过该秒数后重建
+    :param connect_args: 传给 DBAPI connect 的参数
+    """
+    with _engines_lock:
+        if url not in _engines:
+            _engines[url] = sqlalchemy.create_engine(url, poolclass=QueuePool, pool_size=pool_size,
+                                                     max_overflow=max_overflow, pool_recycle=pool_recycle,
+                                                     pool_pre_ping=True, connect_args=connect_args or {})
+        return _engines[url]
+
+
+def get_engine(cfg):
+    """
+    按 [mysql] 配置获取共享的 engine
+    """
+    mysql = cfg['mysql']
+    # local_infile: 允许 write_mode=load_data 时使用 LOAD DATA LOCAL INFILE
+    return get_pooled_engine(db_url(cfg),
+                             pool_size=mysql.getint('pool_size', DEFAULT_POOL_SIZE),
+                             max_overflow=mysql.getint('max_overflow', DEFAULT_MAX_OVERFLOW),
+                             pool_recycle=mysql.getint('pool_recycle', DEFAULT_POOL_RECYCLE),
+                             connect_args={"local_infile": 1})
+
+
+@contextlib.contextmanager
+def raw_connection(cfg_or_engine):
+    """
+    从连接池借出 DBAPI 连接, 退出时归还 (未提交的事务回滚)
+
+    :param cfg_or_engine: 配置对象或 engine
+    """
+    engine = cfg_or_engine if isinstance(cfg_or_engine, sqlalchemy.engine.Engine) else get_engine(cfg_or_engine)
+    conn = engine.raw_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def dispose_engines():
+    """
+    关闭全部连接池, 进程退出或 fork 子进程前调用
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
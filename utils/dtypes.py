@@ -0,0 +1,138 @@
+"""
+按建表语句的字段类型转换 DataFrame 列类型
+
+Tushare 返回的数据全部是 object / float64: trade_date 等日期是字符串, 写入 int 字段时 MySQL 逐行隐式转换,
+pandas 也一直持有宽的 object 列。写库前按 SQL 脚本中声明的字段类型做一次向量化转换:
+
+    tinyint / smallint / mediumint / int    int32, 有空值时为可空的 Int32; unsigned 时为 int64 / Int64
+    bigint                                   int64, 有空值时为可空的 Int64; unsigned 时为 uint64 / UInt64
+    float                                    float32
+    double / decimal / real                  float64
+    ts_code (varchar)                        category, 一页中同一代码重复多次时只保存一份
+
+字段中有无法转换的值（如 int 字段收到非数字字符串、带小数的数值、超出 int32 / int64 范围或 unsigned 字段的负数）时
+该列保持原样, 由 MySQL 处理, 不会因为溢出写入错误的数值;
+其他类型（varchar, date 等）不转换。
+
+使用示例:
+    types = parse_column_type("`holder_num` int unsigned DEFAULT NULL COMMENT '股东户数',")  # "int unsigned"
+    data = coerce_dtypes(data, {"trade_date": "int", "close": "double", "ts_code": "varchar(64)"})
+"""
+
+import numpy as np
+import pandas as pd
+
+INT32_TYPES = {"tinyint", "smallint", "mediumint", "int", "integer"}
+INT64_TYPES = {"bigint"}
+# 整数类型: (目标 dtype, 有空值时的 dtype, 取值下界, 取值上界（不含）)
+INT_DTYPES = {
+    (False, False): (np.int32, "Int32", -2 ** 31, 2 ** 31),
+    (False, True): (np.int64, "Int64", 0, 2 ** 32),
+    (True, False): (np.int64, "Int64", -2 ** 63, 2 ** 63),
+    (True, True): (np.uint64, "UInt64", 0, 2 ** 64),
+}
+UNSIGNED = "unsigned"
+FLOAT32_TYPES = {"float"}
+FLOAT64_TYPES = {"double", "decimal", "real", "numeric"}
+CATEGORY_COLUMNS = {"ts_code"}
+
+
+def parse_column_type(line):
+    """
+    从字段定义行中取出类型名, 如 "`close` double DEFAULT NULL" -> "double", "`ts_code` varchar(64)" -> "varchar",
+    无符号整数带上 unsigned, 如 "`holder_num` int(11) unsigned" -> "int unsigned"
+    """
+    parts = line.split('`')
+    if len(parts) < 3 or not parts[2].split():
+        return ""
+    words = parts[2].lower().split()
+    type_name = words[0].split('(')[0]
+    if len(words) > 1 and words[1] == UNSIGNED:
+        return f"{type_name} {UNSIGNED}"
+    return type_name
+
+
+def _to_number(column):
+    """
+    转为数值, 有无法转换的值时返回 None
+    """
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        return column
+    converted = pd.to_numeric(column, errors="coerce")
+    if (converted.isna() & column.notna()).any():
+        return None
+    return converted
+
+
+def _to_int(column, is_bigint, unsigned):
+    """
+    转为整数, 有小数或超出取值范围的值时返回原列
+    """
+    dtype, nullable_dtype, low, high = INT_DTYPES[(is_bigint, unsigned)]
+    numbers = _to_number(column)
+    if numbers is None:
+        return column
+    if pd.api.types.is_integer_dtype(numbers) and numbers.notna().all():
+        # 整数列直接比较, 不经过 float64, 大整数不丢失精度
+        values = numbers.to_numpy()
+        if len(values) and (values.min() < low or values.max() >= high):
+            return column
+        return pd.Series(values.astype(dtype), index=column.index, name=column.name)
+
+    values = numbers.to_numpy(dtype=np.float64, na_value=np.nan)
+    mask = np.isnan(values)
+    valid = values[~mask]
+    if (valid % 1 != 0).any() or (valid < low).any() or (valid >= high).any():
+        return column
+    if mask.any():
+        return numbers.astype(nullable_dtype)
+    return pd.Series(values.astype(dtype), index=column.index, name=column.name)
+
+
+def _to_float(column, dtype):
+    numbers = _to_number(column)
+    if numbers is None:
+        return column
+    return numbers.astype(dtype)
+
+
+def coerce_column(column, column_type, name=""):
+    """
+    按字段类型转换一列, 不需要或无法转换时返回原列
+    """
+    type_name, _, modifier = column_type.partition(" ")
+    unsigned = modifier == UNSIGNED
+    if type_name in INT32_TYPES:
+        return _to_int(column, False, unsigned)
+    if type_name in INT64_TYPES:
+        return _to_int(column, True, unsigned)
+    if column_type in FLOAT32_TYPES:
+        return _to_float(column, np.float32)
+    if column_type in FLOAT64_TYPES:
+        return _to_float(column, np.float64)
+    if name in CATEGORY_COLUMNS and not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.astype("category")
+    return column
+
+
+def coerce_dtypes(data, column_types):
+    """
+    按字段类型转换 DataFrame 各列, 不在 column_types 中的列不转换
+
+    :param data: 待写入数据
+    :param column_types: {字段名: 类型名}, 类型名见 parse_column_type
+    :return: 转换后的数据
+    """
+    if data is None or len(data) == 0 or not column_types:
+        return data
+    columns = {}
+    for name in data.columns:
+        column_type = column_types.get(name)
+        if column_type is None:
+            continue
+        converted = coerce_column(data[name], column_type, name)
+        if converted is not data[name]:
+            columns[name] = converted
+    if not columns:
+        return data
+    return data.assign(**columns)
@@ -0,0 +1,319 @@
+"""
+本地计算技术因子
+
+stk_factor_pro 每天要按日分页拉取全市场的前复权行情和 MA / MACD / KDJ 因子，调用量大且受积分限制。
+这些因子都可以由本地的 daily（不复权行情）和 adj_factor（复权因子）算出，SQL 脚本声明 `-- local_factors: true` 后
+TushareSync.sync() 不再调用接口，由本模块计算并写入同名同字段的表:
+
+    *_qfq           前复权价格 = 价格 * 复权因子 / 该股票最新的复权因子, 见 utils/adj_price.py
+    pre_close_qfq   昨收价 * 当日复权因子 / 最新复权因子
+    ma_qfq_N        前复权收盘价 N 日简单移动平均, 不足 N 条记录时为空
+    macd_dif_qfq    EMA(close, 12) - EMA(close, 26), EMA 以该股票第一条收盘价为初值
+    macd_dea_qfq    EMA(dif, 9)
+    macd_qfq        (dif - dea) * 2
+    kdj_k_qfq       RSV = (close - LLV(low, 9)) / (HHV(high, 9) - LLV(low, 9)) * 100, K = SMA(RSV, 3, 1), 初值 50
+    kdj_d_qfq       D = SMA(K, 3, 1), 初值 50
+    kdj_qfq         J = 3K - 2D
+    change / pct_chg / vol / amount   与 daily 相同（未复权）
+
+量比、估值、股本、市值（volume_ratio, pe_ttm, pb, dv_ratio, *_share, *_mv）来自 daily_basic，不能由日线算出，写入空值。
+
+所有指标按 ts_code 排序后在整列上用 NumPy / pandas 的向量化运算计算，不逐只股票循环:
+MA 为累加和相减, 最高最低价为按滞后期逐个比较, EMA / SMA 为分组的 ewm。
+
+增量规则:
+1. 表为空或 rebuild 时按 ts_code 分批计算全部历史
+2. 否则只读取表中最大日期之前 WARMUP_DAYS 个交易日起的日线作为预热窗口，计算后只写入最大日期之后的记录;
+   MA 最长 250 日, EMA / SMA 的初值在预热窗口内的影响小于 1e-8, 与全量计算的结果一致
+3. 某只股票发生除权除息（最新复权因子与表中最后一条记录不同）时，前复权价格和因子全部变化，删除后重新计算整个历史
+4. 最大日期之前在 daily 和 adj_factor 中补上的记录（见 adj_price.find_holes），相关股票从最早缺失日期的预热窗口起
+   重新计算，删除并写入该日起的记录
+
+接口返回的因子与本地计算结果的差异用 reconcile 核对，TushareSync.verify_factors 抽样调用接口后生成核对报告。
+
+使用示例:
+    factors = compute_factors(read_daily(sync, "ts_code='000001.SZ'", DAILY_COLUMNS))
+    refresh(TushareSync("stk_factor_pro"))
+    report = reconcile(local, remote)
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.adj_price import (adjust_prices, changed_codes, complete_date, fill_holes, find_holes, in_codes,
+                             latest_factors, read_daily)
+from utils.metrics import get_metrics
+
+SOURCE_TABLES = ["daily", "adj_factor"]
+DAILY_COLUMNS = ["open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol", "amount"]
+MA_WINDOWS = [5, 10, 20, 30, 60, 90, 250]
+MACD_SHORT, MACD_LONG, MACD_M = 12, 26, 9
+KDJ_N, KDJ_M1, KDJ_M2 = 9, 3, 3
+KDJ_INIT = 50.0
+WARMUP_DAYS = 2 * max(MA_WINDOWS) # 预热窗口的交易日数, 停牌的股票在窗口内也能取到足够的记录
+CODE_BATCH = 200 # 全量或重算时每批计算的股票数
+
+QFQ_COLUMNS = ["open_qfq", "high_qfq", "low_qfq", "close_qfq", "pre_close_qfq"]
+FACTOR_COLUMNS = ([f"ma_qfq_{n}" for n in MA_WINDOWS]
+                  + ["macd_qfq", "macd_dea_qfq", "macd_dif_qfq", "kdj_qfq", "kdj_d_qfq", "kdj_k_qfq"])
+# 本地计算的字段, reconcile 默认核对这些字段
+COMPUTED_COLUMNS = QFQ_COLUMNS + ["change", "pct_chg", "vol", "amount", "adj_factor"] + FACTOR_COLUMNS
+# 来自 daily_basic, 本地无法计算
+BASIC_COLUMNS = ["volume_ratio", "pe_ttm", "pb", "dv_ratio", "total_share", "float_share", "free_share",
+                 "total_mv", "circ_mv"]
+COLUMNS = (["ts_code", "trade_date"] + QFQ_COLUMNS + ["change", "pct_chg", "vol", "amount"] + BASIC_COLUMNS
+           + ["adj_factor"] + FACTOR_COLUMNS)
+
+
+def group_ids(codes):
+    """
+    已按 ts_code 排序的数据中每条记录的分组编号和在分组中的序号, 所有指标共用, 只比较一次字符串
+
+    :return: (分组编号, 序号, 各分组第一条记录的下标), 都是 ndarray
+    """
+    codes = np.asarray(codes)
+    new_group = np.ones(len(codes), dtype=bool)
+    new_group[1:] = codes[1:] != codes[:-1]
+    starts = np.flatnonzero(new_group)
+    ids = np.cumsum(new_group) - 1
+    return ids, np.arange(len(codes)) - starts[ids], starts
+
+
+def rolling_mean(values, position, window):
+    """
+    分组的简单移动平均, 用累加和相减计算
+
+    :param values: 按 (ts_code, trade_date) 排序的数值
+    :param position: 每条记录在所属股票中的序号, 从 0 开始
+    :param window: 窗口大小
+    :return: ndarray, 序号不足 window - 1 的记录为 nan
+    """
+    cumsum = np.concatenate([[0.0], np.cumsum(values)])
+    index = np.arange(len(values))
+    start = np.maximum(index + 1 - window, 0)
+    result = (cumsum[index + 1] - cumsum[start]) / window
+    result[position < window - 1] = np.nan
+    return result
+
+
+def rolling_extreme(values, position, window, func):
+    """
+    分组的滚动最高 / 最低值, 窗口内不足 window 条时取已有记录
+
+    :param func: np.fmax / np.fmin
+    """
+    result = values.copy()
+    for lag in range(1, window):
+        mask = position >= lag
+        result[lag:][mask[lag:]] = func(result[lag:][mask[lag:]], values[:-lag][mask[lag:]])
+    return result
+
+
+def _group_ewm(values, ids, alpha):
+    """
+    分组的 ewm 一次计算所有股票; 数据已按分组排序, 结果顺序与输入相同
+    """
+    result = pd.Series(values).groupby(ids, sort=False).ewm(alpha=alpha, adjust=False).mean()
+    return result.to_numpy()
+
+
+def ema(values, ids, span):
+    """
+    分组的指数移动平均, alpha = 2 / (span + 1), 以每只股票的第一个值为初值
+    """
+    return _group_ewm(values, ids, alpha=2 / (span + 1))
+
+
+def sma(values, ids, position, starts, n, m, init):
+    """
+    分组的 SMA(X, N, M) = (M * X + (N - M) * Y') / N, Y 的初值为 init
+
+    ewm 以第一个值为初值, 与以 init 为初值的结果相差 (1 - M/N) ** (序号 + 1) * (init - 第一个值), 按此修正
+    """
+    decay = 1 - m / n
+    result = _group_ewm(values, ids, alpha=m / n)
+    return result + np.power(decay, position + 1) * (init - values[starts[ids]])
+
+
+def compute_factors(data, prev_factors=None):
+    """
+    计算前复权行情和技术因子
+
+    :param data: 包含 ts_code, trade_date, DAILY_COLUMNS, adj_factor 的日线, 复权因子可以缺失, 见 adj_price.read_daily
+    :param prev_factors: {ts_code: 之前的复权因子}, 填充股票开头缺失的因子
+    :return: 列为 COLUMNS 的 DataFrame, 按 ts_code, trade_date 排序; 无法确定复权因子的记录不返回
+    """
+    if data is None or len(data) == 0:
+        return pd.DataFrame(columns=COLUMNS)
+    data = data.sort_values(["ts_code", "trade_date"], kind="stable").reset_index(drop=True)
+    adjusted = adjust_prices(data, prev_factors)
+    # adjust_prices 排序方式相同, 去掉无法确定复权因子的记录后按键对齐
+    data = data.merge(adjusted[["ts_code", "trade_date"]], on=["ts_code", "trade_date"], how="inner")
+
+    result = adjusted[["ts_code", "trade_date", "adj_factor", "open_qfq", "high_qfq", "low_qfq", "close_qfq"]].copy()
+    ids, position, starts = group_ids(result["ts_code"])
+    ends = np.append(starts[1:], len(ids)) - 1
+    factor = result["adj_factor"].to_numpy()
+    result["pre_close_qfq"] = pd.to_numeric(data["pre_close"]).astype(np.float64).to_numpy() * factor / factor[ends[ids]]
+    for name in ["change", "pct_chg", "vol", "amount"]:
+        result[name] = pd.to_numeric(data[name]).astype(np.float64)
+
+    close = result["close_qfq"].to_numpy()
+    for n in MA_WINDOWS:
+        result[f"ma_qfq_{n}"] = rolling_mean(close, position, n)
+
+    dif = ema(close, ids, MACD_SHORT) - ema(close, ids, MACD_LONG)
+    dea = ema(dif, ids, MACD_M)
+    result["macd_dif_qfq"] = dif
+    result["macd_dea_qfq"] = dea
+    result["macd_qfq"] = (dif - dea) * 2
+
+    highest = rolling_extreme(result["high_qfq"].to_numpy(), position, KDJ_N, np.fmax)
+    lowest = rolling_extreme(result["low_qfq"].to_numpy(), position, KDJ_N, np.fmin)
+    spread = highest - lowest
+    # 窗口内最高价等于最低价（如一字板）时 RSV 取中值
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsv = np.where(spread > 0, (close - lowest) / spread * 100, KDJ_INIT)
+    k = sma(rsv, ids, position, starts, KDJ_M1, 1, KDJ_INIT)
+    d = sma(k, ids, position, starts, KDJ_M2, 1, KDJ_INIT)
+    result["kdj_k_qfq"] = k
+    result["kdj_d_qfq"] = d
+    result["kdj_qfq"] = 3 * k - 2 * d
+
+    for name in BASIC_COLUMNS:
+        result[name] = np.nan
+    return result[COLUMNS]
+
+
+def reconcile(local, remote, columns=None, rtol=1e-3, atol=0.011):
+    """
+    核对本地计算的因子与接口返回的因子
+
+    :param local: compute_factors 的结果
+    :param remote: 接口返回的数据
+    :param columns: 核对的字段, 默认 COMPUTED_COLUMNS 中两边都有的字段
+    :param rtol: 相对误差
+    :param atol: 绝对误差, 默认允许相差 0.01 (四舍五入)
+    :return: 每个字段一行的 DataFrame, 列为 column, compared（两边都有值的记录数）, mismatched（超出误差的记录数）,
+             max_abs_diff, max_rel_diff; 只在一边存在的记录不参与核对
+    """
+    if columns is None:
+        columns = [name for name in COMPUTED_COLUMNS if name in local.columns and name in remote.columns]
+    keys = ["ts_code", "trade_date"]
+
+    def normalize(data):
+        data = data[keys + columns].copy()
+        data["ts_code"] = data["ts_code"].astype(str)
+        data["trade_date"] = pd.to_numeric(data["trade_date"]).astype(np.int64)
+        for name in columns:
+            data[name] = pd.to_numeric(data[name]).astype(np.float64)
+        return data
+
+    merged = normalize(local).merge(normalize(remote), on=keys, how="inner", suffixes=("_local", "_remote"))
+    rows = []
+    for name in columns:
+        left, right = merged[f"{name}_local"].to_numpy(), merged[f"{name}_remote"].to_numpy()
+        valid = ~np.isnan(left) & ~np.isnan(right)
+        diff = np.abs(left[valid] - right[valid])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rel = np.where(right[valid] != 0, diff / np.abs(right[valid]), 0.0)
+        mismatched = int((~np.isclose(left[valid], right[valid], rtol=rtol, atol=atol)).sum())
+        rows.append({"column": name, "compared": int(valid.sum()), "mismatched": mismatched,
+                     "max_abs_diff": float(diff.max()) if len(diff) else 0.0,
+                     "max_rel_diff": float(rel.max()) if len(rel) else 0.0})
+    return pd.DataFrame(rows, columns=["column", "compared", "mismatched", "max_abs_diff", "max_rel_diff"])
+
+
+def _write(sync, data):
+    if len(data) == 0:
+        return
+    metrics = get_metrics()
+    data = sync.prepare_data(data)
+    with metrics.timer("write_seconds", sync.table_name, "factors"):
+        sync.save_datafame_to_db(data)
+    metrics.inc("rows", sync.table_name, "factors", len(data))
+
+
+def _compute(sync, where, prev_factors=None):
+    with get_metrics().timer("preprocess_seconds", sync.table_name, "factors"):
+        return compute_factors(read_daily(sync, where, DAILY_COLUMNS), prev_factors)
+
+
+def _recompute(sync, codes, delete, end_date, start_date=None):
+    """
+    按批重新计算股票截至 end_date 的历史, delete 为 True 时先删除已有记录;
+    指定 start_date 时从该日的预热窗口读取日线, 只写入该日起的记录
+    """
+    first = None if start_date is None else warmup_start(sync, start_date)
+    count = 0
+    for i in range(0, len(codes), CODE_BATCH):
+        where = f"{in_codes(codes[i:i + CODE_BATCH])} AND trade_date<='{end_date}'"
+        factors = _compute(sync, where if first is None else f"{where} AND trade_date>='{first}'")
+        if start_date is not None:
+            where += f" AND trade_date>='{start_date}'"
+            factors = factors[factors["trade_date"] >= int(start_date)]
+        if delete:
+            sync.exec_sql(f"DELETE FROM {sync.table_name} WHERE {where}")
+        _write(sync, factors)
+        count += len(factors)
+    return count
+
+
+def warmup_start(sync, last_date):
+    """
+    预热窗口的第一个交易日: daily 中不晚于 last_date 的第 WARMUP_DAYS 个日期, 日线不足时为空
+    """
+    return sync._fetch_one_from_db(
+        f"SELECT trade_date FROM (SELECT DISTINCT trade_date FROM daily WHERE trade_date<='{last_date}') t "
+        f"ORDER BY trade_date DESC LIMIT 1 OFFSET {WARMUP_DAYS - 1}")
+
+
+def refresh(sync, rebuild=False):
+    """
+    由 daily / adj_factor 计算技术因子并写入 sync.table_name, 不调用 Tushare
+
+    :param sync: TushareSync 对象, 表结构与 stk_factor_pro 相同
+    :param rebuild: 是否重建表并计算全部历史
+    :return: 写入记录数
+    """
+    logger = sync.get_logger()
+    missing = [table for table in SOURCE_TABLES if not sync._table_exist(table)]
+    if missing:
+        raise Exception(f"[{', '.join(missing)}] 表不存在, 无法在本地计算 [{sync.table_name}]")
+    sync.create_table(drop_exist=rebuild)
+
+    last_date = sync._fetch_one_from_db(f"SELECT MAX(trade_date) FROM {sync.table_name}")
+    # 只计算到 daily 和 adj_factor 都已同步到的日期, 见 adj_price 增量规则
+    end_date = complete_date(sync)
+    if end_date is None:
+        logger.info("daily 或 adj_factor 表为空, 跳过技术因子计算")
+        return 0
+    if last_date is None:
+        codes = sorted(row[0] for row in sync._fetch_all_from_db("SELECT DISTINCT ts_code FROM daily"))
+        count = _recompute(sync, codes, delete=False, end_date=end_date)
+        logger.info(f"技术因子全量计算完成, 截至 {end_date}, [{len(codes)}] 只股票, 写入 [{count}] 条记录")
+        return count
+    # 最大日期之前补上的日线, 见 adj_price 增量规则
+    holes = find_holes(sync, sync.table_name, min(int(last_date), int(end_date)))
+    if int(end_date) <= int(last_date) and not holes:
+        logger.info(f"daily / adj_factor 截至 {end_date}, 没有 {last_date} 之后的完整数据, 跳过技术因子计算")
+        return 0
+
+    start, appended, changed = None, [], []
+    if int(end_date) > int(last_date):
+        start = warmup_start(sync, last_date)
+        where = f"trade_date>'{last_date}'" if start is None else f"trade_date>='{start}'"
+        where += f" AND trade_date<='{end_date}'"
+        prev_factors = latest_factors(sync, sync.table_name)
+        factors = _compute(sync, where, prev_factors)
+        factors = factors[factors["trade_date"] > int(last_date)]
+        changed = changed_codes(factors, prev_factors)
+        appended = factors[~factors["ts_code"].isin(changed + list(holes))]
+        _write(sync, appended)
+    holes = {ts_code: date for ts_code, date in holes.items() if ts_code not in changed}
+    count = (len(appended) + _recompute(sync, changed, delete=True, end_date=end_date)
+             + fill_holes(sync, holes, end_date, _recompute))
+    logger.info(f"技术因子增量计算完成, 预热窗口自 {start}, {last_date} - {end_date} 追加 [{len(appended)}] 条, "
+                f"复权因子变化重算 [{len(changed)}] 只股票, 补算缺失记录 [{len(holes)}] 只股票, "
+                f"共写入 [{count}] 条记录")
+    return count
@@ -0,0 +1,253 @@
+"""
+同步运行指标
+
+原来只有 "本日导入: N, 累计: M" 这样的日志，无法区分一次同步的耗时花在接口请求、限流等待、预处理、写库还是 DELETE 上。
+SyncMetrics 在进程内按 (表名, 接口名) 汇总:
+
+计数器:
+    calls       调用 Tushare 次数
+    cache_hits  命中本地缓存次数
+    rows        返回记录数
+    bytes       返回数据占用内存字节数
+    retries     重试次数
+    errors      调用失败次数
+耗时分布（秒）:
+    fetch_seconds       接口请求
+    sleep_seconds       限流等待、失败后等待
+    preprocess_seconds  pre_process_data 及按字段类型转换列类型
+    write_seconds       写库
+    delete_seconds      同步前 DELETE 历史数据
+
+同步结束时写出运行报告: 文件名以 .prom 结尾时为 Prometheus textfile（供 node_exporter 的 textfile collector 采集），
+否则为 JSON。报告包含进程启动以来的累计值，每张表同步结束都会覆盖写出一次。
+
+性能剖析: profile("cprofile", path) 包裹一段代码，结束时写出 cProfile 统计（.prof，可用 snakeviz 查看）；
+profile("pyinstrument", path) 写出 pyinstrument HTML 报告（可选依赖，未安装时抛出异常）。
+
+配置:
+    [metrics]
+    path=     # 运行报告路径, 为空时不写出; data_syn.py --metrics-out 优先
+
+使用示例:
+    metrics = get_metrics()
+    with metrics.timer("write_seconds", "daily", "daily"):
+        ... 写库 ...
+    metrics.inc("rows", "daily", "daily", len(data))
+    metrics.write("logs/metrics.prom")
+"""
+
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import threading
+import time
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+COUNTERS = ["calls", "cache_hits", "rows", "bytes", "retries", "errors"]
+HISTOGRAMS = ["fetch_seconds", "sleep_seconds", "preprocess_seconds", "write_seconds", "delete_seconds"]
+BUCKETS = [0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+PREFIX = "tushare_sync"
+PROFILERS = ["cprofile", "pyinstrument"]
+
+
+class Histogram:
+    """
+    耗时分布, 按 BUCKETS 分桶计数
+    """
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+
+    def cumulative(self):
+        """
+        Prometheus 格式的累计分桶计数 [(上界, 计数), ...], 最后一个上界为 +Inf
+        """
+        total, result = 0, []
+        for bound, count in zip(BUCKETS, self.buckets):
+            total += count
+            result.append((bound, total))
+        result.append(("+Inf", self.count))
+        return result
+
+    def to_dict(self):
+        return {"count": self.count, "sum": round(self.sum, 6), "max": round(self.max, 6),
+                "avg": round(self.sum / self.count, 6) if self.count else 0.0}
+
+
+class SyncMetrics:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started_at = datetime.datetime.now()
+        self._counters = {}  # (name, table, api) -> 值
+        self._histograms = {}  # (name, table, api) -> Histogram
+        self._lock = threading.Lock()
+
+    def inc(self, name, table, api, value=1):
+        """
+        计数器累加
+        """
+        with self._lock:
+            key = (name, table, api)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, table, api, seconds):
+        """
+        记录一次耗时
+        """
+        with self._lock:
+            key = (name, table, api)
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name, table, api):
+        """
+        记录代码块的耗时, 代码块抛出异常时也记录
+        """
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.observe(name, table, api, self.clock() - started)
+
+    def report(self):
+        """
+        运行报告: {"tables": {表名: {"api", 计数器..., 耗时分布...}}}
+        """
+        with self._lock:
+            tables = {}
+            for (name, table, api), value in self._counters.items():
+                tables.setdefault((table, api), {})[name] = value
+            for (name, table, api), histogram in self._histograms.items():
+                tables.setdefault((table, api), {})[name] = histogram.to_dict()
+        return {
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "generated_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "tables": [dict({"table": table, "api": api}, **values) for (table, api), values in sorted(tables.items())],
+        }
+
+    def to_prometheus(self):
+        """
+        Prometheus 文本格式
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+        for name in COUNTERS:
+            items = [(key, value) for key, value in counters if key[0] == name]
+            if items:
+                lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            for (_, table, api), value in items:
+                lines.append(f'{PREFIX}_{name}_total{{table="{table}",api="{api}"}} {value}')
+        for name in HISTOGRAMS:
+            items = [(key, histogram) for key, histogram in histograms if key[0] == name]
+            if items:
+                lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            for (_, table, api), histogram in items:
+                labels = f'table="{table}",api="{api}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{PREFIX}_{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{PREFIX}_{name}_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"{PREFIX}_{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        写出运行报告, .prom 结尾时为 Prometheus textfile, 否则为 JSON; 先写临时文件再替换, 采集程序不会读到半个文件
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            if path.endswith(".prom"):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+_metrics = SyncMetrics()
+_output_path = None
+_output_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    获取进程内共享的 SyncMetrics
+    """
+    return _metrics
+
+
+def set_output_path(path):
+    """
+    设置运行报告路径, 覆盖 [metrics] path
+    """
+    global _output_path
+    _output_path = path
+
+
+def write_report(cfg=None):
+    """
+    写出运行报告到 set_output_path 设置的路径或 [metrics] path, 都没有配置时不写出
+
+    :return: 报告路径, 未写出时为 None
+    """
+    path = _output_path
+    if not path and cfg is not None:
+        path = cfg.get("metrics", "path", fallback="")
+    if not path:
+        return None
+    with _output_lock:
+        _metrics.write(path)
+    return path
+
+
+@contextlib.contextmanager
+def profile(kind, path):
+    """
+    对代码块进行性能剖析, 结束时把结果写入 path
+
+    :param kind: cprofile / pyinstrument
+    :param path: 结果文件, cprofile 为 .prof 统计文件, pyinstrument 为 HTML 报告
+    """
+    if kind not in PROFILERS:
+        raise Exception(f"不支持的 profile: {kind}, 可选值: {', '.join(PROFILERS)}")
+    if kind == "pyinstrument" and pyinstrument is None:
+        raise Exception("profile=pyinstrument 需要安装 pyinstrument")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    if kind == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+    else:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
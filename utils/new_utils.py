@@ -2,6 +2,10 @@
 各种小工具函数
 """
 
+import pandas as pd
+
+from utils.trade_calendar import PERIOD_MONTH, PERIOD_WEEK, period_calendar
+
 def convert_table_desc_to_sql(table_desc: str, varchar_length=64) -> str:
     """将表描述文本转换为建表SQL脚本
     
@@ -47,9 +51,10 @@ def convert_table_desc_to_sql(table_desc: str, varchar_length=64) -> str:
     ])
     
     # 构建完整的建表SQL
+    columns_sql = ',\n    '.join(fields)
     sql = f"""DROP TABLE IF EXISTS `{table_name}`;
 CREATE TABLE `{table_name}` (
-    {',\n    '.join(fields)}
+    {columns_sql}
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='{table_comment}';
 """
     return sql
@@ -85,78 +90,35 @@ def get_week_of_year(date_str: str) -> int:
 
 # ... existing code ...
 
-def get_week_trade_cal(daily_trade_cal: list) -> list:
-    """将日交易日历转换为周交易日历
+def get_week_trade_cal(daily_trade_cal) -> dict:
+    """将日交易日历转换为周交易日历, 周按 ISO 年-周划分
     
     Args:
-        daily_trade_cal: 日交易日历列表，每个元素为dict，包含cal_date和is_open字段
+        daily_trade_cal: 日交易日历, DataFrame 或 dict 列表，包含cal_date和is_open字段
         
     Returns:
-        list: 周交易日历列表，每个元素为dict，包含week_start_date和week_end_date字段
+        dict: 按周排序的 numpy 数组，week(ISO 年*100+周数)、week_start_date、week_end_date、days
     """
-    if not daily_trade_cal:
-        return []
-        
-    # 按日期排序
-    daily_trade_cal = sorted(daily_trade_cal, key=lambda x: x['cal_date'])
-    
-    week_cal = []
-    current_week = {'week_start_date': "", 'week_end_date': ""}
-    
-    last_week_day = 0
-    for day in daily_trade_cal:
-        if day['is_open'] != 1:  # 跳过非交易日
-            continue
-            
-        date_str = day['cal_date']
-        if not current_week['week_start_date']:
-            current_week['week_start_date'] = date_str
-            
-        # 检查是否是周五或最后一个交易日
-        if date_str[-2:] == '05' or day == daily_trade_cal[-1]:
-            current_week['week_end_date'] = date_str
-            week_cal.append(current_week.copy())
-            current_week = {'week_start_date': None, 'week_end_date': None}
-            
-    return week_cal
+    return _period_trade_cal(daily_trade_cal, PERIOD_WEEK, 'week')
 
-def get_month_trade_cal(daily_trade_cal: list) -> list:
+def get_month_trade_cal(daily_trade_cal) -> dict:
     """将日交易日历转换为月交易日历
     
     Args:
-        daily_trade_cal: 日交易日历列表，每个元素为dict，包含cal_date和is_open字段
+        daily_trade_cal: 日交易日历, DataFrame 或 dict 列表，包含cal_date和is_open字段
         
     Returns:
-        list: 月交易日历列表，每个元素为dict，包含month_start_date和month_end_date字段
+        dict: 按月排序的 numpy 数组，month(年月)、month_start_date、month_end_date、days
     """
-    if not daily_trade_cal:
-        return []
-        
-    # 按日期排序
-    daily_trade_cal = sorted(daily_trade_cal, key=lambda x: x['cal_date'])
-    
-    month_cal = []
-    current_month = {'month_start_date': None, 'month_end_date': None}
-    current_month_str = None
-    
-    for day in daily_trade_cal:
-        if day['is_open'] != 1:  # 跳过非交易日
-            continue
-            
-        date_str = day['cal_date']
-        month_str = date_str[:6]  # 获取年月部分
-        
-        if month_str != current_month_str:
-            if current_month['month_start_date']:
-                # 保存上一个月的数据
-                month_cal.append(current_month.copy())
-            current_month = {'month_start_date': date_str, 'month_end_date': None}
-            current_month_str = month_str
-            
-        current_month['month_end_date'] = date_str
-        
-    # 添加最后一个月
-    if current_month['month_start_date']:
-        month_cal.append(current_month)
-        
-    return month_cal
+    return _period_trade_cal(daily_trade_cal, PERIOD_MONTH, 'month')
+
+def _period_trade_cal(daily_trade_cal, period, prefix) -> dict:
+    if daily_trade_cal is None or len(daily_trade_cal) == 0:
+        daily_trade_cal = pd.DataFrame({'cal_date': [], 'is_open': []})
+    result = period_calendar(pd.DataFrame(daily_trade_cal), period)
+    return {
+        prefix: result['period'],
+        f'{prefix}_start_date': result['start_date'],
+        f'{prefix}_end_date': result['end_date'],
+        'days': result['days'],
+    }
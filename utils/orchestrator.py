@@ -0,0 +1,119 @@
+"""
+多表并行同步编排
+
+各表访问不同的 Tushare 接口、配额互相独立，逐表串行执行时总耗时是各表限流等待时间之和。
+编排器用线程池并行执行各表的同步任务，总耗时接近最慢的一张表:
+1. 任务声明依赖的表（如 stock_basic、trade_cal），依赖全部成功后才开始执行
+2. 依赖的表不在本次任务列表中时视为已满足
+3. 某个任务失败时，依赖它的任务跳过，其余任务继续执行，全部结束后统一报错
+4. 同一进程内同时访问 Tushare 和 MySQL 的连接数受全局上限控制，见 utils/concurrency.py
+
+workers=1 时按任务声明顺序逐个执行，与原来的串行同步一致。
+
+使用示例:
+    tasks = [
+        SyncTask("trade_cal", trade_cal.sync),
+        SyncTask("daily", daily.sync, depends=["trade_cal"]),
+    ]
+    run_tasks(tasks, drop_exist=False, workers=4)
+"""
+
+import concurrent.futures
+import logging
+import time
+
+from utils import concurrency
+
+_DEFAULT_TUSHARE_CONNECTIONS = 4 # 默认 Tushare 并发连接上限
+_DEFAULT_MYSQL_CONNECTIONS = 4 # 默认 MySQL 并发连接上限
+
+
+class SyncTask:
+    def __init__(self, name, func, depends=None):
+        """
+        :param name: 任务名, 一般为表名
+        :param func: 同步函数, 参数为 drop_exist
+        :param depends: 依赖的任务名列表
+        """
+        self.name = name
+        self.func = func
+        self.depends = list(depends or [])
+
+
+def configure_concurrency(cfg, workers):
+    """
+    按配置设置全局并发上限, 未配置时取 min(workers, 默认上限)
+
+    [concurrency]
+    tushare=4
+    mysql=4
+    """
+    tushare = cfg.getint('concurrency', 'tushare', fallback=min(workers, _DEFAULT_TUSHARE_CONNECTIONS))
+    mysql = cfg.getint('concurrency', 'mysql', fallback=min(workers, _DEFAULT_MYSQL_CONNECTIONS))
+    concurrency.configure(tushare=tushare, mysql=mysql)
+    return tushare, mysql
+
+
+def run_tasks(tasks, drop_exist=False, workers=1, logger=None):
+    """
+    按依赖关系执行同步任务
+
+    :param tasks: SyncTask 列表
+    :param drop_exist: 传给各任务的 drop_exist
+    :param workers: 并行执行的任务数
+    :param logger: 日志对象
+    :return: {任务名: 耗时秒数}
+    :raise Exception: 存在失败或跳过的任务
+    """
+    logger = logger or logging.getLogger("orchestrator")
+    names = {task.name for task in tasks}
+    pending = list(tasks)
+    running = {}  # future -> task
+    succeeded, failed, skipped = set(), {}, []
+    elapsed = {}
+
+    def run(task):
+        start = time.time()
+        task.func(drop_exist)
+        return time.time() - start
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, int(workers))) as executor:
+        while pending or running:
+            # 依赖失败或被跳过的任务直接跳过
+            for task in list(pending):
+                broken = [dep for dep in task.depends if dep in failed or dep in skipped]
+                if broken:
+                    pending.remove(task)
+                    skipped.append(task.name)
+                    logger.error(f"跳过 [{task.name}]: 依赖的表 {broken} 同步失败")
+
+            # 提交依赖已满足的任务, 按声明顺序
+            for task in list(pending):
+                if len(running) >= workers:
+                    break
+                if all(dep in succeeded or dep not in names for dep in task.depends):
+                    pending.remove(task)
+                    logger.info(f"开始同步 [{task.name}]")
+                    running[executor.submit(run, task)] = task
+
+            if not running:
+                # 没有可执行的任务, 剩余任务之间存在循环依赖
+                for task in pending:
+                    skipped.append(task.name)
+                    logger.error(f"跳过 [{task.name}]: 存在循环依赖 {task.depends}")
+                break
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                try:
+                    elapsed[task.name] = future.result()
+                    succeeded.add(task.name)
+                    logger.info(f"同步完成 [{task.name}], 耗时 {elapsed[task.name]:.1f} 秒")
+                except Exception as e:
+                    failed[task.name] = e
+                    logger.error(f"同步失败 [{task.name}]: {e}")
+
+    if failed or skipped:
+        raise Exception(f"同步失败的表: {sorted(failed)}, 跳过的表: {skipped}")
+    return elapsed
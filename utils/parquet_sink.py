@@ -0,0 +1,167 @@
+"""
+Parquet 本地列式镜像
+
+同步写库的同时，把数据按 Hive 分区格式写入本地 Parquet 数据集，供研究程序通过 Arrow 按列读取，
+不必再从 MySQL 全表扫描:
+    <path>/<table>/year=YYYY/month=MM/part-0.parquet
+
+1. 列与 SQL 脚本解析出的 fields 一致，顺序相同
+2. 按 date_column 的年月分区；同步过程中数据先缓存在内存，日期进入下一个月或同步结束时写出；
+   多线程写库时同一月份可能分多次写出，本次同步已写出的日期不会被后续写出覆盖
+3. 写出某个分区时，读取已有文件，删除本次重新同步的日期的旧数据，再合并新数据重写该分区；
+   未涉及的分区不会被改写，增量同步只重写最近的分区;
+   按 ts_code 分批抓取的表（iteration: ts_code）一次只抓部分股票，按 (日期, ts_code) 覆盖旧数据，
+   不会删除同一日期其他股票的记录
+4. 没有 date_column 的表（如 stock_basic）整表写为 <path>/<table>/part-0.parquet
+
+依赖 pyarrow（可选依赖），未安装时不启用。
+
+配置:
+    [parquet]
+    path=/data/parquet
+    tables=daily,weekly    # 可选, 默认全部表
+
+使用示例:
+    sink = ParquetSink("/data/parquet", "daily", fields, "trade_date")
+    sink.write(data)
+    sink.close()
+
+    # 研究程序读取
+    import pyarrow.dataset as ds
+    dataset = ds.dataset("/data/parquet/daily", partitioning="hive")
+"""
+
+import os
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+PART_FILENAME = "part-0.parquet"
+
+
+def available():
+    """
+    是否已安装 pyarrow
+    """
+    return pq is not None
+
+
+def partition_keys(data, date_column):
+    """
+    每行所属的 (year, month) 分区, 日期格式为 YYYYMMDD 或 YYYY-MM-DD
+    """
+    dates = data[date_column].astype(str).str.replace("-", "", regex=False)
+    return dates.str[:4], dates.str[4:6]
+
+
+def row_keys(data, key_columns):
+    """
+    每行的覆盖键: 各键字段转为字符串后以 | 连接, 只有一个字段时即为该字段的字符串
+    """
+    keys = data[key_columns[0]].astype(str)
+    for name in key_columns[1:]:
+        keys = keys + "|" + data[name].astype(str)
+    return keys
+
+
+def merge_partition(existing, new, date_column, keep_dates=(), key_columns=None):
+    """
+    合并分区数据: 删除已有数据中与 new 覆盖键相同的记录, 追加 new, 按日期排序
+
+    :param keep_dates: 不删除的覆盖键, 即本次同步中已经写出过的键（同一日期的数据分多次写出时）
+    :param key_columns: 覆盖键字段, 默认只按 date_column 覆盖
+    """
+    if existing is None or len(existing) == 0:
+        merged = new
+    else:
+        key_columns = key_columns or [date_column]
+        replace_keys = set(row_keys(new, key_columns)) - set(keep_dates)
+        existing = existing[~row_keys(existing, key_columns).isin(replace_keys)]
+        merged = pd.concat([existing, new], ignore_index=True)
+    return merged.sort_values(date_column, kind="stable").reset_index(drop=True)
+
+
+class ParquetSink:
+    def __init__(self, root, table_name, fields, date_column, logger=None, key_columns=None):
+        """
+        :param root: 数据集根目录
+        :param table_name: 表名, 数据写入 root/table_name
+        :param fields: 字段列表
+        :param date_column: 分区日期字段
+        :param logger: 日志对象
+        :param key_columns: 覆盖键字段, 默认为 [date_column]
+        """
+        if not available():
+            raise Exception("未安装 pyarrow, 无法写入 Parquet")
+        self.path = os.path.join(root, table_name)
+        self.fields = list(fields)
+        self.date_column = date_column
+        self.key_columns = list(key_columns) if key_columns else [date_column]
+        self.logger = logger
+        self._pending = {}  # (year, month) -> [DataFrame, ...]
+        self._written_dates = set()  # 本次同步已写出的覆盖键
+        self._lock = threading.Lock()
+
+    def _select_fields(self, data):
+        columns = [name for name in self.fields if name in data.columns] if self.fields else list(data.columns)
+        return data[columns]
+
+    def write(self, data):
+        """
+        缓存一页数据, 日期已进入后续月份的分区写出到文件
+        """
+        if data is None or len(data) == 0:
+            return
+        data = self._select_fields(data)
+        years, months = partition_keys(data, self.date_column)
+        with self._lock:
+            for (year, month), group in data.groupby([years, months], sort=True):
+                self._pending.setdefault((year, month), []).append(group)
+            # 按日期顺序同步时, 只有最新的月份还会有新数据
+            latest = max(self._pending)
+            for key in sorted(self._pending):
+                if key < latest:
+                    self._flush(key)
+
+    def close(self):
+        """
+        写出全部缓存的分区, 结束本次同步
+        """
+        with self._lock:
+            for key in sorted(self._pending):
+                self._flush(key)
+            self._written_dates = set()
+
+    def write_snapshot(self, data):
+        """
+        整表覆盖写入, 用于没有日期字段的基础数据表
+        """
+        self._write_file(self.path, self._select_fields(data))
+
+    # 调用方需持有锁
+    def _flush(self, key):
+        year, month = key
+        new = pd.concat(self._pending.pop(key), ignore_index=True)
+        partition_dir = os.path.join(self.path, f"year={year}", f"month={month}")
+        file_path = os.path.join(partition_dir, PART_FILENAME)
+        existing = pq.read_table(file_path).to_pandas() if os.path.exists(file_path) else None
+        merged = merge_partition(existing, new, self.date_column, self._written_dates, self.key_columns)
+        self._written_dates.update(row_keys(new, self.key_columns))
+        self._write_file(partition_dir, merged)
+        if self.logger:
+            self.logger.info(f"写入 Parquet 分区 [{partition_dir}], 新增 [{len(new)}] 条, 共 [{len(merged)}] 条")
+
+    def _write_file(self, directory, data):
+        # 先写临时文件再替换, 读者不会读到写了一半的文件
+        os.makedirs(directory, exist_ok=True)
+        file_path = os.path.join(directory, PART_FILENAME)
+        tmp_path = file_path + ".tmp"
+        pq.write_table(pa.Table.from_pandas(data, preserve_index=False), tmp_path)
+        os.replace(tmp_path, file_path)
@@ -0,0 +1,169 @@
+"""
+按年分区表的整年回补
+
+weekly 等表按 trade_date RANGE 分区，每年一个分区: PARTITION pYYYY VALUES LESS THAN (YYYY1231)，
+即 pYYYY 存放 [上一分区上界, YYYY1231) 内的数据。
+
+整年回补时不在线上表逐行 DELETE + INSERT，而是:
+1. 创建与线上表结构相同、但不分区的孪生表 <table>__pYYYY（CREATE TABLE ... LIKE + REMOVE PARTITIONING）
+2. 删除孪生表的二级索引，写入该分区日期范围内的全部数据，再一次性补建索引
+3. ALTER TABLE <table> EXCHANGE PARTITION pYYYY WITH TABLE <table>__pYYYY 交换数据，
+   交换后孪生表中是旧数据，直接删除
+交换只修改元数据，整年数据的替换几乎是瞬间完成的，回补期间线上表其余分区不受影响。
+
+另外检查未来年份的分区是否存在，不存在时追加分区（建表脚本只建到 p2045）。
+
+使用示例:
+    backfill = PartitionBackfill("weekly", table_sql, exec_sql, query_rows)
+    start_date, end_date = backfill.date_range(2023)
+    twin = backfill.prepare(2023)
+    ... 写入 [start_date, end_date] 的数据到 twin ...
+    backfill.finish(2023)
+"""
+
+import re
+
+from utils.shadow_load import secondary_indexes
+
+_INDEX_NAME = re.compile(r"(?:KEY|INDEX)\s+`?(\w+)`?", re.IGNORECASE)
+_MAXVALUE = "MAXVALUE"
+
+
+def partition_name(year):
+    return f"p{year}"
+
+
+def twin_table_name(table_name, year):
+    return f"{table_name}__{partition_name(year)}"
+
+
+def _bound(description):
+    return None if description is None or description.upper() == _MAXVALUE else int(description)
+
+
+def partition_date_range(partitions, name):
+    """
+    分区包含的日期范围
+
+    Args:
+        partitions: [(分区名, 上界描述), ...]，按分区顺序排列
+        name: 分区名
+    Returns:
+        (start_date, end_date): 包含前后边界的日期字符串；第一个分区的起始日期为 19700101
+    """
+    lower = 19700101
+    for partition, description in partitions:
+        upper = _bound(description)
+        if partition == name:
+            if upper is None:
+                raise Exception(f"分区 [{name}] 没有上界, 不能整年回补")
+            return str(lower), str(upper - 1)
+        lower = upper
+    raise Exception(f"分区 [{name}] 不存在")
+
+
+def missing_partitions_sql(table_name, partitions, until_year):
+    """
+    补齐分区到 until_year 年底的语句，已覆盖时返回空列表
+
+    Args:
+        partitions: [(分区名, 上界描述), ...]，按分区顺序排列
+        until_year: 需要覆盖到的年份，该年 12 月 31 日的数据也要有分区可写
+    """
+    if not partitions:
+        return []
+    last_name, last_description = partitions[-1]
+    target = int(f"{until_year}1231")
+    if last_description is not None and last_description.upper() == _MAXVALUE:
+        # 最后一个分区是 MAXVALUE 时不会缺分区
+        return []
+
+    last_bound = int(last_description)
+    year = last_bound // 10000
+    new_partitions = []
+    while last_bound <= target:
+        year += 1
+        last_bound = int(f"{year}1231")
+        new_partitions.append(f"PARTITION {partition_name(year)} VALUES LESS THAN ({last_bound})")
+    if not new_partitions:
+        return []
+    return [f"ALTER TABLE `{table_name}` ADD PARTITION ({', '.join(new_partitions)})"]
+
+
+class PartitionBackfill:
+    def __init__(self, table_name, table_sql, exec_sql, query_rows, logger=None):
+        """
+        :param table_name: 按年分区的线上表
+        :param table_sql: 建表脚本, 用于获取二级索引定义
+        :param exec_sql: 执行单条 SQL 语句的函数
+        :param query_rows: 执行查询并返回全部行的函数
+        :param logger: 日志对象
+        """
+        self.table_name = table_name
+        self.exec_sql = exec_sql
+        self.query_rows = query_rows
+        self.logger = logger
+        self.indexes = secondary_indexes(table_sql, table_name)
+
+    def _exec(self, sql):
+        if self.logger:
+            self.logger.info(f"Execute SQL [{sql}]")
+        self.exec_sql(sql)
+
+    def partitions(self):
+        """
+        线上表的分区列表 [(分区名, 上界描述), ...]，不分区的表返回空列表
+        """
+        rows = self.query_rows(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+            f"WHERE TABLE_SCHEMA=DATABASE() AND TABLE_NAME='{self.table_name}' AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION")
+        return [(str(row[0]), None if row[1] is None else str(row[1])) for row in rows]
+
+    def ensure_partitions(self, until_year):
+        """
+        检查并追加未来年份的分区
+
+        :return: 执行的语句数
+        """
+        statements = missing_partitions_sql(self.table_name, self.partitions(), until_year)
+        for sql in statements:
+            self._exec(sql)
+        return len(statements)
+
+    def date_range(self, year):
+        return partition_date_range(self.partitions(), partition_name(year))
+
+    def prepare(self, year):
+        """
+        创建不分区、无二级索引的孪生表
+
+        :return: 孪生表名, 分区日期范围内的数据写入该表
+        """
+        twin = twin_table_name(self.table_name, year)
+        self._exec(f"DROP TABLE IF EXISTS `{twin}`")
+        self._exec(f"CREATE TABLE `{twin}` LIKE `{self.table_name}`")
+        self._exec(f"ALTER TABLE `{twin}` REMOVE PARTITIONING")
+        if self.indexes:
+            drops = ", ".join(f"DROP INDEX `{_INDEX_NAME.search(d).group(1)}`" for d in self.indexes)
+            self._exec(f"ALTER TABLE `{twin}` {drops}")
+        return twin
+
+    def finish(self, year):
+        """
+        补建索引, 与线上表的分区交换数据, 删除孪生表（交换后为旧数据）
+        交换时校验孪生表数据都在分区范围内, 不满足时交换失败, 线上表保持不变
+        """
+        twin = twin_table_name(self.table_name, year)
+        try:
+            if self.indexes:
+                self._exec(f"ALTER TABLE `{twin}` " + ", ".join(f"ADD {d}" for d in self.indexes))
+            self._exec(f"ALTER TABLE `{self.table_name}` EXCHANGE PARTITION {partition_name(year)} WITH TABLE `{twin}`")
+        finally:
+            self.abort(year)
+
+    def abort(self, year):
+        """
+        删除孪生表
+        """
+        self._exec(f"DROP TABLE IF EXISTS `{twin_table_name(self.table_name, year)}`")
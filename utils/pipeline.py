@@ -0,0 +1,122 @@
+"""
+抓取/写库流水线
+
+抓取线程（调用 run 的线程）按顺序抓取每个同步单元（如某一天）的分页数据并放入有界队列，
+一个或多个写库线程从队列中取出数据写库。队列满时抓取线程阻塞，实现背压；
+同步单元按抓取顺序依次回调完成通知，保证日志按日期有序输出。
+
+使用示例:
+    pipeline = FetchWritePipeline(write_func, workers=2, queue_size=4)
+    pipeline.run(units, on_unit_done)
+    # units: 可迭代对象, 每个元素为 (key, pages), pages 为该单元分页数据的可迭代对象
+    # write_func(page) -> 写入记录数
+    # on_unit_done(key, rows): 单元全部写完时按顺序回调
+"""
+
+import queue
+import threading
+
+_STOP = object()
+
+
+class _UnitState:
+    def __init__(self):
+        self.pages_put = 0
+        self.pages_done = 0
+        self.rows = 0
+        self.fetch_done = False
+
+    def completed(self):
+        return self.fetch_done and self.pages_done == self.pages_put
+
+
+class FetchWritePipeline:
+    def __init__(self, write_func, workers=1, queue_size=4):
+        self.write_func = write_func
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+
+    def run(self, units, on_unit_done=None):
+        """
+        执行流水线，直到全部单元写完
+
+        Args:
+            units: (key, pages) 的可迭代对象
+            on_unit_done: 单元完成回调 (key, rows)，按单元顺序调用
+        Returns:
+            int: 写入的总记录数
+        Raises:
+            写库线程中出现的第一个异常
+        """
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._states = {}
+        self._order = []
+        self._next = 0
+        self._total = 0
+        self._error = None
+        self._on_unit_done = on_unit_done
+
+        threads = [threading.Thread(target=self._write_loop, name=f"writer-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for t in threads:
+            t.start()
+
+        try:
+            for key, pages in units:
+                with self._lock:
+                    self._states[key] = _UnitState()
+                    self._order.append(key)
+                for page in pages:
+                    if self._error is not None:
+                        break
+                    with self._lock:
+                        self._states[key].pages_put += 1
+                    self._queue.put((key, page))
+                with self._lock:
+                    self._states[key].fetch_done = True
+                    self._flush_completed()
+                if self._error is not None:
+                    break
+        finally:
+            for _ in threads:
+                self._queue.put(_STOP)
+            for t in threads:
+                t.join()
+
+        if self._error is not None:
+            raise self._error
+        return self._total
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            key, page = item
+            rows = 0
+            try:
+                if self._error is None:
+                    rows = self.write_func(page)
+            except Exception as e:
+                with self._lock:
+                    if self._error is None:
+                        self._error = e
+            with self._lock:
+                state = self._states[key]
+                state.pages_done += 1
+                state.rows += rows
+                self._total += rows
+                self._flush_completed()
+
+    # 按顺序回调已完成的单元, 调用方需持有锁
+    def _flush_completed(self):
+        while self._next < len(self._order):
+            key = self._order[self._next]
+            state = self._states[key]
+            if not state.completed():
+                return
+            self._next += 1
+            del self._states[key]
+            if self._on_unit_done and self._error is None:
+                self._on_unit_done(key, state.rows)
@@ -0,0 +1,39 @@
+"""
+同步完成后的处理
+
+SQL 脚本中声明 `-- post_sync: 名称1, 名称2` 后，TushareSync.sync() 在同步和 after_sync 完成后依次调用这些处理，
+每个处理接收 TushareSync 对象。处理失败只记录错误日志，不影响表本身的同步结果。
+
+已注册的处理:
+    adj_price   增量维护复权行情表 daily_adj，见 utils/adj_price.py
+
+使用示例:
+    for name, hook in get_post_sync_hooks("adj_price"):
+        hook(sync)
+"""
+
+from utils import adj_price
+
+POST_SYNC_HOOKS = {
+    "adj_price": adj_price.refresh,
+}
+
+
+def get_post_sync_hooks(names):
+    """
+    按名称获取处理函数
+
+    Args:
+        names: 逗号分隔的名称, 见 POST_SYNC_HOOKS
+    Returns:
+        [(名称, 处理函数), ...]
+    """
+    hooks = []
+    for name in (names or "").split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in POST_SYNC_HOOKS:
+            raise Exception(f"未知的 post_sync: {name}, 可选值: {list(POST_SYNC_HOOKS.keys())}")
+        hooks.append((name, POST_SYNC_HOOKS[name]))
+    return hooks
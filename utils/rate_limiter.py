@@ -0,0 +1,177 @@
+"""
+Tushare 接口限流器
+
+按 api_name 共享一个限流器，支持多个时间窗口的配额，例如:
+    cyq_chips: "5/min, 10/hour"
+    bak_basic: "2/min, 20/day"
+未声明配额的接口按固定调用间隔 interval 限流（两次调用开始时间至少间隔 interval 秒）
+
+与调用后固定 time.sleep(interval) 不同，限流器只在即将超出配额时才等待，
+接口响应本身耗费的时间也计入间隔。
+
+每个时间窗口是一个令牌桶: 容量为窗口内允许的调用次数，令牌在被使用 period 秒后归还，
+因此任意长度为 period 的时间段内调用次数都不会超过配额。
+
+使用示例:
+    limiter = get_rate_limiter("cyq_chips", quota="5/min, 10/hour")
+    limiter.acquire()  # 必要时阻塞等待
+    data = ts_api.query("cyq_chips", ...)
+"""
+
+import collections
+import re
+import threading
+import time
+
+_PERIODS = {
+    "s": 1, "sec": 1, "second": 1,
+    "m": 60, "min": 60, "minute": 60,
+    "h": 3600, "hour": 3600,
+    "d": 86400, "day": 86400,
+}
+
+
+def parse_quota(quota):
+    """
+    解析配额字符串
+
+    Args:
+        quota: 如 "5/min, 10/hour"，多个窗口用逗号、分号或 and 分隔
+    Returns:
+        list: [(次数, 窗口秒数), ...]
+    """
+    windows = []
+    for item in re.split(r"[,;]|\band\b", quota or ""):
+        item = item.strip()
+        if not item:
+            continue
+        match = re.fullmatch(r"(\d+)\s*/\s*(\d*)\s*([a-zA-Z]+)", item)
+        if not match or match.group(3).lower() not in _PERIODS:
+            raise Exception(f"无法解析的配额: {item}, 示例: 5/min, 10/hour")
+        count = int(match.group(1))
+        period = int(match.group(2) or 1) * _PERIODS[match.group(3).lower()]
+        windows.append((count, period))
+    return windows
+
+
+class TokenBucket:
+    """
+    单个时间窗口的令牌桶，令牌在使用 period 秒后归还
+    """
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+        self._used = collections.deque()  # 已使用令牌的使用时间
+
+    def _release(self, now):
+        while self._used and now - self._used[0] >= self.period:
+            self._used.popleft()
+
+    def available(self, now):
+        self._release(now)
+        return self.capacity - len(self._used)
+
+    def wait_time(self, now):
+        """
+        距离下一个可用令牌的等待秒数
+        """
+        if self.available(now) > 0:
+            return 0
+        return self._used[0] + self.period - now
+
+    def consume(self, now):
+        self._used.append(now)
+
+
+class RateLimiter:
+    def __init__(self, buckets=None):
+        self.buckets = buckets if buckets else []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_quota(cls, quota):
+        return cls([TokenBucket(count, period) for count, period in parse_quota(quota)])
+
+    @classmethod
+    def from_interval(cls, interval):
+        return cls([TokenBucket(1, interval)] if interval > 0 else [])
+
+    def acquire(self):
+        """
+        获取一次调用许可，必要时阻塞等待
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max([bucket.wait_time(now) for bucket in self.buckets], default=0)
+                if wait <= 0:
+                    for bucket in self.buckets:
+                        bucket.consume(now)
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+    def try_acquire(self):
+        """
+        无需等待时获取一次调用许可, 否则立即返回
+
+        Returns:
+            bool: 是否获取到许可
+        """
+        with self._lock:
+            now = time.monotonic()
+            if any(bucket.wait_time(now) > 0 for bucket in self.buckets):
+                return False
+            for bucket in self.buckets:
+                bucket.consume(now)
+            return True
+
+    def wait_time(self):
+        """
+        距离下一次可调用的等待秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            return max([bucket.wait_time(now) for bucket in self.buckets], default=0)
+
+    def set_interval(self, interval):
+        """
+        调整按 interval 限流的间隔, 已按 quota 限流时无操作
+        """
+        with self._lock:
+            if len(self.buckets) == 1 and self.buckets[0].capacity == 1:
+                self.buckets[0].period = interval
+            elif not self.buckets and interval > 0:
+                self.buckets = [TokenBucket(1, interval)]
+
+    def available(self):
+        """
+        当前无需等待即可发起的调用次数
+        """
+        with self._lock:
+            now = time.monotonic()
+            return min([bucket.available(now) for bucket in self.buckets], default=float("inf"))
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_name, quota="", interval=0):
+    """
+    获取 api_name 对应的共享限流器，同一进程内相同接口、相同配额的调用共用一个限流器
+
+    Args:
+        api_name: Tushare 接口名
+        quota: 配额字符串，如 "5/min, 10/hour"；为空时按 interval 限流
+        interval: 未声明配额时，两次调用之间的最小间隔(秒)
+    """
+    key = (api_name, quota.strip() if quota else f"interval={float(interval)}")
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter.from_quota(quota) if quota else RateLimiter.from_interval(float(interval))
+        return _limiters[key]
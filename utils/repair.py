@@ -0,0 +1,84 @@
+"""
+缺口检测与定向修复
+
+incremental_sync 只从表中最大日期继续同步，中间某天抓取失败（_iter_day_pages 重试后放弃该日）留下的缺口
+之后不会再被补上，只能 --drop_exist 全量重建。TushareSync.repair() 用一次 GROUP BY 统计已有数据，
+只重新抓取缺失或明显偏少的同步单元:
+
+    按日抓取的表 (iteration: day)
+        每个交易日的记录数: 交易日没有记录为 missing;
+        声明了 `-- repair_min_ratio` 时, 记录数少于当日上市股票数 * repair_min_ratio 为 short
+    按 ts_code 抓取的表 (iteration: ts_code)
+        每只股票的记录数: 日期范围内上市、但表中没有记录的股票为 missing
+
+当日上市股票数由股票池（utils/universe.py）的上市、退市日期计算; 股票池只含在市股票时历史日期的数量偏少,
+short 判断偏保守。daily、moneyflow 等表没有停牌股票的记录，大面积停牌的日期（如 2015 年 7 月）重新抓取后仍然偏少:
+repair 在检查点日志中记录每个日期重新抓取到的记录数，记录数没有减少的 short 日期之后不再重新抓取。
+
+使用示例:
+    gaps = find_gap_dates(counts, calendar.open_dates(start, end), listed_counts(universe.data, dates), 0.9,
+                          journal.repaired_rows("daily"))
+    codes = find_missing_codes(code_counts, universe.codes(start_date=start, end_date=end))
+"""
+
+import numpy as np
+import pandas as pd
+
+MISSING = "missing"
+SHORT = "short"
+GAP_COLUMNS = ["date", "rows", "expected", "reason"]
+
+
+def listed_counts(universe_data, dates):
+    """
+    每个日期已上市且未退市的股票数
+
+    :param universe_data: 股票池数据, 包含 list_date, delist_date（YYYYMMDD 字符串, 可以为空）, 见 StockUniverse.data
+    :param dates: 日期列表 (YYYYMMDD)
+    :return: Series, 索引为整数日期
+    """
+    dates = np.array(sorted({int(date) for date in dates}), dtype=np.int64)
+    list_dates = np.sort(pd.to_numeric(universe_data["list_date"]).fillna(0).to_numpy(dtype=np.int64))
+    delist_dates = np.sort(pd.to_numeric(universe_data["delist_date"]).dropna().to_numpy(dtype=np.int64))
+    listed = np.searchsorted(list_dates, dates, side="right")
+    delisted = np.searchsorted(delist_dates, dates, side="left")
+    return pd.Series(listed - delisted, index=dates, dtype=np.int64)
+
+
+def find_gap_dates(counts, open_dates, expected=None, min_ratio=0.0, fetched=None):
+    """
+    缺失或记录数偏少的交易日
+
+    :param counts: {日期: 记录数}, 表中 GROUP BY 日期的结果
+    :param open_dates: 应有数据的交易日列表
+    :param expected: {日期: 预期记录数}, 如 listed_counts 的结果; 为空时只检查缺失
+    :param min_ratio: 记录数少于 预期记录数 * min_ratio 时为 short, 0 时不检查
+    :param fetched: {日期: 之前修复时重新抓取到的记录数}, 记录数不少于该值的日期不算 short
+    :return: 列为 GAP_COLUMNS 的 DataFrame, 按日期排序
+    """
+    dates = pd.Index(sorted({int(date) for date in open_dates}), dtype=np.int64)
+    counts = pd.Series({int(date): int(rows) for date, rows in dict(counts).items()}, dtype=np.int64)
+    rows = counts.reindex(dates).fillna(0).astype(np.int64)
+    if expected is None or min_ratio <= 0:
+        expected = pd.Series(0, index=dates, dtype=np.int64)
+    else:
+        expected = pd.Series(expected, dtype=np.float64).reindex(dates).fillna(0).astype(np.int64)
+
+    missing = rows.to_numpy() == 0
+    short = ~missing & (rows.to_numpy() < expected.to_numpy() * min_ratio)
+    if fetched:
+        fetched = pd.Series({int(date): int(rows) for date, rows in dict(fetched).items()}, dtype=np.float64)
+        short &= ~(rows.to_numpy() >= fetched.reindex(dates).to_numpy())
+    gaps = pd.DataFrame({"date": dates, "rows": rows.to_numpy(), "expected": expected.to_numpy(),
+                         "reason": np.where(missing, MISSING, SHORT)})
+    return gaps[missing | short].reset_index(drop=True)[GAP_COLUMNS]
+
+
+def find_missing_codes(counts, codes):
+    """
+    股票池中有、表中没有记录的股票, 保持 codes 的顺序
+
+    :param counts: {ts_code: 记录数}, 表中 GROUP BY ts_code 的结果
+    :param codes: 应有数据的股票代码列表
+    """
+    return [code for code in codes if not counts.get(code)]
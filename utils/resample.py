@@ -0,0 +1,128 @@
+"""
+由日线合成周线、月线
+
+weekly / monthly 原来和 daily 一样按自然日逐日调用 Tushare，但只有每周、每月最后一个交易日有数据，
+全量初始化时大部分调用都是空的。日线已经同步到本地后，周线、月线可以直接由 daily 表合成:
+
+    open        周期内第一个交易日的开盘价
+    high / low  周期内最高价 / 最低价
+    close       周期内最后一个交易日的收盘价
+    pre_close   周期内第一个交易日的昨收价（即上一周期的收盘价，除权日为除权后的价格）
+    change      close - pre_close
+    pct_chg     change / pre_close * 100
+    vol/amount  周期内合计
+
+周期按 utils/trade_calendar.py 的 period_ids 划分: 周为 ISO 周（周一至周日）, 月为自然月; 合成结果的 trade_date 为
+周交易日历 / 月交易日历（TradeCalendar.period_calendar）中该周期的最后一个交易日, 尚未结束的周期为 as_of,
+周期结束后重新合成时 trade_date 会移动到周期最后一个交易日。
+
+使用示例:
+    bars = resample_bars(daily, calendar.period_calendar(PERIOD_WEEK), PERIOD_WEEK)
+    diff = compare_bars(bars, api_bars)
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.trade_calendar import PERIOD_WEEK, check_period, period_ids
+
+DAILY_COLUMNS = ["ts_code", "trade_date", "open", "high", "low", "close", "pre_close", "vol", "amount"]
+BAR_COLUMNS = ["ts_code", "trade_date", "open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol", "amount"]
+PRICE_COLUMNS = ["open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol", "amount"]
+
+
+def period_start(date_str, period):
+    """
+    日期所在周期的第一天, 如 20240103 -> 20240101 (周一) / 20240101 (月初)
+    """
+    check_period(period)
+    date = datetime.datetime.strptime(str(date_str), "%Y%m%d")
+    if period == PERIOD_WEEK:
+        date -= datetime.timedelta(days=date.weekday())
+    else:
+        date = date.replace(day=1)
+    return date.strftime("%Y%m%d")
+
+
+def resample_bars(daily, periods, period, as_of=None):
+    """
+    由日线合成周线或月线
+
+    :param daily: 日线数据, 至少包含 DAILY_COLUMNS
+    :param periods: 周或月交易日历, 见 TradeCalendar.period_calendar; 为空时按该股票在周期内的最后一个交易日
+    :param period: week / month
+    :param as_of: 截止交易日, 默认为 daily 中的最大日期; 周期最后一个交易日晚于该日期（未结束）时 trade_date 为该日期
+    :return: 列为 BAR_COLUMNS 的 DataFrame, 按 ts_code, trade_date 排序
+    """
+    check_period(period)
+    if daily is None or len(daily) == 0:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+
+    data = daily[DAILY_COLUMNS].copy()
+    data["trade_date"] = pd.to_numeric(data["trade_date"]).astype(np.int64)
+    for name in DAILY_COLUMNS[2:]:
+        data[name] = pd.to_numeric(data[name]).astype(np.float64)
+    data["ts_code"] = data["ts_code"].astype(str)
+    data = data.sort_values(["ts_code", "trade_date"], kind="stable")
+    data["period"] = period_ids(data["trade_date"], period)
+
+    bars = data.groupby(["ts_code", "period"], sort=False).agg(
+        open=("open", "first"),
+        high=("high", "max"),
+        low=("low", "min"),
+        close=("close", "last"),
+        pre_close=("pre_close", "first"),
+        vol=("vol", "sum"),
+        amount=("amount", "sum"),
+        last_date=("trade_date", "max"),
+    ).reset_index()
+
+    as_of = data["trade_date"].max() if as_of is None else int(as_of)
+    if periods is None:
+        ends = pd.Series(dtype=np.float64)
+    else:
+        ends = pd.Series(periods["end_date"], index=periods["period"])
+    ends = bars["period"].map(ends)
+    # 未结束的周期截至 as_of, 日历未覆盖的周期按该股票在周期内的最后一个交易日
+    ends = ends.where(ends.isna() | (ends <= as_of), as_of)
+    bars["trade_date"] = ends.fillna(bars["last_date"]).astype(np.int64)
+    bars["change"] = bars["close"] - bars["pre_close"]
+    pre_close = bars["pre_close"].where(bars["pre_close"] != 0)
+    bars["pct_chg"] = (bars["change"] / pre_close * 100).round(4)
+    bars["change"] = bars["change"].round(4)
+    return bars[BAR_COLUMNS].sort_values(["ts_code", "trade_date"], kind="stable").reset_index(drop=True)
+
+
+def compare_bars(local, remote, columns=None, rtol=1e-4, atol=0.011):
+    """
+    比较合成的K线与接口返回的K线
+
+    :param local: 合成的K线
+    :param remote: 接口返回的K线
+    :param columns: 比较的字段, 默认 PRICE_COLUMNS 中两边都有的字段
+    :param rtol: 相对误差
+    :param atol: 绝对误差, 默认允许价格相差 0.01 (四舍五入)
+    :return: 不一致的记录, 列为 ts_code, trade_date, 字段名_local, 字段名_remote; 只在一边存在的记录也返回
+    """
+    if columns is None:
+        columns = [name for name in PRICE_COLUMNS if name in local.columns and name in remote.columns]
+    keys = ["ts_code", "trade_date"]
+
+    def normalize(data):
+        data = data[keys + columns].copy()
+        data["ts_code"] = data["ts_code"].astype(str)
+        data["trade_date"] = pd.to_numeric(data["trade_date"]).astype(np.int64)
+        for name in columns:
+            data[name] = pd.to_numeric(data[name]).astype(np.float64)
+        return data
+
+    merged = normalize(local).merge(normalize(remote), on=keys, how="outer",
+                                    suffixes=("_local", "_remote"), indicator=True)
+    bad = merged["_merge"] != "both"
+    for name in columns:
+        left, right = merged[f"{name}_local"].to_numpy(), merged[f"{name}_remote"].to_numpy()
+        both_nan = np.isnan(left) & np.isnan(right)
+        bad |= ~(np.isclose(left, right, rtol=rtol, atol=atol) | both_nan)
+    return merged[bad].drop(columns="_merge").reset_index(drop=True)
@@ -0,0 +1,207 @@
+"""
+Tushare 查询结果的本地缓存
+
+重跑失败的回补或 --drop_exist 重建时，历史数据（如 2010~2023 年的 daily）不会再变化，
+从缓存读取即可，不再重新下载，也不再受接口限流的等待。
+
+1. 缓存键为 api_name + 规范化后的 params + fields 的哈希（与 utils/tushare_replay.py 的 cassette key 相同），
+   包含 offset/limit，即按页缓存
+2. 数据文件: 已安装 pyarrow 时为 zstd 压缩的 Parquet，否则为 gzip 压缩的 JSON；索引为 SQLite 文件
+3. 有效期: 按交易日查询（参数含 trade_date）且该日早于今天时，数据已收盘，永久有效；
+   其他查询只在 recent_ttl 秒内有效: trade_date 为今天或以后、没有 trade_date 参数（如 stock_basic），
+   按 start_date / end_date 窗口查询（财报、业绩预告等历史窗口内的数据仍会修订或补充披露），以及结果为空时
+4. 缓存总大小超过 max_size 时，按最近访问时间淘汰（LRU）
+
+查询先读缓存，命中时不经过限流器；未命中才等待限流并调用接口，结果写入缓存。
+
+配置:
+    [cache]
+    path=cache          # 缓存目录, 为空时不启用
+    max_size_mb=2048    # 缓存总大小上限
+    recent_ttl=600      # 非永久缓存的查询结果的有效期(秒)
+
+使用示例:
+    cache = ResponseCache("cache")
+    data = cache.get("daily", params, fields)
+    if data is None:
+        data = ts_api.query("daily", **params, fields=fields)
+        cache.put("daily", params, fields, data)
+"""
+
+import contextlib
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from utils.tushare_replay import cassette_key
+from utils.writers import dataframe_to_rows
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+DEFAULT_MAX_SIZE_MB = 2048
+DEFAULT_RECENT_TTL = 600
+FORMAT_PARQUET = "parquet"
+FORMAT_JSON = "json.gz"
+
+_DATE_VALUE = re.compile(r"^\d{8}$")
+
+
+def _today(now):
+    return time.strftime("%Y%m%d", time.localtime(now))
+
+
+def expires_at(params, data, now, recent_ttl):
+    """
+    缓存过期时间, 永久有效时返回 None
+
+    :param params: 查询参数
+    :param data: 查询结果
+    :param now: 当前时间戳
+    :param recent_ttl: 非永久缓存的查询结果的有效期(秒)
+    """
+    trade_date = str(params.get("trade_date", ""))
+    if _DATE_VALUE.match(trade_date) and trade_date < _today(now) and len(data) > 0:
+        return None
+    return now + recent_ttl
+
+
+class ResponseCache:
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE_MB * 1024 * 1024, recent_ttl=DEFAULT_RECENT_TTL, clock=time.time):
+        """
+        :param path: 缓存目录
+        :param max_size: 缓存总大小上限(字节)
+        :param recent_ttl: 非永久缓存的查询结果的有效期(秒)
+        :param clock: 返回当前时间戳的函数
+        """
+        self.path = path
+        self.max_size = max_size
+        self.recent_ttl = recent_ttl
+        self.clock = clock
+        self.format = FORMAT_PARQUET if pq is not None else FORMAT_JSON
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_entry ("
+                         "cache_key TEXT PRIMARY KEY, api_name TEXT, file_name TEXT, size INTEGER, "
+                         "expires_at REAL, last_access REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entry_last_access_idx ON cache_entry (last_access)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.path, "index.db"), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _remove(self, conn, key, file_name):
+        conn.execute("DELETE FROM cache_entry WHERE cache_key=?", (key,))
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(self.path, file_name))
+
+    def get(self, api_name, params, fields):
+        """
+        读取缓存, 未命中或已过期时返回 None
+        """
+        key = cassette_key(api_name, params, fields)
+        now = self.clock()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT file_name, expires_at FROM cache_entry WHERE cache_key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            file_name, expires = row
+            if expires is not None and expires <= now:
+                self._remove(conn, key, file_name)
+                return None
+            try:
+                data = self._read(os.path.join(self.path, file_name))
+            except (OSError, ValueError):
+                # 数据文件丢失或损坏, 当作未命中
+                self._remove(conn, key, file_name)
+                return None
+            conn.execute("UPDATE cache_entry SET last_access=? WHERE cache_key=?", (now, key))
+        return data
+
+    def put(self, api_name, params, fields, data):
+        """
+        写入缓存, 超出大小上限时淘汰最久未访问的数据
+        """
+        if data is None:
+            return
+        key = cassette_key(api_name, params, fields)
+        now = self.clock()
+        file_name = os.path.join(api_name, key[:2], f"{key}.{self.format}")
+        file_path = os.path.join(self.path, file_name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        self._write(tmp_path, data)
+        os.replace(tmp_path, file_path)
+
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO cache_entry VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, api_name, file_name, os.path.getsize(file_path),
+                          expires_at(params, data, now, self.recent_ttl), now))
+            self._evict(conn)
+
+    def size(self):
+        with self._lock, self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entry").fetchone()[0]
+
+    # 调用方需持有锁
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entry").fetchone()[0]
+        if total <= self.max_size:
+            return
+        for key, file_name, size in conn.execute(
+                "SELECT cache_key, file_name, size FROM cache_entry ORDER BY last_access").fetchall():
+            self._remove(conn, key, file_name)
+            total -= size
+            if total <= self.max_size:
+                break
+
+    def _write(self, file_path, data):
+        if self.format == FORMAT_PARQUET:
+            pq.write_table(pa.Table.from_pandas(data, preserve_index=False), file_path, compression="zstd")
+        else:
+            with gzip.open(file_path, "wt", encoding="utf-8") as f:
+                json.dump({"columns": list(data.columns), "items": dataframe_to_rows(data)}, f, ensure_ascii=False)
+
+    def _read(self, file_path):
+        if file_path.endswith(FORMAT_PARQUET):
+            if pq is None:
+                raise ValueError("未安装 pyarrow, 无法读取 Parquet 缓存")
+            return pq.read_table(file_path).to_pandas()
+        with gzip.open(file_path, "rt", encoding="utf-8") as f:
+            content = json.load(f)
+        return pd.DataFrame(content["items"], columns=content["columns"])
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(cfg):
+    """
+    按 [cache] 配置获取共享的缓存对象, 同一进程内相同目录共用; 未配置 path 时返回 None
+    """
+    path = cfg.get("cache", "path", fallback="")
+    if not path:
+        return None
+    with _caches_lock:
+        if path not in _caches:
+            max_size = int(cfg.get("cache", "max_size_mb", fallback=DEFAULT_MAX_SIZE_MB)) * 1024 * 1024
+            recent_ttl = int(cfg.get("cache", "recent_ttl", fallback=DEFAULT_RECENT_TTL))
+            _caches[path] = ResponseCache(path, max_size, recent_ttl)
+        return _caches[path]
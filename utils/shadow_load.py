@@ -0,0 +1,182 @@
+"""
+影子表加载
+
+非增量表（如 stock_basic、trade_cal）每次全量刷新时，原来的做法是先 DROP 线上表再重新写入，
+抓取和写入期间读者看到的是空表或不完整的表，并且写入时逐行维护索引。
+
+影子表加载流程:
+1. 按建表脚本创建 <table>__staging 表；defer_indexes 时先不建二级索引（主键保留）
+2. 数据写入 staging 表
+3. 一次性补建二级索引（重复数据导致唯一索引创建失败时，放弃切换，线上表不受影响）
+4. RENAME TABLE 原子切换: <table> -> <table>__old, <table>__staging -> <table>，再删除 <table>__old
+
+使用示例:
+    loader = ShadowLoader("stock_basic", table_sql, exec_sql, table_exist)
+    staging = loader.prepare()
+    data.to_sql(staging, engine, index=False, if_exists="append")
+    loader.finish()
+"""
+
+import re
+
+STAGING_SUFFIX = "__staging"
+OLD_SUFFIX = "__old"
+
+_CREATE_TABLE = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\(", re.IGNORECASE)
+_SECONDARY_INDEX = re.compile(r"^(UNIQUE\s+(KEY|INDEX)|KEY|INDEX|FULLTEXT|SPATIAL)\b", re.IGNORECASE)
+
+
+def staging_table_name(table_name):
+    return f"{table_name}{STAGING_SUFFIX}"
+
+
+def _split_definitions(sql, start):
+    """
+    从建表语句左括号之后的位置 start 开始，按顶层逗号切分字段和索引定义
+
+    Returns:
+        (definitions, end): 定义列表，右括号之后的位置
+    """
+    definitions = []
+    depth, quote = 1, None
+    item_start = i = start
+    while i < len(sql):
+        ch = sql[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in ("'", '"', "`"):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                definitions.append(sql[item_start:i].strip())
+                return definitions, i + 1
+        elif ch == "," and depth == 1:
+            definitions.append(sql[item_start:i].strip())
+            item_start = i + 1
+        i += 1
+    raise Exception("建表语句括号不匹配")
+
+
+def _parse_create_table(table_sql, table_name):
+    """
+    Returns:
+        (create_sql, definitions, end): 建表语句，字段和索引定义列表，定义列表右括号之后的位置
+    """
+    create_statements = [stmt for stmt in table_sql.split(";") if _CREATE_TABLE.search(stmt)]
+    if not create_statements:
+        raise Exception(f"建表脚本中没有 [{table_name}] 的 CREATE TABLE 语句")
+
+    sql = create_statements[0]
+    definitions, end = _split_definitions(sql, _CREATE_TABLE.search(sql).end())
+    return sql, definitions, end
+
+
+def secondary_indexes(table_sql, table_name):
+    """
+    建表脚本中的二级索引（包括唯一索引，不包括主键）定义列表，如 "KEY `idx` (`ts_code`) USING BTREE"
+    """
+    _, definitions, _ = _parse_create_table(table_sql, table_name)
+    return [d for d in definitions if _SECONDARY_INDEX.match(d)]
+
+
+def build_staging_sql(table_sql, table_name, defer_indexes=True):
+    """
+    根据建表脚本生成 staging 表的建表语句
+
+    Args:
+        table_sql: 建表脚本，可包含 DROP TABLE 等多条语句
+        table_name: 线上表名
+        defer_indexes: 是否推迟创建二级索引
+    Returns:
+        (create_sql, index_sql): staging 表建表语句；补建二级索引的语句，没有需要推迟的索引时为空字符串
+    """
+    sql, definitions, end = _parse_create_table(table_sql, table_name)
+    staging = staging_table_name(table_name)
+
+    deferred = []
+    if defer_indexes:
+        deferred = [d for d in definitions if _SECONDARY_INDEX.match(d)]
+        definitions = [d for d in definitions if not _SECONDARY_INDEX.match(d)]
+
+    create_sql = f"CREATE TABLE `{staging}` (\n    " + ",\n    ".join(definitions) + "\n)" + sql[end:].rstrip()
+    index_sql = ""
+    if deferred:
+        index_sql = f"ALTER TABLE `{staging}` " + ", ".join(f"ADD {d}" for d in deferred)
+    return create_sql, index_sql
+
+
+def swap_sql(table_name, table_exist):
+    """
+    staging 表切换为线上表的语句列表；RENAME TABLE 在一条语句内完成多个改名，对读者是原子的
+    """
+    staging = staging_table_name(table_name)
+    if not table_exist:
+        return [f"RENAME TABLE `{staging}` TO `{table_name}`"]
+    old = f"{table_name}{OLD_SUFFIX}"
+    return [
+        f"DROP TABLE IF EXISTS `{old}`",
+        f"RENAME TABLE `{table_name}` TO `{old}`, `{staging}` TO `{table_name}`",
+        f"DROP TABLE IF EXISTS `{old}`",
+    ]
+
+
+class ShadowLoader:
+    def __init__(self, table_name, table_sql, exec_sql, table_exist, defer_indexes=True, logger=None):
+        """
+        :param table_name: 线上表名
+        :param table_sql: 建表脚本
+        :param exec_sql: 执行单条 SQL 语句的函数
+        :param table_exist: 判断表是否存在的函数, 参数为表名
+        :param defer_indexes: 是否在数据写入后再创建二级索引
+        :param logger: 日志对象
+        """
+        self.table_name = table_name
+        self.staging = staging_table_name(table_name)
+        self.exec_sql = exec_sql
+        self.table_exist = table_exist
+        self.logger = logger
+        self.create_sql, self.index_sql = build_staging_sql(table_sql, table_name, defer_indexes)
+
+    def _exec(self, sql):
+        if self.logger:
+            self.logger.info(f"Execute SQL [{' '.join(sql.split())}]")
+        self.exec_sql(sql)
+
+    def prepare(self):
+        """
+        创建空的 staging 表
+
+        :return: staging 表名, 数据写入该表
+        """
+        self._exec(f"DROP TABLE IF EXISTS `{self.staging}`")
+        self._exec(self.create_sql)
+        return self.staging
+
+    def finish(self):
+        """
+        补建二级索引, 原子切换为线上表; 失败时删除 staging 表, 线上表保持不变
+        """
+        try:
+            if self.index_sql:
+                self._exec(self.index_sql)
+            for sql in swap_sql(self.table_name, self.table_exist(self.table_name)):
+                self._exec(sql)
+        except Exception:
+            self.abort()
+            raise
+
+    def abort(self):
+        """
+        放弃本次加载, 删除 staging 表
+        """
+        try:
+            self._exec(f"DROP TABLE IF EXISTS `{self.staging}`")
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"删除 [{self.staging}] 失败: {e}")
@@ -0,0 +1,185 @@
+"""
+多 token 调度
+
+Tushare 的接口配额按 token 计算（如 cyq_chips 每个 token 每分钟 5 次）。
+[tushare] token 配置多个 token 时，TokenPool 为每个 token 建立独立的接口对象和按接口的限流器，
+每次调用交给当前剩余配额最多的 token，大批量回补（cyq_chips、bak_daily、fina_mainbz 等）的吞吐量随 token 数线性增加。
+
+健康状态:
+1. 配额/频率类错误: 该 token 的该接口冷却 QUOTA_COOLDOWN 秒，其他 token 继续使用
+2. token 无效、无权限等错误: 该 token 停用，不再分配调用
+3. 其他错误连续 MAX_FAILURES 次: 该 token 冷却 FAILURE_COOLDOWN 秒
+全部 token 都已停用时抛出异常。
+
+只配置一个 token 时 TushareSync 和 utils.query_tushare 仍按原来的方式调用，限流器按 api_name 共享。
+
+配置:
+    [tushare]
+    token=token1,token2,token3   # 多个 token 用逗号或换行分隔
+
+使用示例:
+    pool = get_token_pool(cfg)
+    client = pool.acquire("cyq_chips", quota="5/min")   # 必要时阻塞等待
+    data = pool.call(client, "cyq_chips", params, fields)
+"""
+
+import re
+import threading
+import time
+
+from utils.adaptive import is_quota_error
+from utils.rate_limiter import get_rate_limiter
+from utils.tushare_replay import MODE_LIVE, MODE_REPLAY, build_tushare_api, parse_tokens
+
+QUOTA_COOLDOWN = 60.0
+FAILURE_COOLDOWN = 60.0
+MAX_FAILURES = 3
+MAX_WAIT = 1.0
+
+_AUTH_ERROR = re.compile(r"token|权限|积分", re.IGNORECASE)
+
+
+def is_auth_error(error):
+    """
+    是否为 token 无效、无权限类错误, 这类错误重试没有意义
+    """
+    return error is not None and not is_quota_error(error) and _AUTH_ERROR.search(str(error)) is not None
+
+
+class TokenClient:
+    """
+    一个 token 的接口对象与健康状态
+    """
+    def __init__(self, name, api):
+        self.name = name
+        self.api = api
+        self.calls = 0
+        self.failures = 0  # 连续失败次数
+        self.disabled = False
+        self.resume_at = 0.0  # 冷却结束时间, 对所有接口有效
+        self.api_resume_at = {}  # api_name -> 冷却结束时间
+
+    def ready_at(self, api_name):
+        """
+        可以调用 api_name 的时间, 已停用时为 None
+        """
+        if self.disabled:
+            return None
+        return max(self.resume_at, self.api_resume_at.get(api_name, 0.0))
+
+
+class TokenPool:
+    def __init__(self, clients, clock=time.monotonic, logger=None):
+        """
+        :param clients: TokenClient 列表
+        :param clock: 返回当前时间的函数
+        :param logger: 日志对象
+        """
+        self.clients = clients
+        self.clock = clock
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.clients)
+
+    def limiter(self, client, api_name, quota="", interval=0):
+        """
+        token 的接口限流器, 同一进程内相同 token、相同接口共用
+        """
+        return get_rate_limiter(f"{api_name}#{client.name}", quota, interval)
+
+    def acquire(self, api_name, quota="", interval=0, throttle=True):
+        """
+        选择剩余配额最多的健康 token 并占用一次调用许可, 所有 token 都需要等待时阻塞
+
+        :param api_name: 接口名
+        :param quota: 每个 token 的配额, 如 "5/min"; 为空时按 interval 限流
+        :param interval: 未声明配额时每个 token 两次调用的最小间隔(秒)
+        :param throttle: 为 False 时不限流, 只选择健康的 token
+        :return: TokenClient
+        """
+        while True:
+            now = self.clock()
+            with self._lock:
+                ready = [client for client in self.clients if client.ready_at(api_name) is not None]
+                if not ready:
+                    raise Exception("没有可用的 Tushare token: 全部 token 已停用")
+                healthy = [client for client in ready if client.ready_at(api_name) <= now]
+            limiters = {client.name: self.limiter(client, api_name, quota, interval) for client in healthy}
+            # 剩余配额多的优先, 相同时调用次数少的优先
+            for client in sorted(healthy, key=lambda c: (-limiters[c.name].available(), c.calls)):
+                if not throttle or limiters[client.name].try_acquire():
+                    with self._lock:
+                        client.calls += 1
+                    return client
+
+            waits = [limiters[client.name].wait_time() for client in healthy]
+            waits += [client.ready_at(api_name) - now for client in ready if client not in healthy]
+            time.sleep(min(max(min(waits), 0.01), MAX_WAIT))
+
+    def call(self, client, api_name, params, fields):
+        """
+        用 client 调用接口并更新健康状态, 失败时抛出原异常
+        """
+        try:
+            data = client.api.query(api_name, **params, fields=fields)
+        except Exception as e:
+            self.report(client, api_name, e)
+            raise
+        self.report(client, api_name)
+        return data
+
+    def query(self, api_name, params, fields, quota="", interval=0, throttle=True):
+        """
+        acquire 后 call
+        """
+        client = self.acquire(api_name, quota, interval, throttle)
+        return self.call(client, api_name, params, fields)
+
+    def report(self, client, api_name, error=None):
+        """
+        记录一次调用结果
+
+        :param error: 调用失败的异常, 成功时为 None
+        """
+        with self._lock:
+            if error is None:
+                client.failures = 0
+                return
+            now = self.clock()
+            if is_quota_error(error):
+                client.api_resume_at[api_name] = now + QUOTA_COOLDOWN
+                self._log(f"token [{client.name}] 超出接口 [{api_name}] 配额, 冷却 [{QUOTA_COOLDOWN}] 秒")
+            elif is_auth_error(error):
+                client.disabled = True
+                self._log(f"token [{client.name}] 不可用, 停用: {error}")
+            else:
+                client.failures += 1
+                if client.failures >= MAX_FAILURES:
+                    client.failures = 0
+                    client.resume_at = now + FAILURE_COOLDOWN
+                    self._log(f"token [{client.name}] 连续 [{MAX_FAILURES}] 次调用失败, 冷却 [{FAILURE_COOLDOWN}] 秒")
+
+    def _log(self, msg):
+        if self.logger:
+            self.logger.warning(msg)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_token_pool(cfg, logger=None):
+    """
+    按 [tushare] 配置获取共享的 TokenPool, 同一进程内相同 token 列表共用; replay 模式只有一个接口对象
+    """
+    tokens = parse_tokens(cfg.get("tushare", "token", fallback=""))
+    if (cfg.get("tushare", "mode", fallback=MODE_LIVE).strip() or MODE_LIVE) == MODE_REPLAY:
+        tokens = tokens[:1]
+    key = tuple(tokens)
+    with _pools_lock:
+        if key not in _pools:
+            clients = [TokenClient(f"token{i + 1}", build_tushare_api(cfg, token)) for i, token in enumerate(tokens)]
+            _pools[key] = TokenPool(clients, logger=logger)
+        return _pools[key]
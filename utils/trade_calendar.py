@@ -0,0 +1,187 @@
+"""
+交易日历
+
+从本地已同步的 trade_cal 表读取交易日，按交易所缓存在进程内存中，
+用于按日同步时跳过周末和节假日，避免每个休市日都调用一次 Tushare 接口。
+
+trade_cal 表不存在或为空时，退化为逐个自然日遍历；
+日历未覆盖的日期（如日历最后日期之后）也按自然日遍历，保证不会漏同步。
+
+周、月交易日历: period_calendar 对整张日历做向量化计算，周按 ISO 年-周（如 202401）、月按年月（如 202401）分组，
+返回每个周期第一个、最后一个交易日和交易日数的数组；TradeCalendar.period_calendar 按交易所缓存。
+周期划分（period_ids）只在本模块实现，由日线合成周线、月线（utils/resample.py）也按它分组。
+
+使用示例:
+    calendar = TradeCalendar(engine)
+    for date_str in calendar.iter_dates("20240101", "20240131"):
+        ...
+    weeks = calendar.period_calendar(PERIOD_WEEK)
+    weeks["end_date"]    # 每周最后一个交易日
+"""
+
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+DEFAULT_EXCHANGE = "SSE"
+PERIOD_WEEK = "week"
+PERIOD_MONTH = "month"
+PERIODS = [PERIOD_WEEK, PERIOD_MONTH]
+
+_cache = {}
+_period_cache = {} # (exchange, period) -> period_calendar 结果
+_cache_lock = threading.Lock()
+
+
+def clear_cache():
+    """
+    清空交易日历缓存，trade_cal 表重新同步后调用
+    """
+    with _cache_lock:
+        _cache.clear()
+        _period_cache.clear()
+
+
+def check_period(period):
+    if period not in PERIODS:
+        raise Exception(f"不支持的周期: {period}, 可选值: {', '.join(PERIODS)}")
+
+
+def period_ids(dates, period):
+    """
+    日期所在周期的标识: 周为 ISO 年 * 100 + 周数, 月为年月, 如 20240102 -> 202401
+
+    :param dates: YYYYMMDD 格式的日期 (字符串或整数)
+    :return: 整数 numpy 数组
+    """
+    check_period(period)
+    dates = pd.to_numeric(pd.Series(dates)).to_numpy(np.int64)
+    if period == PERIOD_WEEK:
+        iso = pd.to_datetime(dates.astype(str), format="%Y%m%d").isocalendar()
+        return iso["year"].to_numpy(np.int64) * 100 + iso["week"].to_numpy(np.int64)
+    return dates // 100
+
+
+def period_calendar(trade_cal, period):
+    """
+    由日交易日历计算周或月交易日历
+
+    :param trade_cal: 一个交易所的日历 DataFrame, 包含 cal_date, is_open 列, 顺序不限
+    :param period: week / month
+    :return: dict, 每个值为按周期排序的 numpy 数组:
+        period: 周期标识, 周为 ISO 年 * 100 + 周数, 月为年月
+        start_date / end_date: 周期内第一个 / 最后一个交易日 (整数 YYYYMMDD)
+        days: 周期内交易日数
+    """
+    check_period(period)
+    cal_date = pd.to_numeric(pd.Series(trade_cal["cal_date"])).to_numpy(np.int64)
+    is_open = pd.to_numeric(pd.Series(trade_cal["is_open"])).to_numpy() == 1
+    dates = np.unique(cal_date[is_open])
+    if len(dates) == 0:
+        empty = np.array([], dtype=np.int64)
+        return {"period": empty, "start_date": empty, "end_date": empty, "days": empty}
+
+    keys = period_ids(dates, period)
+    # 日期已排序, 相同周期的交易日相邻: 标识变化处为周期的第一个交易日
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:] - 1, len(dates) - 1]
+    return {"period": keys[starts], "start_date": dates[starts], "end_date": dates[ends], "days": ends - starts + 1}
+
+
+def _iter_calendar_days(start_date, end_date):
+    date = datetime.datetime.strptime(start_date, '%Y%m%d')
+    end = datetime.datetime.strptime(end_date, '%Y%m%d')
+    while date <= end:
+        yield date.strftime('%Y%m%d')
+        date += datetime.timedelta(days=1)
+
+
+class TradeCalendar:
+    def __init__(self, engine, exchange=DEFAULT_EXCHANGE, logger=None):
+        self.engine = engine
+        self.exchange = exchange or DEFAULT_EXCHANGE
+        self.logger = logger
+
+    def _load(self):
+        """
+        读取交易所的全部日历
+
+        Returns:
+            (open_dates, first_date, last_date): 交易日集合，日历覆盖的起止日期；读取失败时返回 (None, None, None)
+        """
+        sql = sqlalchemy.text("SELECT cal_date, is_open FROM trade_cal WHERE exchange=:exchange")
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(sql, {"exchange": self.exchange}).fetchall()
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"读取交易日历失败, 按自然日同步: {e}")
+            return None, None, None
+
+        if not rows:
+            if self.logger:
+                self.logger.warning(f"交易日历 [{self.exchange}] 为空, 按自然日同步")
+            return None, None, None
+
+        cal_dates = [str(row[0]) for row in rows]
+        open_dates = {str(row[0]) for row in rows if str(row[1]) == "1"}
+        return open_dates, min(cal_dates), max(cal_dates)
+
+    def get(self):
+        """
+        获取缓存的交易日历，首次调用时从数据库加载
+
+        Returns:
+            (open_dates, first_date, last_date)
+        """
+        with _cache_lock:
+            if self.exchange not in _cache:
+                calendar = self._load()
+                if calendar[0] is None:
+                    # 读取失败不缓存, 下次调用再尝试
+                    return calendar
+                _cache[self.exchange] = calendar
+            return _cache[self.exchange]
+
+    def is_open(self, date_str):
+        """
+        是否交易日，日历未覆盖的日期视为交易日
+        """
+        open_dates, first_date, last_date = self.get()
+        if open_dates is None or date_str < first_date or date_str > last_date:
+            return True
+        return date_str in open_dates
+
+    def iter_dates(self, start_date, end_date):
+        """
+        按日期顺序返回 [start_date, end_date] 内的交易日，包含前后边界
+        """
+        open_dates, first_date, last_date = self.get()
+        for date_str in _iter_calendar_days(start_date, end_date):
+            if open_dates is None or date_str < first_date or date_str > last_date or date_str in open_dates:
+                yield date_str
+
+    def period_calendar(self, period):
+        """
+        周或月交易日历, 见 period_calendar; 按交易所缓存, 日历读取失败时返回 None
+        """
+        key = (self.exchange, period)
+        with _cache_lock:
+            if key in _period_cache:
+                return _period_cache[key]
+        open_dates, _, _ = self.get()
+        if open_dates is None:
+            return None
+        result = period_calendar(pd.DataFrame({"cal_date": sorted(open_dates), "is_open": 1}), period)
+        with _cache_lock:
+            _period_cache[key] = result
+        return result
+
+    def open_dates(self, start_date, end_date):
+        """
+        [start_date, end_date] 内的交易日列表
+        """
+        return list(self.iter_dates(start_date, end_date))
@@ -0,0 +1,135 @@
+"""
+按 ts_code 分批同步的批次规划
+
+exec_sync_with_ts_code 原来把全部 ts_code 按固定的 ts_code_limit 切片，每个日期窗口都调用一遍:
+数据多的批次超过 limit 需要翻页，数据少的批次几乎返回空，已退市或尚未上市的股票也照样查询。
+
+规划方式:
+1. 按股票池（utils/universe.py）的上市/退市日期，去掉在日期窗口内未上市的股票（list_date 晚于窗口结束，或 delist_date 早于窗口开始）
+2. 按本地记录的每只股票每天的平均返回条数，估算每只股票在窗口内的条数，
+   依次把股票装入批次，直到再加一只会超过一页（limit），或批次股票数达到 ts_code_limit（接口一次最多接受的代码数）
+3. 没有历史记录的股票按已有记录的中位数估算；完全没有历史记录时按 ts_code_limit 固定切片，与原来一致
+
+历史记录在一次同步任务全部完成后才写入，中断后续传时批次划分不变，断点记录的同步单元仍然有效。
+
+使用示例:
+    history = RowCountHistory("checkpoints/ts_code_rows.db")
+    codes = universe.codes(start_date="20230101", end_date="20231231")
+    batches = plan_batches(codes, history.rates("fina_indicator"), 365, limit=3000, max_codes=1000)
+"""
+
+import contextlib
+import datetime
+import os
+import sqlite3
+import statistics
+import threading
+
+
+def window_days(start_date, end_date):
+    """
+    日期窗口包含的天数
+    """
+    start = datetime.datetime.strptime(str(start_date), "%Y%m%d")
+    end = datetime.datetime.strptime(str(end_date), "%Y%m%d")
+    return (end - start).days + 1
+
+
+def plan_batches(ts_codes, rates, days, limit, max_codes):
+    """
+    把股票装入批次, 使每批的预计条数不超过一页
+
+    :param ts_codes: 股票代码列表
+    :param rates: {ts_code: 每天平均条数}
+    :param days: 日期窗口天数
+    :param limit: 每页条数
+    :param max_codes: 每批最多股票数
+    :return: [[ts_code, ...], ...]
+    """
+    ts_codes = list(ts_codes)
+    max_codes = max(1, int(max_codes))
+    if not rates:
+        return [ts_codes[i:i + max_codes] for i in range(0, len(ts_codes), max_codes)]
+
+    default_rate = statistics.median(rates.values())
+    batches, batch, expected = [], [], 0.0
+    for ts_code in ts_codes:
+        rows = rates.get(ts_code, default_rate) * days
+        if batch and (expected + rows > limit or len(batch) >= max_codes):
+            batches.append(batch)
+            batch, expected = [], 0.0
+        batch.append(ts_code)
+        expected += rows
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class RowCountHistory:
+    """
+    每个接口、每只股票的历史返回条数, 保存在本地 SQLite 文件
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS code_rows ("
+                         "api_name TEXT, ts_code TEXT, rows INTEGER, days INTEGER, "
+                         "PRIMARY KEY (api_name, ts_code))")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def rates(self, api_name):
+        """
+        :return: {ts_code: 每天平均条数}
+        """
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT ts_code, rows, days FROM code_rows WHERE api_name=? AND days>0",
+                                (api_name,)).fetchall()
+        return {ts_code: count / days for ts_code, count, days in rows}
+
+    def record(self, api_name, observations):
+        """
+        累加观察到的条数
+
+        :param observations: {ts_code: (条数, 天数)}
+        """
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO code_rows VALUES (?, ?, ?, ?) ON CONFLICT (api_name, ts_code) "
+                "DO UPDATE SET rows=rows+excluded.rows, days=days+excluded.days",
+                [(api_name, ts_code, int(count), int(days)) for ts_code, (count, days) in observations.items()])
+
+
+class RowCountRecorder:
+    """
+    在一次同步任务中收集每只股票的返回条数, 任务完成后写入 RowCountHistory
+    """
+    def __init__(self):
+        self.observations = {}  # ts_code -> (条数, 天数)
+
+    def add_rows(self, data):
+        """
+        累加一页数据中每只股票的条数, 数据中没有 ts_code 字段时忽略
+        """
+        if data is None or "ts_code" not in data:
+            return
+        for ts_code, count in data["ts_code"].value_counts().items():
+            rows, days = self.observations.get(ts_code, (0, 0))
+            self.observations[ts_code] = (rows + int(count), days)
+
+    def add_window(self, ts_codes, days):
+        """
+        一个批次查询完成, 批次内每只股票累加窗口天数（包括没有返回数据的股票）
+        """
+        for ts_code in ts_codes:
+            rows, total_days = self.observations.get(ts_code, (0, 0))
+            self.observations[ts_code] = (rows, total_days + days)
@@ -0,0 +1,317 @@
+"""
+Tushare 接口录制与回放
+
+用于在不访问 Tushare 的情况下可重复地测试和压测同步程序:
+1. 录制（record）: 包装真实的 DataApi，每次 query(api_name, params, fields) 的响应写入 cassette 目录
+2. 回放（replay）: 进程内直接从 cassette 返回数据，不发起网络请求
+3. 本地替身服务（StandInServer）: 实现与 Tushare 相同的 HTTP 协议，DataApi 的地址指向它即可，
+   响应来自 cassette 或 responder 函数，可配置响应延迟、配额错误，并按 offset/limit 分页
+
+cassette 文件: <cassette_dir>/<api_name>/<key>.json，key 为 api_name、params、fields 的哈希，
+内容为 {"api_name", "params", "fields", "columns", "items"}。
+查找时先按完整参数匹配；未命中时去掉 offset/limit 再匹配，命中的是整段数据（put(..., paged=False) 保存），
+按 offset/limit 切片返回。压测见 benchmarks/bench_sync.py。
+
+配置:
+    [tushare]
+    mode=live              # live / record / replay, 默认 live
+    cassette_dir=cassettes # cassette 目录
+    http_url=              # 可选, Tushare 接口地址, 如本地替身服务 http://127.0.0.1:8000/dataapi
+
+使用示例:
+    server = StandInServer(CassetteStore("cassettes"), latency=0.05, quota="500/min")
+    server.start()
+    set_http_url(server.url)   # 本进程内的 get_tushare_api 都指向替身服务
+    ...
+    server.stop()
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import tushare as ts
+
+from utils.rate_limiter import RateLimiter
+from utils.writers import dataframe_to_rows
+
+MODE_LIVE = "live"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODES = (MODE_LIVE, MODE_RECORD, MODE_REPLAY)
+
+DEFAULT_CASSETTE_DIR = "cassettes"
+QUOTA_ERROR_CODE = 40203
+QUOTA_ERROR_MSG = "抱歉，您每分钟最多访问该接口{}次，权限的具体详情访问：https://tushare.pro/document/1?doc_id=108。"
+
+# DataApi 自动加入的参数, 与查询内容无关
+_IGNORED_PARAMS = ("ts_type_name",)
+_PAGE_PARAMS = ("offset", "limit")
+
+_http_url = None
+
+
+def set_http_url(url):
+    """
+    进程内覆盖 Tushare 接口地址, 优先于配置文件的 [tushare] http_url, 为 None 时取消覆盖
+    """
+    global _http_url
+    _http_url = url
+
+
+def normalize_fields(fields):
+    if isinstance(fields, (list, tuple)):
+        return ",".join(fields)
+    return (fields or "").replace(" ", "")
+
+
+def normalize_params(params, drop_page=False):
+    """
+    去掉与查询内容无关的参数, 值统一为字符串
+    """
+    ignored = _IGNORED_PARAMS + (_PAGE_PARAMS if drop_page else ())
+    return {k: str(v) for k, v in sorted(params.items()) if k not in ignored and v is not None and v != ""}
+
+
+def cassette_key(api_name, params, fields, drop_page=False):
+    content = json.dumps([api_name, normalize_params(params, drop_page), normalize_fields(fields)],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def page_slice(items, params):
+    """
+    按 offset/limit 切片, 未指定 limit 时返回 offset 之后的全部数据
+    """
+    offset = int(params.get("offset") or 0)
+    limit = int(params.get("limit") or 0)
+    return items[offset:offset + limit] if limit > 0 else items[offset:]
+
+
+class CassetteStore:
+    def __init__(self, path):
+        """
+        :param path: cassette 目录
+        """
+        self.path = path
+
+    def _file_path(self, api_name, key):
+        return os.path.join(self.path, api_name, f"{key}.json")
+
+    def _read(self, api_name, key):
+        file_path = self._file_path(api_name, key)
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, api_name, params, fields, data, paged=True):
+        """
+        保存一次查询的响应
+
+        :param data: 响应数据 DataFrame
+        :param paged: params 是否包含 offset/limit; False 时保存整段数据, 回放时按请求的 offset/limit 切片
+        """
+        key = cassette_key(api_name, params, fields, drop_page=not paged)
+        file_path = self._file_path(api_name, key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        cassette = {
+            "api_name": api_name,
+            "params": normalize_params(params, drop_page=not paged),
+            "fields": normalize_fields(fields),
+            "columns": list(data.columns),
+            "items": dataframe_to_rows(data),
+        }
+        # 先写临时文件再替换, 多线程录制时不会读到写了一半的文件
+        tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cassette, f, ensure_ascii=False)
+        os.replace(tmp_path, file_path)
+
+    def lookup(self, api_name, params, fields):
+        """
+        查找响应
+
+        :return: (columns, items), 未录制时返回 None
+        """
+        cassette = self._read(api_name, cassette_key(api_name, params, fields))
+        if cassette is not None:
+            return cassette["columns"], cassette["items"]
+        cassette = self._read(api_name, cassette_key(api_name, params, fields, drop_page=True))
+        if cassette is not None:
+            return cassette["columns"], page_slice(cassette["items"], params)
+        return None
+
+
+class RecordingApi:
+    """
+    包装真实的 DataApi, 把每次查询的响应保存到 cassette
+    """
+    def __init__(self, api, store):
+        self.api = api
+        self.store = store
+
+    def query(self, api_name, fields="", **kwargs):
+        data = self.api.query(api_name, fields=fields, **kwargs)
+        self.store.put(api_name, kwargs, fields, data)
+        return data
+
+    def __getattr__(self, name):
+        return lambda fields="", **kwargs: self.query(name, fields=fields, **kwargs)
+
+
+class ReplayApi:
+    """
+    从 cassette 回放查询结果, 不访问网络; 未录制的查询抛出异常
+    """
+    def __init__(self, store):
+        self.store = store
+
+    def query(self, api_name, fields="", **kwargs):
+        result = self.store.lookup(api_name, kwargs, fields)
+        if result is None:
+            raise Exception(f"cassette 中没有 api[{api_name}] params[{normalize_params(kwargs)}] 的记录")
+        columns, items = result
+        return pd.DataFrame(items, columns=columns)
+
+    def __getattr__(self, name):
+        return lambda fields="", **kwargs: self.query(name, fields=fields, **kwargs)
+
+
+def parse_tokens(value):
+    """
+    解析 [tushare] token, 多个 token 用逗号或换行分隔
+    """
+    tokens = [token.strip() for token in re.split(r"[,\s]+", value or "") if token.strip()]
+    return tokens or [""]
+
+
+def build_tushare_api(cfg, token=None):
+    """
+    按 [tushare] 配置构建接口对象: live 为 DataApi, record 为 RecordingApi, replay 为 ReplayApi
+
+    :param token: 使用的 token, 为 None 时使用 [tushare] token 中的第一个
+    """
+    mode = cfg.get("tushare", "mode", fallback=MODE_LIVE).strip() or MODE_LIVE
+    if mode not in MODES:
+        raise Exception(f"不支持的 tushare mode: {mode}, 可选值: {', '.join(MODES)}")
+    store = CassetteStore(cfg.get("tushare", "cassette_dir", fallback=DEFAULT_CASSETTE_DIR) or DEFAULT_CASSETTE_DIR)
+    if mode == MODE_REPLAY:
+        return ReplayApi(store)
+
+    if token is None:
+        token = parse_tokens(cfg["tushare"]["token"])[0]
+    api = ts.pro_api(token=token, timeout=300)
+    http_url = _http_url or cfg.get("tushare", "http_url", fallback="")
+    if http_url:
+        api._DataApi__http_url = http_url.rstrip("/")
+    if mode == MODE_RECORD:
+        return RecordingApi(api, store)
+    return api
+
+
+class StandInServer:
+    def __init__(self, store=None, responder=None, latency=0.0, quota="", host="127.0.0.1", port=0):
+        """
+        :param store: CassetteStore, 优先从 cassette 取响应
+        :param responder: 可选, cassette 未命中时调用 responder(api_name, params, fields) 生成整段数据 DataFrame,
+                          按 offset/limit 分页返回; 返回 None 表示没有数据
+        :param latency: 每次请求的响应延迟(秒)
+        :param quota: 模拟的接口配额, 如 "500/min"; 超出时返回配额错误, 为空时不限制
+        :param host: 监听地址
+        :param port: 监听端口, 0 表示随机端口
+        """
+        self.store = store
+        self.responder = responder
+        self.latency = latency
+        self.quota = quota
+        self.calls = 0
+        self.rows = 0
+        self.quota_errors = 0
+        self._limiters = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/dataapi"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="tushare-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _over_quota(self, api_name):
+        # 每个接口单独计算配额, 与 Tushare 一致
+        if not self.quota:
+            return False
+        with self._lock:
+            limiter = self._limiters.setdefault(api_name, RateLimiter.from_quota(self.quota))
+            if limiter.available() <= 0:
+                self.quota_errors += 1
+                return True
+            limiter.acquire()
+            return False
+
+    def handle(self, request):
+        """
+        处理一次请求, 返回与 Tushare 相同格式的响应
+        """
+        api_name = request.get("api_name", "")
+        params = request.get("params") or {}
+        fields = request.get("fields", "")
+        with self._lock:
+            self.calls += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        if self._over_quota(api_name):
+            count = self._limiters[api_name].buckets[0].capacity
+            return {"code": QUOTA_ERROR_CODE, "msg": QUOTA_ERROR_MSG.format(count), "data": None}
+
+        result = self.store.lookup(api_name, params, fields) if self.store is not None else None
+        if result is None and self.responder is not None:
+            data = self.responder(api_name, params, fields)
+            if data is not None:
+                result = list(data.columns), page_slice(dataframe_to_rows(data), params)
+        if result is None:
+            return {"code": 40101, "msg": f"没有 api[{api_name}] params[{normalize_params(params)}] 的记录", "data": None}
+        columns, items = result
+        with self._lock:
+            self.rows += len(items)
+        return {"code": 0, "msg": "", "data": {"fields": columns, "items": items, "has_more": False}}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    response = server.handle(json.loads(self.rfile.read(length) or b"{}"))
+                except Exception as e:
+                    response = {"code": 50000, "msg": f"替身服务异常: {e}", "data": None}
+                body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
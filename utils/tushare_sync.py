@@ -7,17 +7,50 @@
 3. 提供 Tushare API 对象创建
 4. 支持全量同步和增量同步
 5. 支持从 SQL 文件中读取表结构和配置
+6. 支持断点续传: 同步中断后再次执行时，跳过已完成的日期; 未完成的日期先清理再重新抓取
+   （upsert 写入是幂等的，不清理，从记录的 offset 继续），不再清理和重新抓取已完成的数据
+7. 非增量表支持影子表加载: 数据写入 <table>__staging 后原子切换，刷新期间读者始终看到完整的旧表
+8. 按年分区的表支持整年回补（EXCHANGE PARTITION），同步前自动追加未来年份的分区
+9. 可选同时写入本地 Parquet 数据集（按年月分区），配置 [parquet] path 后启用，见 utils/parquet_sink.py
+10. 支持录制和回放 Tushare 接口响应（[tushare] mode），用于离线测试和压测，见 utils/tushare_replay.py
+11. 可选缓存 Tushare 查询结果（[cache] path），重建和回补时已收盘的历史数据直接读缓存，见 utils/response_cache.py
+12. 三种抓取方式（-- iteration）: 按日、按日期窗口、按日期窗口 + ts_code 批次，tables/ 下的各表都由 SQL 脚本声明
+13. 写库前按建表语句的字段类型向量化转换列类型（int32 日期、float32、ts_code 为 category），见 utils/dtypes.py
+14. 周线、月线可以由本地日线合成（-- resample_from），不再调用 Tushare，见 utils/resample.py
+15. 同步完成后的处理（-- post_sync），如 daily / adj_factor 同步后增量维护复权行情，见 utils/post_sync.py
+16. stk_factor_pro 的前复权行情和技术因子可以由本地 daily / adj_factor 计算（-- local_factors），见 utils/factors.py
+17. 缺口修复（repair）: 一次 GROUP BY 找出中间缺失或记录偏少的日期、缺失的股票，只重新抓取这些单元，见 utils/repair.py
+    修复后更新由其生成的表: 复权行情、本地技术因子补算缺失记录，周线、月线重新合成修复日期所在的周期
 
 属性:
     table_name (str): 数据表名
     api_name (str): Tushare API 名称，默认与表名相同
     date_column (str): 日期字段名，默认为 'trade_date'
     fields (list): 需要同步的字段列表
+    column_types (dict): 建表语句中各字段的类型名
     extra_params (dict): 调用 Tushare API 的额外参数
     is_increasing (bool): 数据是否递增，默认为 True
     end_date (str): 同步截止日期，默认为当天
     limit (int): 每次从 Tushare 获取的数据量限制
     interval (float): 每次调用 API 的间隔时间(秒)
+    quota (str): 接口调用配额，如 '5/min, 10/hour'
+    trade_days_only (bool): 是否只同步交易日，date_column 为 trade_date 时默认为 True
+    calendar_exchange (str): 判断交易日使用的交易所日历，默认 SSE
+    write_mode (str): 写库方式，默认为 'to_sql'
+    pipeline_workers (int): 流水线写库线程数，默认 0 表示抓取和写库串行执行
+    queue_size (int): 流水线模式下抓取队列的最大页数
+    shadow_load (bool): update 时是否使用影子表加载，默认 False
+    defer_indexes (bool): 影子表加载时是否在数据写入后再创建二级索引，默认 True
+    adaptive (bool): 是否自适应调整分页大小和调用间隔，默认 False
+    iteration (str): 抓取方式，day / window / ts_code，默认 day
+    date_step (int): window / ts_code 抓取方式每个日期窗口的天数
+    ts_code_limit (int): ts_code 抓取方式每批最多股票数
+    coerce_dtypes (bool): 写库前是否按字段类型转换列类型，默认 True
+    resample_from (str): 合成数据的来源表，如 daily；为空时从 Tushare 抓取
+    resample_period (str): 合成周期，week / month
+    post_sync (list): 同步完成后的处理 [(名称, 处理函数), ...]
+    local_factors (bool): 是否由本地日线计算技术因子，默认 False
+    repair_min_ratio (float): repair 时记录数少于当日上市股票数的该比例视为偏少，默认 0 不检查
 
 配置说明:
 1. SQL 文件中可以通过注释定义以下配置:
@@ -27,7 +60,37 @@
    - is_increasing: 是否递增表， 默认 True；递增表可以使用 increamental_sync 函数，非递增表只能使用 full_sync 函数
    - end_date: 结束日期
    - limit: 每次从 Tushare 获取的数据量限制
-   - interval: 每次调用 API 的间隔时间(秒)
+   - interval: 每次调用 API 的最小间隔时间(秒)，未声明 quota 时生效
+   - quota: 接口调用配额，如 5/min, 10/hour；声明后只在即将超出配额时等待，不再按 interval 限流
+   - trade_days_only: 是否只同步交易日（依据本地 trade_cal 表）；date_column 为 trade_date 时默认 true，其他默认 false，
+                      公告日期类的表（如 forecast, express）非交易日也有数据，不要开启
+   - calendar_exchange: 默认 SSE；判断交易日使用的交易所
+   - write_mode: 写库方式，默认 to_sql；大数据量表可用 load_data（LOAD DATA LOCAL INFILE 批量导入，失败时回退到 to_sql）；
+                 有唯一键的表可用 upsert（INSERT ... ON DUPLICATE KEY UPDATE），同步前不再 DELETE 日期范围内的数据
+   - pipeline_workers: 默认 0；大于 0 时开启流水线模式，抓取线程与写库线程并行，总耗时约为 max(抓取, 写库)
+   - queue_size: 默认 4；流水线模式下抓取队列最多缓存的页数，队列满时抓取线程等待
+   - shadow_load: 默认 false；非增量表 update 时先写入 <table>__staging，再 RENAME TABLE 原子切换，不再先 DROP 线上表
+   - defer_indexes: 默认 true；影子表加载时二级索引在数据写入后一次性创建
+   - adaptive: 默认 false；抓取时自适应调整 limit 和 interval，配额错误时指数退避，学到的值按接口保存，见 utils/adaptive.py
+   - begin_date: 默认 20100101；全量同步的开始日期，一般为 Tushare 中该接口最早有数据的日期
+   - iteration: 默认 day；抓取方式:
+       day: 按日抓取，每个日期调用时传 date_column=日期
+       window: 按 date_step 天的日期窗口抓取，调用时传 start_date / end_date，如 trade_cal
+       ts_code: 按日期窗口 + ts_code 批次抓取，每批股票按本地记录的历史条数规划（utils/ts_code_planner.py），
+                已退市或尚未上市的股票不查询，如 fina_indicator、fina_mainbz
+   - date_step: window / ts_code 抓取方式每个日期窗口的天数，默认 365
+   - ts_code_limit: ts_code 抓取方式每批最多股票数（接口一次接受的代码数），默认 1000
+   - coerce_dtypes: 默认 true；写库前按建表语句的字段类型转换列类型，减少每页数据的内存占用和序列化耗时
+   - resample_from: 默认空；由本地的来源表合成数据，不调用 Tushare，如 weekly / monthly 由 daily 合成；
+                    增量同步时只重新合成最后一个周期（可能尚未结束）及之后的数据
+   - resample_period: resample_from 的合成周期，week / month
+   - post_sync: 默认空；同步完成后的处理，多个用逗号分隔，如 adj_price（维护复权行情表 daily_adj）；
+                处理失败只记录错误日志
+   - local_factors: 默认 false；为 true 时不调用 Tushare，由本地 daily / adj_factor 计算前复权行情和 MA / MACD / KDJ，
+                    只用于与 stk_factor_pro 字段相同的表；增量计算只读取最后 WARMUP_DAYS 个交易日的日线预热
+   - repair_min_ratio: 默认 0；按日抓取、每只股票每天一条记录的表（如 daily），repair 时记录数少于
+                       当日上市股票数 * repair_min_ratio 的交易日重新抓取；为 0 时只重新抓取没有记录的交易日
+   - extra_params 在非递增表（is_increasing: False）中可以是参数字典的列表，update 时按每组参数各抓取一次，如 hs_const
 
 使用示例:
     # 全量同步
@@ -41,6 +104,14 @@
     # 更新基础数据
     sync = TushareSync("stock_basic")
     sync.update()
+
+    # 修复中间缺失的日期
+    sync = TushareSync("daily")
+    sync.repair()
+
+    # 按年分区的表整年回补
+    sync = TushareSync("weekly")
+    sync.backfill(2020, 2023)
 """
 
 """
@@ -55,17 +126,37 @@
     - 从TuShare API 获取数据失败时，打印错误信息
 """
 
-"""
-TODO:
-2. 大数据量考虑使用 LOAD LOCAL INFILE 导入
-"""
-
-import configparser
 import os, time, datetime
 import logging
 
+import pandas as pd
 import sqlalchemy
-import tushare as ts
+
+from utils.adaptive import AdaptiveController, get_adaptive_store
+from utils.checkpoint import CheckpointJournal
+from utils.parquet_sink import ParquetSink, available as parquet_available
+from utils.metrics import get_metrics, write_report
+from utils.partition import PartitionBackfill
+from utils.concurrency import slot, TUSHARE, MYSQL
+from utils.db import load_cfg, get_engine
+from utils.dtypes import coerce_dtypes, parse_column_type
+from utils.pipeline import FetchWritePipeline
+from utils.factors import (COLUMNS as FACTOR_COLUMNS, SOURCE_TABLES as FACTOR_SOURCE_TABLES,
+                           reconcile as reconcile_factors, refresh as refresh_factors)
+from utils.post_sync import get_post_sync_hooks
+from utils.rate_limiter import get_rate_limiter
+from utils.resample import (BAR_COLUMNS as RESAMPLE_BAR_COLUMNS, DAILY_COLUMNS as RESAMPLE_DAILY_COLUMNS,
+                            compare_bars, period_start, resample_bars)
+from utils.repair import find_gap_dates, find_missing_codes, listed_counts
+from utils.response_cache import get_response_cache
+from utils.shadow_load import ShadowLoader
+from utils.token_pool import get_token_pool
+from utils.trade_calendar import (TradeCalendar, DEFAULT_EXCHANGE, PERIOD_WEEK, PERIODS as RESAMPLE_PERIODS,
+                                  clear_cache as clear_calendar_cache)
+from utils.ts_code_planner import RowCountRecorder, plan_batches, window_days
+from utils.tushare_replay import build_tushare_api
+from utils.utils import get_row_count_history, get_universe, get_universe_service
+from utils.writers import get_writer
 
 
 class TushareSync:
@@ -76,7 +167,18 @@ class TushareSync:
     _LIMIT = 50000 # 每次从tushare同步数据量
     _INTERVAL = 0.5 # 每次同步数据间隔时间
     _MAX_RETRY = 3 # 最大重试次数
+    _QUEUE_SIZE = 4 # 流水线模式下抓取队列的最大页数
+    _CHECKPOINT_FILENAME = 'sync_checkpoint.db' # 断点续传日志文件名
+    _ADAPTIVE_FILENAME = 'adaptive_state.json' # 自适应分页和间隔学到的参数文件名
+    _PARTITION_YEARS_AHEAD = 2 # 按年分区的表, 保证至少有未来 N 年的分区
     _DEFAULT_DATE_COLUMN = "trade_date"
+    _DATE_STEP = 365 # window / ts_code 抓取方式每个日期窗口的天数
+    _TS_CODE_LIMIT = 1000 # ts_code 抓取方式每批最多股票数
+
+    ITERATION_DAY = "day"
+    ITERATION_WINDOW = "window"
+    ITERATION_TS_CODE = "ts_code"
+    _ITERATIONS = [ITERATION_DAY, ITERATION_WINDOW, ITERATION_TS_CODE]
 
     class Flags:
         API_NAME = "api_name"
@@ -86,8 +188,32 @@ class TushareSync:
         IS_INCREASING = "is_increasing"
         LIMIT = "limit"
         INTERVAL = "interval"
-
-    _FLAG_KEYS = [Flags.API_NAME, Flags.DATE_COLUMN, Flags.END_DATE, Flags.EXTRA_PARAMS, Flags.IS_INCREASING, Flags.LIMIT, Flags.INTERVAL]
+        QUOTA = "quota"
+        TRADE_DAYS_ONLY = "trade_days_only"
+        CALENDAR_EXCHANGE = "calendar_exchange"
+        WRITE_MODE = "write_mode"
+        PIPELINE_WORKERS = "pipeline_workers"
+        QUEUE_SIZE = "queue_size"
+        SHADOW_LOAD = "shadow_load"
+        DEFER_INDEXES = "defer_indexes"
+        ADAPTIVE = "adaptive"
+        BEGIN_DATE = "begin_date"
+        ITERATION = "iteration"
+        DATE_STEP = "date_step"
+        TS_CODE_LIMIT = "ts_code_limit"
+        COERCE_DTYPES = "coerce_dtypes"
+        RESAMPLE_FROM = "resample_from"
+        RESAMPLE_PERIOD = "resample_period"
+        POST_SYNC = "post_sync"
+        LOCAL_FACTORS = "local_factors"
+        REPAIR_MIN_RATIO = "repair_min_ratio"
+
+    _FLAG_KEYS = [Flags.API_NAME, Flags.DATE_COLUMN, Flags.END_DATE, Flags.EXTRA_PARAMS, Flags.IS_INCREASING, Flags.LIMIT, Flags.INTERVAL,
+                  Flags.QUOTA, Flags.TRADE_DAYS_ONLY, Flags.CALENDAR_EXCHANGE, Flags.WRITE_MODE, Flags.PIPELINE_WORKERS, Flags.QUEUE_SIZE,
+                  Flags.SHADOW_LOAD, Flags.DEFER_INDEXES, Flags.ADAPTIVE, Flags.BEGIN_DATE, Flags.ITERATION, Flags.DATE_STEP,
+                  Flags.TS_CODE_LIMIT, Flags.COERCE_DTYPES,
+                  Flags.RESAMPLE_FROM, Flags.RESAMPLE_PERIOD, Flags.POST_SYNC, Flags.LOCAL_FACTORS,
+                  Flags.REPAIR_MIN_RATIO]
 
 
     def __init__(self, table_name, limit=0):
@@ -110,9 +236,27 @@ class TushareSync:
         self.end_date = ""
         self.extra_params = {}
         self.is_increasing = True
+        self.quota = ""
+        self.calendar_exchange = DEFAULT_EXCHANGE
+        self.write_mode = "to_sql"
+        self.pipeline_workers = 0
+        self.queue_size = TushareSync._QUEUE_SIZE
+        self.shadow_load = False
+        self.defer_indexes = True
+        self.adaptive = False
+        self.iteration = TushareSync.ITERATION_DAY
+        self.date_step = TushareSync._DATE_STEP
+        self.ts_code_limit = TushareSync._TS_CODE_LIMIT
+        self.coerce_dtypes = True
+        self.resample_from = ""
+        self.resample_period = ""
+        self.post_sync = []
+        self.local_factors = False
+        self.repair_min_ratio = 0.0
 
         sql_data = self._extract_data_from_sql_script()
         self.fields = sql_data["fields"]
+        self.column_types = sql_data["column_types"]
         # 参数优先级高于sql脚本中的定义
         if TushareSync.Flags.DATE_COLUMN in sql_data:
             self.date_column = sql_data[TushareSync.Flags.DATE_COLUMN]
@@ -126,6 +270,26 @@ class TushareSync:
             self.limit = int(sql_data[TushareSync.Flags.LIMIT])
         if TushareSync.Flags.INTERVAL in sql_data:
             self.interval = float(sql_data[TushareSync.Flags.INTERVAL])
+        if TushareSync.Flags.QUOTA in sql_data:
+            self.quota = sql_data[TushareSync.Flags.QUOTA]
+        if TushareSync.Flags.CALENDAR_EXCHANGE in sql_data:
+            self.calendar_exchange = sql_data[TushareSync.Flags.CALENDAR_EXCHANGE]
+        if TushareSync.Flags.WRITE_MODE in sql_data:
+            self.write_mode = sql_data[TushareSync.Flags.WRITE_MODE]
+        if TushareSync.Flags.PIPELINE_WORKERS in sql_data:
+            self.pipeline_workers = int(sql_data[TushareSync.Flags.PIPELINE_WORKERS])
+        if TushareSync.Flags.QUEUE_SIZE in sql_data:
+            self.queue_size = int(sql_data[TushareSync.Flags.QUEUE_SIZE])
+        if TushareSync.Flags.BEGIN_DATE in sql_data:
+            self._BEGIN_DATE = sql_data[TushareSync.Flags.BEGIN_DATE]
+        if TushareSync.Flags.ITERATION in sql_data:
+            self.iteration = sql_data[TushareSync.Flags.ITERATION].lower()
+            if self.iteration not in TushareSync._ITERATIONS:
+                raise Exception(f"不支持的 iteration: {self.iteration}, 可选值: {', '.join(TushareSync._ITERATIONS)}")
+        if TushareSync.Flags.DATE_STEP in sql_data:
+            self.date_step = int(sql_data[TushareSync.Flags.DATE_STEP])
+        if TushareSync.Flags.TS_CODE_LIMIT in sql_data:
+            self.ts_code_limit = int(sql_data[TushareSync.Flags.TS_CODE_LIMIT])
 
         if TushareSync.Flags.EXTRA_PARAMS in sql_data:
             try:
@@ -135,6 +299,34 @@ class TushareSync:
 
         if TushareSync.Flags.IS_INCREASING in sql_data:
             self.is_increasing = False if sql_data[TushareSync.Flags.IS_INCREASING].lower() =="false" else True
+        if TushareSync.Flags.SHADOW_LOAD in sql_data:
+            self.shadow_load = sql_data[TushareSync.Flags.SHADOW_LOAD].lower() == "true"
+        if TushareSync.Flags.DEFER_INDEXES in sql_data:
+            self.defer_indexes = sql_data[TushareSync.Flags.DEFER_INDEXES].lower() != "false"
+        if TushareSync.Flags.ADAPTIVE in sql_data:
+            self.adaptive = sql_data[TushareSync.Flags.ADAPTIVE].lower() == "true"
+        if TushareSync.Flags.COERCE_DTYPES in sql_data:
+            self.coerce_dtypes = sql_data[TushareSync.Flags.COERCE_DTYPES].lower() != "false"
+        if TushareSync.Flags.RESAMPLE_FROM in sql_data:
+            self.resample_from = sql_data[TushareSync.Flags.RESAMPLE_FROM]
+            self.resample_period = sql_data.get(TushareSync.Flags.RESAMPLE_PERIOD, "").lower()
+            if self.resample_period not in RESAMPLE_PERIODS:
+                raise Exception(f"不支持的 resample_period: {self.resample_period}, 可选值: {', '.join(RESAMPLE_PERIODS)}")
+        if TushareSync.Flags.POST_SYNC in sql_data:
+            self.post_sync = get_post_sync_hooks(sql_data[TushareSync.Flags.POST_SYNC])
+        if TushareSync.Flags.LOCAL_FACTORS in sql_data:
+            self.local_factors = sql_data[TushareSync.Flags.LOCAL_FACTORS].lower() == "true"
+        if TushareSync.Flags.REPAIR_MIN_RATIO in sql_data:
+            self.repair_min_ratio = float(sql_data[TushareSync.Flags.REPAIR_MIN_RATIO])
+
+        if isinstance(self.extra_params, list) and self.is_increasing:
+            raise Exception(f"[{self.table_name}] extra_params 为列表时只支持非递增表 (is_increasing: False)")
+
+        # 交易日期类的表按日抓取时默认只同步交易日
+        self.trade_days_only = (self.date_column == TushareSync._DEFAULT_DATE_COLUMN
+                                and self.iteration == TushareSync.ITERATION_DAY)
+        if TushareSync.Flags.TRADE_DAYS_ONLY in sql_data:
+            self.trade_days_only = False if sql_data[TushareSync.Flags.TRADE_DAYS_ONLY].lower() == "false" else True
 
         if not self.end_date:
             self.end_date = self.today()
@@ -144,11 +336,24 @@ class TushareSync:
     def _init_env(self):
         self._cfg = None
         self._tushare_api = None
+        self._token_pool = None
         self._logger = None
         # self._mysql_conn = None
         self._sqlalchemy_db_engine = None
+        self._writer = None
+        self._rate_limiter = None
+        self._journal = None
+        self._row_count_history = None # ts_code 抓取方式的历史条数记录, 默认为进程内共享的记录
+        self._universe = None # 股票池, 默认为进程内共享的股票池
+        self._checkpoint_run = False # 是否在断点续传任务中同步
+        self._parquet_sink = None
+        self._adaptive_controller = None
+        self._last_error = None # 最近一次调用 Tushare 失败的异常
+        self._unit_params = {} # window / ts_code 抓取方式: 同步单元 -> 查询参数
+        self._row_recorder = None # ts_code 抓取方式: 本次同步每只股票的返回条数
 
         self.fields = []
+        self.column_types = {}
         self.table_name, self.api_name = "", ""
         self.date_column = TushareSync._DEFAULT_DATE_COLUMN
         self.extra_params = {}
@@ -166,10 +371,6 @@ class TushareSync:
         if end_date:
             self.end_date = end_date
 
-    def __del__(self):
-        if self._sqlalchemy_db_engine:
-            self._sqlalchemy_db_engine.dispose()
-
     def pre_process_data(self, data):
         """
         对从tushare API 获取的数据进行预处理
@@ -183,6 +384,15 @@ class TushareSync:
             预处理后的数据
         """
         return data
+
+    def prepare_data(self, data):
+        """
+        写库前处理: pre_process_data 之后按字段类型转换列类型（coerce_dtypes 为 True 时）
+        """
+        data = self.pre_process_data(data)
+        if self.coerce_dtypes:
+            data = coerce_dtypes(data, self.column_types)
+        return data
     
     def before_sync(self):
         """
@@ -205,28 +415,18 @@ class TushareSync:
         return self._BEGIN_DATE 
     
     def get_cfg(self):
-        # 加载配置信息函数
+        # 加载配置信息函数, 同一配置文件进程内只解析一次 (utils/db.py)
         # TODO: 检查必须配置是否存在，否则抛出异常
-        # TODO: 改为单例模式
 
         if self._cfg is None:
-            cfg = configparser.ConfigParser()
-            cfg.read(os.path.join(os.getcwd(), self._CFG_FILENAME))
-            self._cfg = cfg
+            self._cfg = load_cfg(os.path.join(os.getcwd(), self._CFG_FILENAME))
         
         return self._cfg
 
-    # 获取 SQLAlchemy Connection 对象
+    # 获取 SQLAlchemy Connection 对象, 各同步对象共用一个连接池
     def get_db_engine(self):
         if not self._sqlalchemy_db_engine:
-            cfg = self.get_cfg()
-            db_host = cfg['mysql']['host']
-            db_user = cfg['mysql']['user']
-            db_password = cfg['mysql']['password']
-            db_port = cfg['mysql']['port']
-            db_database = cfg['mysql']['database']
-            db_url = f'mysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_database}?charset=utf8&use_unicode=1'
-            self._sqlalchemy_db_engine = sqlalchemy.create_engine(db_url)
+            self._sqlalchemy_db_engine = get_engine(self.get_cfg())
         
         return self._sqlalchemy_db_engine
 
@@ -251,7 +451,7 @@ class TushareSync:
         Args:
             sql_script: 建表sql脚本; 默认是从 table_filepath 中读取
         Returns:
-            dict: 一定包含 fields, 
+            dict: 一定包含 fields, column_types, 
                 可能包涵 api_name, date_column, extra_params 的键值；在 TushareSync._FLAG_KEYS 中定义
         """
         ret = {}
@@ -260,7 +460,7 @@ class TushareSync:
             sql_script = self._read_table_sql()
         # 按行分割SQL语句
         lines = sql_script.split('\n')
-        columns, api_name, date_column = [], "", ""
+        columns, column_types, api_name, date_column = [], {}, "", ""
         
         # 遍历每一行
         for line in lines:
@@ -284,8 +484,10 @@ class TushareSync:
                 if column_name=="created_time" or column_name=="updated_time":
                     continue
                 columns.append(column_name)
+                column_types[column_name] = parse_column_type(line)
         
         ret["fields"] = columns
+        ret["column_types"] = column_types
         return ret
 
     def _read_table_sql(self):
@@ -346,13 +548,18 @@ class TushareSync:
         result = None
 
         # 执行多条语句
-        with self.get_db_engine().connect() as conn:
+        with slot(MYSQL), self.get_db_engine().connect() as conn:
             for row in clean_sql.split(';'):
                 if row.strip() != '':
                     result = conn.execute(sqlalchemy.text(row))
             conn.commit()
         return result
     
+    # 执行查询语句，返回全部行
+    def _fetch_all_from_db(self, sql):
+        with slot(MYSQL), self.get_db_engine().connect() as conn:
+            return conn.execute(sqlalchemy.text(sql)).fetchall()
+
     # 执行 SQL 语句，返回结果中的第一个值
     def _fetch_one_from_db(self, sql):
         result = self.exec_sql(sql)
@@ -361,23 +568,59 @@ class TushareSync:
         else:
             return None
 
-    # 将tushare dataframe 数据写入数据库, 使用 SQLAlchemy
+    # 获取写库对象, 由 write_mode 决定写库方式
+    def get_writer(self):
+        if self._writer is None:
+            self._writer = get_writer(self.write_mode)
+        return self._writer
+
+    # 将tushare dataframe 数据写入数据库, 追加写入时按 write_mode 选择写库方式
     def save_datafame_to_db(self, data, if_exists="append"):
         db_engine = self.get_db_engine()
         if db_engine:
-            data.to_sql(self.table_name, db_engine, index=False, if_exists=if_exists, chunksize=self.limit)
+            with slot(MYSQL):
+                if if_exists == "append":
+                    self.get_writer().write(db_engine, self.table_name, data, self.limit, self.get_logger())
+                else:
+                    data.to_sql(self.table_name, db_engine, index=False, if_exists=if_exists, chunksize=self.limit)
         else:
             raise Exception("创建 sqlalchemy conn 失败.")
 
-    # 构建 Tushare 查询 API 接口对象
+    # 构建 Tushare 查询 API 接口对象, [tushare] mode 为 record/replay 时录制或回放接口响应
     def get_tushare_api(self):
         if self._tushare_api is None:
-            cfg = self.get_cfg()
-            token = cfg['tushare']['token']
-            self._tushare_api = ts.pro_api(token=token, timeout=300)
+            self._tushare_api = build_tushare_api(self.get_cfg())
         
         return self._tushare_api
 
+    # 获取 token 池, [tushare] token 配置多个 token 时按剩余配额分配调用
+    def get_token_pool(self):
+        if self._token_pool is None:
+            self._token_pool = get_token_pool(self.get_cfg(), self.get_logger())
+        return self._token_pool
+
+    # 获取 Tushare 查询结果缓存, 未配置 [cache] path 时返回 None
+    def get_response_cache(self):
+        return get_response_cache(self.get_cfg())
+
+    # 获取当前接口的限流器, 同一进程内相同接口共用
+    def get_rate_limiter(self):
+        if self._rate_limiter is None:
+            self._rate_limiter = get_rate_limiter(self.api_name, self.quota, self.interval)
+        return self._rate_limiter
+
+    # 获取自适应分页和间隔控制器, 未开启 adaptive 时返回 None
+    def get_adaptive_controller(self):
+        if self.adaptive and self._adaptive_controller is None:
+            cfg = self.get_cfg()
+            file_name = cfg.get('adaptive', 'filename', fallback=TushareSync._ADAPTIVE_FILENAME)
+            store = get_adaptive_store(os.path.join(os.getcwd(), 'checkpoints', file_name))
+            # 按 quota 限流或多个 token 各自限流的接口不调整间隔
+            limiter = None if self.quota or len(self.get_token_pool()) > 1 else self.get_rate_limiter()
+            self._adaptive_controller = AdaptiveController(self.api_name, self.limit, self.interval, store=store,
+                                                           limiter=limiter, logger=self.get_logger())
+        return self._adaptive_controller
+
     def query_tushare_oneday(self, date, ts_code="", offset=0, extra_params={}, sleep=True):
         return self.query_tushare_period(date, date, ts_code=ts_code, offset=offset, extra_params=extra_params, sleep=sleep)
     
@@ -406,7 +649,9 @@ class TushareSync:
     def query_tushare_period(self, start_date, end_date, ts_code="", offset=0, extra_params={}, sleep=True):
         """
         执行tushare API 函数
-        自动休眠 interval 秒，防止对tushare API 的频繁调用
+        调用前通过限流器等待，防止对tushare API 的频繁调用: 声明了 quota 时按配额限流，否则两次调用至少间隔 interval 秒
+        配置了多个 token 时每个 token 独立限流，调用交给剩余配额最多的 token（utils/token_pool.py）
+        配置了 [cache] path 时先查询本地缓存，命中时直接返回，不调用接口
         注意：
             1. ts_code为空时, 只能同步单个日期数据，不能同步时间段数据
             2. 周线数据在周五，月线数据在月末最后一个交易日
@@ -414,14 +659,7 @@ class TushareSync:
         if start_date!=end_date and not ts_code:
             raise Exception("当 start_date 和 end_date 不同时，ts_code 不能为空")
         
-        ts_api = self.get_tushare_api()
-        params = {
-            # self.date_column: start_date,
-            # "start_date": start_date,
-            # "end_date": end_date,
-            "offset": offset,
-            "limit": self.limit
-        }
+        params = {}
 
         if start_date==end_date: # 单个日期
             params.update({self.date_column: start_date})
@@ -434,15 +672,55 @@ class TushareSync:
         if extra_params:
             params.update(extra_params)
 
+        return self.query_tushare_params(params, offset=offset, sleep=sleep)
+
+    def query_tushare_params(self, params, offset=0, sleep=True):
+        """
+        按指定参数调用 tushare API 函数，限流、token 池、缓存与 query_tushare_period 相同
+
+        :param params: 查询参数，不含 offset / limit
+        :param offset: 分页偏移
+        :param sleep: 是否经过限流器
+        :return: 查询结果，失败时返回 None，异常记录在 _last_error
+        """
+        ts_api = self.get_tushare_api()
+        params = dict(params, offset=offset, limit=self.limit)
+
+        # 命中缓存时不经过限流器
+        metrics = get_metrics()
+        cache = self.get_response_cache()
+        if cache is not None:
+            data = cache.get(self.api_name, params, self.fields)
+            if data is not None:
+                metrics.inc("cache_hits", self.table_name, self.api_name)
+                return data
+
+        metrics.inc("calls", self.table_name, self.api_name)
         try:
-            data = ts_api.query(self.api_name, **params, fields=self.fields)
+            pool = self.get_token_pool()
+            if len(pool) > 1:
+                # 多个 token: 每个 token 按 quota / interval 独立限流
+                with metrics.timer("sleep_seconds", self.table_name, self.api_name):
+                    client = pool.acquire(self.api_name, self.quota, self.interval, throttle=sleep)
+                with slot(TUSHARE), metrics.timer("fetch_seconds", self.table_name, self.api_name):
+                    data = pool.call(client, self.api_name, params, self.fields)
+            else:
+                if sleep:
+                    waited = self.get_rate_limiter().acquire()
+                    metrics.observe("sleep_seconds", self.table_name, self.api_name, waited)
 
-            if sleep:
-                time.sleep(self.interval)
-                
-            return data
+                with slot(TUSHARE), metrics.timer("fetch_seconds", self.table_name, self.api_name):
+                    data = ts_api.query(self.api_name, **params, fields=self.fields)
         except Exception as e:
+            self._last_error = e
+            metrics.inc("errors", self.table_name, self.api_name)
             return None
+
+        metrics.inc("rows", self.table_name, self.api_name, len(data))
+        metrics.inc("bytes", self.table_name, self.api_name, int(data.memory_usage(deep=True).sum()))
+        if cache is not None:
+            cache.put(self.api_name, params, self.fields, data)
+        return data
         
     def _test_tushare(self, api_name, params, fields="", offset=0, limit=0):
         if not fields:
@@ -526,10 +804,41 @@ class TushareSync:
 
         return logger,log_file
 
+    # 获取断点续传日志对象, 文件位于 checkpoints 目录
+    def get_journal(self):
+        if self._journal is None:
+            cfg = self.get_cfg()
+            file_name = cfg.get('checkpoint', 'filename', fallback=TushareSync._CHECKPOINT_FILENAME)
+            self._journal = CheckpointJournal(os.path.join(os.getcwd(), 'checkpoints', file_name))
+        return self._journal
+
+    def get_row_count_history(self):
+        return self._row_count_history if self._row_count_history is not None else get_row_count_history()
+
+    def get_universe(self):
+        return self._universe if self._universe is not None else get_universe()
+
+    # 获取 Parquet 镜像写入对象, 未配置 [parquet] path、表不在 tables 列表中或未安装 pyarrow 时返回 None
+    def get_parquet_sink(self):
+        if self._parquet_sink is None:
+            self._parquet_sink = False
+            cfg = self.get_cfg()
+            path = cfg.get('parquet', 'path', fallback='')
+            tables = [name.strip() for name in cfg.get('parquet', 'tables', fallback='').split(',') if name.strip()]
+            if path and (not tables or self.table_name in tables):
+                if parquet_available():
+                    # 按 ts_code 分批抓取时一页只含部分股票, 按 (日期, ts_code) 覆盖 Parquet 中的旧数据
+                    key_columns = [self.date_column, "ts_code"] if self.iteration == TushareSync.ITERATION_TS_CODE else None
+                    self._parquet_sink = ParquetSink(path, self.table_name, self.fields, self.date_column,
+                                                     self.get_logger(), key_columns)
+                else:
+                    self.get_logger().warning("已配置 [parquet] path, 但未安装 pyarrow, 不写入 Parquet")
+        return self._parquet_sink if self._parquet_sink else None
+
     # 获取 SQL 脚本存储文件夹
     def sql_folder(self):
         cfg = self.get_cfg()
-        return cfg['mysql']['sql-folder']
+        return cfg['mysql'].get('sql_folder', cfg['mysql'].get('sql-folder', 'sql'))
     
     # 获取表 SQL 脚本文件绝对路径
     def table_filepath(self):
@@ -546,6 +855,8 @@ class TushareSync:
 
         if (drop_exist) or (not self._table_exist(self.table_name)):
             self.exec_sql(f"DROP TABLE IF EXISTS {self.table_name};") 
+            # 表已重建, 之前的断点记录失效
+            self.get_journal().finish_run(self.table_name)
 
             table_sql_filepath = self.table_filepath()
             table_sql = ""
@@ -562,11 +873,7 @@ class TushareSync:
         :return: 查询结果
         """
         logger = self.get_logger()
-        conn = self.get_pymysql_conn()
-        cursor = conn.cursor()
-        cursor.execute(sql + ';')
-        result = cursor.fetchall()
-        cursor.close()
+        result = self._fetch_all_from_db(sql)
         last_date = result[0][0]
         result = "19700101"
         if last_date is not None:
@@ -589,78 +896,302 @@ class TushareSync:
         return date1 if date1 >= date2 else date2
     
     
-    def sync_from_tushare_to_db(self, start_date, end_date) -> int:
+    def sync_from_tushare_to_db(self, start_date, end_date, resume=False) -> int:
         """
         将数据从tushare同步到数据库
 
         :param start_date: 开始时间
         :param end_date: 结束时间
+        :param resume: 是否为断点续传；续传时不清理整个日期范围，已完成的日期直接跳过，未完成的日期单独清理
         :return: 同步的记录数量
         流程:
-        1. 清理历史数据
+        1. 清理历史数据；write_mode 为 upsert 时按唯一键覆盖写入，不需要清理
         2. 按日期循环从tushare抓取数据，并保存到数据库
+           pipeline_workers > 0 时，抓取与写库并行执行
+        3. 每写完一页数据，在断点续传日志中记录进度
+        4. 配置了 Parquet 镜像时，同步结束后写出缓存的分区
         """
 
+        self._failed_dates = set()
+        self._sync_error = None
+        self._unit_params = {}
+        self._row_recorder = RowCountRecorder() if self.iteration == TushareSync.ITERATION_TS_CODE else None
+        try:
+            return self._sync_range(start_date, end_date, resume)
+        finally:
+            sink = self.get_parquet_sink()
+            if sink:
+                sink.close()
+
+    def _sync_range(self, start_date, end_date, resume) -> int:
+        """
+        清理历史数据并按日期同步，异常时记录到 _sync_error
+        """
         total_count = 0
 
         try:
             # 清理历史数据
-            self.exec_sql(f"DELETE FROM {self.table_name} WHERE {self.date_column}>='{start_date}' AND {self.date_column}<='{end_date}'")
-            self.get_logger().info(f'清理数据: {start_date} ~ {end_date}')
+            if not resume and not self.get_writer().idempotent:
+                with get_metrics().timer("delete_seconds", self.table_name, self.api_name):
+                    self.exec_sql(f"DELETE FROM {self.table_name} WHERE {self.date_column}>='{start_date}' AND {self.date_column}<='{end_date}'")
+                self.get_logger().info(f'清理数据: {start_date} ~ {end_date}')
 
-            # 数据同步时间开始时间和结束时间, 包含前后边界
-            start = self.str_to_date(start_date)
-            end = self.str_to_date(end_date)
+            if self.pipeline_workers > 0:
+                return self._sync_pipelined(start_date, end_date, resume)
 
-            date = start
-            while date <= end:
-                date_str = self.date_to_str(date)
-                offset = 0
-                
-                while True:
-                    # 从Tushare抓取数据，为防止网络失败，最多抓取 MAX_RETRY 次
-                    # self.get_logger().info(f"开始 Tushare ��取数据: {date_str},{offset},{self.limit}")
-                    tushare_data = None
-                    retry = 0
-                    while retry < self._MAX_RETRY:
-                        tushare_data = self.query_tushare_oneday(date_str, offset=offset, extra_params=self.extra_params)
-                        retry += 1
-                        if tushare_data is not None:
-                            break
-                        else:
-                            # 多休息一会
-                            time.sleep(self.interval * 5)
-                    if tushare_data is None:
-                        self.get_logger().error(f"TuShare抓取数据失败, {date_str},{offset},{self.limit}")
-                        break
-
-                    rows_count = len(tushare_data)
-                    if rows_count>0:
-                        # 如果有数据，将数据写入到数据库中
-                        # 一般非工作日没有数据
-                        tushare_data = self.pre_process_data(tushare_data)
-                        self.save_datafame_to_db(tushare_data)
-                        # self.get_logger().info(f" 写入记录数: Write [{rows_count}] records into table [{self.table_name}]")
-
-                        # 更新偏移量
-                        offset = offset + rows_count
-                        total_count += len(tushare_data)
-
-                    # 如果数据量小于限制，说明已经当日数据已经取完，退出循环，抓取下一日
-                    if rows_count < self.limit:
-                        break
-                        
-                sync_details = f"导入: {offset}" if offset>0 else "无数据"
-                sync_details = f"本日{sync_details}, 累计: {total_count}"
-                
-                self.get_logger().info(f"{date_str} {sync_details}")
-                date += datetime.timedelta(days=1)
+            for date_str, offset in self._iter_pending_dates(start_date, end_date, resume):
+                day_count = 0
+                for page in self._iter_day_pages(date_str, offset):
+                    day_count += self._write_page(page)
+                total_count += day_count
+                self._day_done(date_str, day_count, total_count)
 
         except Exception as e:
+            self._sync_error = e
             self.get_logger().error(f"异常错误: {str(e)}")
             
         return total_count
 
+    def _sync_pipelined(self, start_date, end_date, resume=False) -> int:
+        """
+        流水线模式同步: 当前线程按日期抓取数据放入有界队列，pipeline_workers 个写库线程并行写库
+        每日数据全部写完后，按日期顺序打印日志
+        """
+        total_count = 0
+
+        def on_day_done(date_str, day_count):
+            nonlocal total_count
+            total_count += day_count
+            self._day_done(date_str, day_count, total_count)
+
+        pipeline = FetchWritePipeline(self._write_page, workers=self.pipeline_workers, queue_size=self.queue_size)
+        units = ((date_str, self._iter_day_pages(date_str, offset))
+                 for date_str, offset in self._iter_pending_dates(start_date, end_date, resume))
+        try:
+            pipeline.run(units, on_day_done)
+        except Exception as e:
+            self._sync_error = e
+            self.get_logger().error(f"异常错误: {str(e)}")
+
+        return total_count
+
+    def _iter_sync_dates(self, start_date, end_date):
+        """
+        按日期顺序返回需要同步的日期字符串, 包含前后边界
+        trade_days_only 为 True 时只返回交易日
+        """
+        if self.trade_days_only:
+            calendar = TradeCalendar(self.get_db_engine(), self.calendar_exchange, self.get_logger())
+            yield from calendar.iter_dates(start_date, end_date)
+            return
+
+        date = self.str_to_date(start_date)
+        end = self.str_to_date(end_date)
+        while date <= end:
+            yield self.date_to_str(date)
+            date += datetime.timedelta(days=1)
+
+    def _iter_date_windows(self, start_date, end_date):
+        """
+        按 date_step 天切分日期范围, 返回 (窗口开始, 窗口结束), 包含前后边界
+        """
+        start = self.str_to_date(start_date)
+        end = self.str_to_date(end_date)
+        while start <= end:
+            window_end = min(start + datetime.timedelta(days=self.date_step - 1), end)
+            yield self.date_to_str(start), self.date_to_str(window_end)
+            start = window_end + datetime.timedelta(days=1)
+
+    def _iter_sync_units(self, start_date, end_date):
+        """
+        按 iteration 返回同步单元标识, 断点续传按单元记录进度
+            day: 日期, 如 20240102
+            window: 日期窗口, 如 20240101-20241231
+            ts_code: 日期窗口 + 一批 ts_code, 如 20240101-20241231|000001.SZ~600000.SH
+        window / ts_code 的查询参数记录在 _unit_params 中
+        """
+        if self.iteration == TushareSync.ITERATION_DAY:
+            yield from self._iter_sync_dates(start_date, end_date)
+            return
+
+        universe, rates = None, {}
+        if self.iteration == TushareSync.ITERATION_TS_CODE:
+            universe = self.get_universe()
+            rates = self.get_row_count_history().rates(self.api_name)
+
+        for window_start, window_end in self._iter_date_windows(start_date, end_date):
+            window = f"{window_start}-{window_end}"
+            params = {"start_date": window_start, "end_date": window_end}
+            if universe is None:
+                self._unit_params[window] = params
+                yield window
+                continue
+
+            codes = universe.codes(start_date=window_start, end_date=window_end)
+            batches = plan_batches(codes, rates, window_days(window_start, window_end), self.limit, self.ts_code_limit)
+            self.get_logger().info(f"{window} 规划 [{len(batches)}] 批 ts_code, 共 [{len(codes)}] 只股票")
+            for batch in batches:
+                unit = f"{window}|{batch[0]}~{batch[-1]}"
+                self._unit_params[unit] = dict(params, ts_code=",".join(batch))
+                yield unit
+
+    def _iter_pending_dates(self, start_date, end_date, resume=False):
+        """
+        返回尚未完成同步的 (日期或同步单元, 续传 offset)，跳过断点续传日志中已完成的单元
+        续传时未完成的单元可能已写入部分数据（写库成功但未记录进度、多线程写库不记录 offset），
+        写库方式不是幂等的时先清理该单元的数据，再从头抓取
+        """
+        for date_str in self._iter_sync_units(start_date, end_date):
+            if not self._checkpoint_run:
+                yield date_str, 0
+                continue
+            offset, done = self.get_journal().unit_state(self.table_name, date_str)
+            if done:
+                continue
+            if resume and not self.get_writer().idempotent:
+                with get_metrics().timer("delete_seconds", self.table_name, self.api_name):
+                    self.exec_sql(self._unit_delete_sql(date_str))
+                offset = 0
+            if offset > 0:
+                self.get_logger().info(f"{date_str} 从 offset [{offset}] 续传")
+            yield date_str, offset
+
+    def _unit_delete_sql(self, unit):
+        """
+        清理一个同步单元已写入数据的 SQL: 按日为该日, window 为日期窗口, ts_code 为日期窗口内的该批股票
+        """
+        params = self._unit_params.get(unit)
+        if params is None:
+            return f"DELETE FROM {self.table_name} WHERE {self.date_column}='{unit}'"
+        sql = (f"DELETE FROM {self.table_name} WHERE {self.date_column}>='{params['start_date']}' "
+               f"AND {self.date_column}<='{params['end_date']}'")
+        if "ts_code" in params:
+            codes = ",".join(f"'{code}'" for code in params["ts_code"].split(","))
+            sql += f" AND ts_code IN ({codes})"
+        return sql
+
+    def _iter_day_pages(self, date_str, offset=0):
+        """
+        按 offset 分页抓取某一天的数据，逐页返回 (日期, offset, 非空的 DataFrame)
+        抓取失败时打印错误日志，并结束当日抓取
+        开启 adaptive 时每页的 limit 由自适应控制器决定
+        """
+        controller = self.get_adaptive_controller()
+        while True:
+            # 从Tushare抓取数据，为防止网络失败，最多抓取 MAX_RETRY 次
+            tushare_data = None
+            retry = 0
+            while retry < self._MAX_RETRY:
+                if retry > 0:
+                    get_metrics().inc("retries", self.table_name, self.api_name)
+                if controller:
+                    self.limit = controller.page_size()
+                started = time.monotonic()
+                tushare_data = self._query_unit(date_str, offset)
+                retry += 1
+                if tushare_data is not None:
+                    break
+                elif controller:
+                    # 配额错误时指数退避
+                    self._sleep(controller.on_error(self._last_error, self.interval * 5))
+                else:
+                    # 多休息一会
+                    self._sleep(self.interval * 5)
+            if tushare_data is None:
+                self._failed_dates.add(date_str)
+                self.get_logger().error(f"TuShare抓取数据失败, {date_str},{offset},{self.limit}")
+                return
+
+            rows_count = len(tushare_data)
+            requested = self.limit
+            if controller:
+                controller.on_page(rows_count, requested, time.monotonic() - started)
+            if self._row_recorder is not None:
+                self._row_recorder.add_rows(tushare_data)
+            if rows_count > 0:
+                # 一般非工作日没有数据
+                yield date_str, offset, tushare_data
+                # 更新偏移量
+                offset = offset + rows_count
+
+            # 如果数据量小于限制，说明已经当日数据已经取完，退出循环，抓取下一日
+            # 自适应时数据量小于限制也可能是接口单次返回上限，由控制器判断是否继续
+            if controller:
+                if not controller.has_more(rows_count, requested):
+                    return
+            elif rows_count < self.limit:
+                return
+
+    def _query_unit(self, unit, offset):
+        """
+        抓取一个同步单元的一页数据: 按日抓取时 unit 为日期, 否则按 _unit_params 中记录的查询参数
+        """
+        params = self._unit_params.get(unit)
+        if params is None:
+            return self.query_tushare_oneday(unit, offset=offset, extra_params=self.extra_params)
+        return self.query_tushare_params(dict(params, **self.extra_params), offset=offset)
+
+    def _write_page(self, page) -> int:
+        """
+        预处理并写入一页数据，返回写入记录数
+        页内数据按顺序写入时（非多线程写库），记录该日的续传 offset; 只有 upsert 续传时使用 offset,
+        其他写库方式续传时清理该日数据后从头抓取
+        """
+        date_str, offset, tushare_data = page
+        next_offset = offset + len(tushare_data)
+        metrics = get_metrics()
+        with metrics.timer("preprocess_seconds", self.table_name, self.api_name):
+            tushare_data = self.prepare_data(tushare_data)
+        with metrics.timer("write_seconds", self.table_name, self.api_name):
+            self.save_datafame_to_db(tushare_data)
+        sink = self.get_parquet_sink()
+        if sink:
+            sink.write(tushare_data)
+        if self._checkpoint_run and self.pipeline_workers <= 1:
+            self.get_journal().save_progress(self.table_name, date_str, next_offset)
+        return len(tushare_data)
+
+    def _sleep(self, seconds):
+        """
+        抓取失败后等待, 等待时间计入运行指标
+        """
+        with get_metrics().timer("sleep_seconds", self.table_name, self.api_name):
+            time.sleep(seconds)
+
+    def _day_done(self, date_str, day_count, total_count):
+        if self._checkpoint_run and date_str not in self._failed_dates:
+            self.get_journal().save_progress(self.table_name, date_str, 0, done=True)
+        params = self._unit_params.get(date_str, {})
+        if self._row_recorder is not None and date_str not in self._failed_dates and "ts_code" in params:
+            self._row_recorder.add_window(params["ts_code"].split(","),
+                                          window_days(params["start_date"], params["end_date"]))
+        sync_details = f"导入: {day_count}" if day_count > 0 else "无数据"
+        self.get_logger().info(f"{date_str} 本日{sync_details}, 累计: {total_count}")
+
+    def _sync_with_checkpoint(self, start_date, end_date) -> int:
+        """
+        带断点续传的同步: 存在未完成的同步任务时，按该任务的日期范围续传
+        全部日期同步成功后清除断点记录
+        """
+        journal = self.get_journal()
+        start_date, end_date, resumed = journal.begin_run(self.table_name, start_date, end_date)
+        if resumed:
+            self.get_logger().info(f"发现未完成的同步任务, 断点续传: {start_date} ~ {end_date}")
+
+        self._checkpoint_run = True
+        try:
+            total_count = self.sync_from_tushare_to_db(start_date, end_date, resume=resumed)
+        finally:
+            self._checkpoint_run = False
+        if not self._failed_dates and self._sync_error is None:
+            journal.finish_run(self.table_name)
+            if self._row_recorder is not None:
+                # 任务完成后再更新历史条数, 续传时批次划分不变
+                self.get_row_count_history().record(self.api_name, self._row_recorder.observations)
+        else:
+            self.get_logger().warning(f"有日期同步失败 {sorted(self._failed_dates)}, 保留断点记录, 下次同步时续传")
+        return total_count
+
     def date_to_str(self, date, without_dash=True):
         if without_dash:
             return datetime.datetime.strftime(date, '%Y%m%d')
@@ -687,28 +1218,99 @@ class TushareSync:
 
         total_count = 0
 
-        self.create_table(drop_exist=True)
-        tushare_data = self.query_tushare_oneday(self.today())
-        self.save_datafame_to_db(tushare_data)
+        if self.shadow_load:
+            tushare_data = self._update_with_shadow_table()
+        else:
+            self.create_table(drop_exist=True)
+            tushare_data = self._query_all()
+            self.save_datafame_to_db(tushare_data)
         total_count = len(tushare_data)
+        sink = self.get_parquet_sink()
+        if sink:
+            sink.write_snapshot(tushare_data)
+        if self.table_name == "trade_cal":
+            clear_calendar_cache()
+        elif self.table_name == "stock_basic":
+            get_universe_service().invalidate()
         
         self.get_logger().info(f"更新完成, 写入 [{total_count}] 条记录")
+
+    def _iter_update_params(self):
+        """
+        update 时的各组查询参数: extra_params 为列表时每组参数抓取一次;
+        iteration 为 ts_code 时再按 ts_code_limit 切分股票池, 每批抓取一次
+        """
+        param_sets = self.extra_params if isinstance(self.extra_params, list) else [self.extra_params]
+        if self.iteration != TushareSync.ITERATION_TS_CODE:
+            yield from (dict(params) for params in param_sets)
+            return
+        codes = self.get_universe().codes()
+        for params in param_sets:
+            for i in range(0, len(codes), self.ts_code_limit):
+                yield dict(params, ts_code=",".join(codes[i:i + self.ts_code_limit]))
+
+    def _query_all(self):
+        """
+        按 update 的各组查询参数分页抓取全部数据, 任意一页抓取失败时抛出异常
+
+        :return: 合并并经过 prepare_data 处理的数据
+        """
+        frames = []
+        for params in self._iter_update_params():
+            offset = 0
+            while True:
+                tushare_data = self.query_tushare_params(params, offset=offset)
+                if tushare_data is None:
+                    raise Exception(f"TuShare抓取数据失败, {params}, offset [{offset}]: {self._last_error}")
+                frames.append(tushare_data)
+                offset += len(tushare_data)
+                if len(tushare_data) < self.limit:
+                    break
+        return self.prepare_data(pd.concat(frames, ignore_index=True))
+
+    def _update_with_shadow_table(self):
+        """
+        影子表加载: 数据写入 staging 表后原子切换为线上表
+        抓取或写入失败时删除 staging 表，线上表保持不变
+
+        :return: 写入的数据
+        """
+        loader = ShadowLoader(self.table_name, self._read_table_sql(), self.exec_sql, self._table_exist,
+                              defer_indexes=self.defer_indexes, logger=self.get_logger())
+        staging = loader.prepare()
+        try:
+            tushare_data = self._query_all()
+            with slot(MYSQL):
+                self.get_writer().write(self.get_db_engine(), staging, tushare_data, self.limit, self.get_logger())
+        except Exception:
+            loader.abort()
+            raise
+        loader.finish()
+        # 表已重建, 之前的断点记录失效
+        self.get_journal().finish_run(self.table_name)
+        return tushare_data
     
     def full_sync(self):
         """
         全量初始化表数据，适合每日有新数据的表，比如 daily, weekly, monthly, stk_factor_pro
         1. 清理历史数据
         2. 从 tushare 从BEGIN_DATE 到当前日期，按日期抓取数据，并保存到数据库
+
+        :return: 写入记录数
         """
         self.get_logger().info(f"开始全量同步")
         
-        self.create_table(drop_exist=True)
-        self.get_logger().info(f"数据库建表: [{self.table_name}]")
+        # 存在未完成的全量同步任务时，保留已同步的数据，断点续传
+        if not (self.get_journal().has_run(self.table_name) and self._table_exist()):
+            self.create_table(drop_exist=True)
+            self.get_logger().info(f"数据库建表: [{self.table_name}]")
+        self.ensure_partitions()
         
         end_date = self.today()
-        total_count = self.sync_from_tushare_to_db(self.BEGIN_DATE, end_date)
+        total_count = self._sync_with_checkpoint(self.BEGIN_DATE, end_date)
         
         self.get_logger().info(f"全量同步完成, 写入 [{total_count}] 条记录")
+        return total_count
 
 
     def incremental_sync(self):
@@ -716,30 +1318,461 @@ class TushareSync:
         增量同步数据，适合每日有新数据的表，比如 daily, weekly, monthly, stk_factor_pro
         1. 清理历史数据
         2. 从 tushare 从数据库的 last_sync_date 到当前日期，按日期抓取数据，并保存到数据库
+
+        :return: 写入记录数
         """
 
         self.get_logger().info(f"开始增量同步")
 
-        # 查询历史最大同步日期
+        # 查询历史最大同步日期, 空表时从 BEGIN_DATE 开始
         last_date = self._fetch_one_from_db(f"select max({self.date_column}) from {self.table_name}")
-        start_date = self.max_date(last_date, self.BEGIN_DATE)
+        start_date = self.BEGIN_DATE if last_date is None else self.max_date(str(last_date), self.BEGIN_DATE)
         end_date = self.today()
 
-        total_count = self.sync_from_tushare_to_db(start_date, end_date)
+        total_count = self._sync_with_checkpoint(start_date, end_date)
         self.get_logger().info(f"增量同步完成, 写入 [{total_count}] 条记录")
+        return total_count
 
-    def sync(self):
+    def run_post_sync(self):
         """
-        同步数据
+        依次执行 post_sync 声明的处理, 处理失败只记录错误日志
         """
-        self.before_sync()
-        if self.is_increasing:
-            if self._table_exist():
-                self.incremental_sync()
-            else:
-                self.full_sync()
+        for name, hook in self.post_sync:
+            try:
+                hook(self)
+            except Exception as e:
+                get_metrics().inc("errors", self.table_name, name)
+                self.get_logger().error(f"post_sync [{name}] 失败: {e}")
+
+    def repair(self, start_date=None, end_date=None):
+        """
+        修复表中间的缺口（utils/repair.py）: 一次 GROUP BY 统计已有记录, 只重新抓取缺失或偏少的同步单元
+            day: 没有记录或记录偏少（repair_min_ratio）的交易日, 只支持 trade_days_only 的表
+                 重新抓取后仍然偏少（停牌多）的日期记录在检查点日志中, 记录数没有减少时不再重新抓取
+            ts_code: 日期范围内上市、表中没有记录的股票, 按日期窗口和 ts_code_limit 分批
+        重新抓取走正常的分页抓取、预处理和写库流程; 非递增表和 window 抓取方式不需要修复
+        修复写入数据后更新由本表生成的表（_repair_derived）; 本地生成的表本身的修复:
+            resample_from: 重新合成来源表修复过的日期所在的周期
+            local_factors: 补算 daily / adj_factor 中补上的记录, 见 utils/factors.py 增量规则
+
+        :param start_date: 开始日期, 默认为表中最小日期
+        :param end_date: 结束日期, 默认为表中最大日期; 最大日期之后由 incremental_sync 同步
+        :return: 写入记录数
+        """
+        logger = self.get_logger()
+        if not self._table_exist():
+            logger.info("表不存在, 跳过缺口修复")
+            return 0
+        if self.resample_from:
+            return self._repair_resampled()
+        if self.local_factors:
+            return refresh_factors(self)
+        if (not self.is_increasing or self.iteration == TushareSync.ITERATION_WINDOW
+                or (self.iteration == TushareSync.ITERATION_DAY and not self.trade_days_only)):
+            logger.info("该表不支持缺口修复, 跳过")
+            return 0
+        if start_date is None:
+            start_date = self._fetch_one_from_db(f"select min({self.date_column}) from {self.table_name}")
+        if end_date is None:
+            end_date = self._fetch_one_from_db(f"select max({self.date_column}) from {self.table_name}")
+        if start_date is None or end_date is None:
+            logger.info("表为空, 跳过缺口修复")
+            return 0
+        start_date, end_date = str(start_date), str(end_date)
+
+        self._failed_dates = set()
+        self._unit_params = {}
+        self._row_recorder = None
+        if self.iteration == TushareSync.ITERATION_DAY:
+            units = self._find_gap_dates(start_date, end_date)
+        else:
+            units = self._find_gap_units(start_date, end_date)
+
+        total_count = 0
+        try:
+            for unit, delete_sql in units:
+                if delete_sql and not self.get_writer().idempotent:
+                    with get_metrics().timer("delete_seconds", self.table_name, self.api_name):
+                        self.exec_sql(delete_sql)
+                unit_count = 0
+                for page in self._iter_day_pages(unit):
+                    unit_count += self._write_page(page)
+                total_count += unit_count
+                self._day_done(unit, unit_count, total_count)
+                if (self.iteration == TushareSync.ITERATION_DAY and self.repair_min_ratio > 0
+                        and unit_count > 0 and unit not in self._failed_dates):
+                    self.get_journal().save_repaired_rows(self.table_name, unit, unit_count)
+        finally:
+            sink = self.get_parquet_sink()
+            if sink:
+                sink.close()
+
+        if self._failed_dates:
+            logger.warning(f"缺口修复有单元抓取失败 {sorted(self._failed_dates)}, 下次修复时重试")
+        logger.info(f"缺口修复完成, {start_date} - {end_date} 重新抓取 [{len(units)}] 个单元, 写入 [{total_count}] 条记录")
+        if units:
+            dates = [unit for unit, _ in units] if self.iteration == TushareSync.ITERATION_DAY else []
+            self._repair_derived(dates)
+        return total_count
+
+    def derived_tables(self):
+        """
+        由本表数据生成的表: SQL 脚本声明 resample_from 为本表, 或声明 local_factors 且本表为技术因子的来源表
+        """
+        folder = os.path.join(os.getcwd(), self.sql_folder())
+        tables = []
+        for file_name in sorted(os.listdir(folder)):
+            if not file_name.endswith(".sql"):
+                continue
+            with open(os.path.join(folder, file_name), "r", encoding="utf-8") as f:
+                sql_data = self._extract_data_from_sql_script(f.read())
+            resampled = sql_data.get(TushareSync.Flags.RESAMPLE_FROM) == self.table_name
+            local_factors = (sql_data.get(TushareSync.Flags.LOCAL_FACTORS, "").lower() == "true"
+                             and self.table_name in FACTOR_SOURCE_TABLES)
+            if resampled or local_factors:
+                tables.append(file_name[:-len(".sql")])
+        return tables
+
+    def _repair_derived(self, dates):
+        """
+        缺口修复后更新由本表生成的表, 它们的增量计算只处理最大日期之后的数据:
+        执行 post_sync 处理（daily_adj 补算缺失记录）, 合成表先在检查点日志中记录修复的日期再重新合成所在周期,
+        合成中断时由该表的 repair 继续处理
+
+        :param dates: 重新抓取的日期, 按 ts_code 抓取的表为空
+        """
+        self.run_post_sync()
+        journal = self.get_journal()
+        for table_name in self.derived_tables():
+            derived = TushareSync(table_name)
+            derived._journal = journal
+            if not derived._table_exist():
+                continue
+            if derived.resample_from and dates:
+                journal.add_repaired_dates(table_name, dates)
+            try:
+                derived.repair()
+            except Exception as e:
+                get_metrics().inc("errors", table_name, "repair")
+                self.get_logger().error(f"[{table_name}] 更新失败, 下次修复时继续: {e}")
+
+    def _repair_resampled(self):
+        """
+        重新合成来源表修复过的日期（见 _repair_derived）所在的周期, 完成后从检查点日志中清除
+        """
+        journal = self.get_journal()
+        dates = journal.repaired_dates(self.table_name)
+        if not dates:
+            self.get_logger().info(f"[{self.resample_from}] 没有修复过的日期, 不需要重新合成")
+            return 0
+        calendar = TradeCalendar(self.get_db_engine(), self.calendar_exchange, self.get_logger())
+        starts = sorted({period_start(date, self.resample_period) for date in dates})
+        total_count = 0
+        for start_date in starts:
+            total_count += self._write_resampled(start_date, self._period_end(start_date), calendar)
+        journal.clear_repaired_dates(self.table_name, dates)
+        self.get_logger().info(f"[{self.resample_from}] 修复了 [{len(dates)}] 个日期, 重新合成 [{len(starts)}] 个周期, "
+                               f"写入 [{total_count}] 条记录")
+        return total_count
+
+    def _period_end(self, start_date):
+        """
+        以 start_date 为第一天的周期的最后一天（自然日）
+        """
+        days = 7 if self.resample_period == PERIOD_WEEK else 32
+        next_start = period_start(self.date_to_str(self.str_to_date(start_date) + datetime.timedelta(days=days)),
+                                  self.resample_period)
+        return self.date_to_str(self.str_to_date(next_start) - datetime.timedelta(days=1))
+
+    def _find_gap_dates(self, start_date, end_date):
+        """
+        按日抓取的表中缺失或记录偏少的交易日, 返回 [(日期, 清理该日数据的 SQL), ...]
+        """
+        rows = self._fetch_all_from_db(f"SELECT {self.date_column}, COUNT(*) FROM {self.table_name} "
+                                       f"WHERE {self.date_column}>='{start_date}' AND {self.date_column}<='{end_date}' "
+                                       f"GROUP BY {self.date_column}")
+        calendar = TradeCalendar(self.get_db_engine(), self.calendar_exchange, self.get_logger())
+        open_dates = calendar.open_dates(start_date, end_date)
+        expected = None
+        if self.repair_min_ratio > 0:
+            expected = listed_counts(self.get_universe().data, open_dates)
+        # 之前修复后仍然偏少（停牌）的日期, 记录数没有减少时不再重新抓取
+        fetched = self.get_journal().repaired_rows(self.table_name) if expected is not None else None
+        gaps = find_gap_dates(dict(rows), open_dates, expected, self.repair_min_ratio, fetched)
+        if len(gaps) > 0:
+            self.get_logger().info(f"{start_date} - {end_date} 共 [{len(open_dates)}] 个交易日, 缺失 "
+                                   f"[{(gaps['reason'] == 'missing').sum()}] 个, 记录偏少 "
+                                   f"[{(gaps['reason'] == 'short').sum()}] 个: {gaps['date'].tolist()[:20]}")
+        return [(str(gap.date), f"DELETE FROM {self.table_name} WHERE {self.date_column}='{gap.date}'" if gap.rows else "")
+                for gap in gaps.itertuples()]
+
+    def _find_gap_units(self, start_date, end_date):
+        """
+        按 ts_code 抓取的表中没有记录的股票, 按日期窗口和 ts_code_limit 分批, 返回 [(同步单元, ""), ...]
+        """
+        rows = self._fetch_all_from_db(f"SELECT ts_code, COUNT(*) FROM {self.table_name} "
+                                       f"WHERE {self.date_column}>='{start_date}' AND {self.date_column}<='{end_date}' "
+                                       f"GROUP BY ts_code")
+        universe = self.get_universe()
+        missing = find_missing_codes(dict(rows), universe.codes(start_date=start_date, end_date=end_date))
+        if not missing:
+            return []
+        self.get_logger().info(f"{start_date} - {end_date} 缺失 [{len(missing)}] 只股票: {missing[:20]}")
+
+        units = []
+        for window_start, window_end in self._iter_date_windows(start_date, end_date):
+            listed = set(universe.codes(start_date=window_start, end_date=window_end))
+            codes = [code for code in missing if code in listed]
+            for i in range(0, len(codes), self.ts_code_limit):
+                batch = codes[i:i + self.ts_code_limit]
+                unit = f"{window_start}-{window_end}|{batch[0]}~{batch[-1]}"
+                self._unit_params[unit] = {"start_date": window_start, "end_date": window_end, "ts_code": ",".join(batch)}
+                units.append((unit, ""))
+        return units
+
+    def resample_sync(self, rebuild=False):
+        """
+        由 resample_from 表合成数据（utils/resample.py），不调用 Tushare
+        rebuild 为 True 时重建表并从 BEGIN_DATE 开始合成，否则从表中最后一个周期的第一天开始重新合成
+
+        :return: 写入记录数
+        """
+        if rebuild:
+            self.create_table(drop_exist=True)
+            start_date = self.BEGIN_DATE
         else:
-            self.update()
+            last_date = self._fetch_one_from_db(f"select max({self.date_column}) from {self.table_name}")
+            start_date = self.BEGIN_DATE if last_date is None else self.max_date(str(last_date), self.BEGIN_DATE)
+        self.ensure_partitions()
+        start_date = period_start(start_date, self.resample_period)
+        end_date = self.today()
+        self.get_logger().info(f"由 [{self.resample_from}] 合成 {self.resample_period} 数据, {start_date} - {end_date}")
+
+        calendar = TradeCalendar(self.get_db_engine(), self.calendar_exchange, self.get_logger())
+        total_count = 0
+        for chunk_start, chunk_end in self._iter_resample_chunks(start_date, end_date):
+            total_count += self._write_resampled(chunk_start, chunk_end, calendar)
+        return total_count
+
+    def _write_resampled(self, start_date, end_date, calendar):
+        """
+        合成 [start_date, end_date] 的数据, 删除该范围已有的记录后写入, 返回写入记录数
+        """
+        metrics = get_metrics()
+        daily, bars = self._resample_chunk(start_date, end_date, calendar)
+        with metrics.timer("delete_seconds", self.table_name, self.resample_from):
+            self.exec_sql(f"DELETE FROM {self.table_name} "
+                          f"WHERE {self.date_column}>='{start_date}' AND {self.date_column}<='{end_date}'")
+        if len(bars) > 0:
+            with metrics.timer("write_seconds", self.table_name, self.resample_from):
+                self.save_datafame_to_db(bars)
+        metrics.inc("rows", self.table_name, self.resample_from, len(bars))
+        self.get_logger().info(f"{start_date} - {end_date} 由 [{len(daily)}] 条日线合成 [{len(bars)}] 条记录")
+        return len(bars)
+
+    def _resample_chunk(self, start_date, end_date, calendar):
+        """
+        读取 resample_from 表 [start_date, end_date] 的日线并合成, 返回 (日线, 预处理后的合成结果)
+        """
+        columns = ",".join(f"`{name}`" for name in RESAMPLE_DAILY_COLUMNS)
+        rows = self._fetch_all_from_db(f"SELECT {columns} FROM {self.resample_from} "
+                                       f"WHERE trade_date>='{start_date}' AND trade_date<='{end_date}'")
+        daily = pd.DataFrame(rows, columns=RESAMPLE_DAILY_COLUMNS)
+        with get_metrics().timer("preprocess_seconds", self.table_name, self.resample_from):
+            bars = self.prepare_data(resample_bars(daily, calendar.period_calendar(self.resample_period),
+                                                   self.resample_period))
+        return daily, bars
+
+    def _resample_range(self, start_date, end_date):
+        """
+        由 resample_from 表合成 trade_date 在 [start_date, end_date] 内的记录, 用于整年回补分区:
+        读取范围向前对齐到周期的第一天、向后延伸一个月, 跨分区边界的周期按完整周期合成, 再按 trade_date 筛选
+        """
+        calendar = TradeCalendar(self.get_db_engine(), self.calendar_exchange, self.get_logger())
+        read_start = period_start(start_date, self.resample_period)
+        read_end = self.date_to_str(self.str_to_date(end_date) + datetime.timedelta(days=31))
+        daily, bars = self._resample_chunk(read_start, read_end, calendar)
+        dates = pd.to_numeric(bars[self.date_column])
+        bars = bars[(dates >= int(start_date)) & (dates <= int(end_date))].reset_index(drop=True)
+        self.get_logger().info(f"{start_date} - {end_date} 由 [{len(daily)}] 条日线合成 [{len(bars)}] 条记录")
+        return bars
+
+    def _iter_resample_chunks(self, start_date, end_date):
+        """
+        按年切分合成范围, 切分点对齐到周期的第一天, 跨年的周不会被拆开
+        """
+        start = start_date
+        while start <= end_date:
+            year = int(start[:4]) + 1
+            next_start = period_start(f"{year}0101", self.resample_period)
+            while next_start <= start:
+                year += 1
+                next_start = period_start(f"{year}0101", self.resample_period)
+            chunk_end = self.date_to_str(self.str_to_date(next_start) - datetime.timedelta(days=1))
+            yield start, self.min_date(chunk_end, end_date)
+            start = next_start
+
+    def _query_day_all(self, trade_date):
+        """
+        分页抓取 trade_date 的全部数据, 用于核对本地生成的数据
+        """
+        frames, offset = [], 0
+        while True:
+            data = self.query_tushare_oneday(trade_date, offset=offset)
+            if data is None:
+                raise Exception(f"TuShare抓取数据失败, {trade_date}, offset [{offset}]: {self._last_error}")
+            frames.append(data)
+            offset += len(data)
+            if len(data) < self.limit:
+                break
+        return pd.concat(frames, ignore_index=True)
+
+    def verify_resample(self, trade_date, sample=0):
+        """
+        抽样核对合成结果: 调用 Tushare 接口抓取 trade_date 的数据, 与表中合成的数据比较
+
+        :param trade_date: 周期最后一个交易日
+        :param sample: 抽样股票数, 0 时核对全部股票
+        :return: 不一致的记录, 见 utils/resample.py compare_bars
+        """
+        remote = self._query_day_all(trade_date)
+        columns = ",".join(f"`{name}`" for name in RESAMPLE_BAR_COLUMNS)
+        rows = self._fetch_all_from_db(f"SELECT {columns} FROM {self.table_name} WHERE trade_date='{trade_date}'")
+        local = pd.DataFrame(rows, columns=RESAMPLE_BAR_COLUMNS)
+        if sample and len(remote) > sample:
+            remote = remote.sample(sample, random_state=0)
+            local = local[local["ts_code"].isin(remote["ts_code"])]
+
+        diff = compare_bars(local, remote)
+        if len(diff) > 0:
+            self.get_logger().warning(f"{trade_date} 合成数据与接口不一致 [{len(diff)}] 条, "
+                                      f"核对 [{len(remote)}] 条, 如 {diff.head(3).to_dict('records')}")
+        else:
+            self.get_logger().info(f"{trade_date} 合成数据与接口一致, 核对 [{len(remote)}] 条")
+        return diff
+
+    def verify_factors(self, trade_date, sample=0):
+        """
+        抽样核对本地计算的技术因子: 调用 Tushare 接口抓取 trade_date 的数据, 与表中计算的数据比较
+
+        :param trade_date: 交易日
+        :param sample: 抽样股票数, 0 时核对全部股票
+        :return: 各字段的核对报告, 见 utils/factors.py reconcile
+        """
+        remote = self._query_day_all(trade_date)
+        if sample and len(remote) > sample:
+            remote = remote.sample(sample, random_state=0)
+        columns = ",".join(f"`{name}`" for name in FACTOR_COLUMNS)
+        rows = self._fetch_all_from_db(f"SELECT {columns} FROM {self.table_name} WHERE trade_date='{trade_date}'")
+        local = pd.DataFrame(rows, columns=FACTOR_COLUMNS)
+
+        report = reconcile_factors(local, remote)
+        mismatched = report[report["mismatched"] > 0]
+        if len(mismatched) > 0:
+            self.get_logger().warning(f"{trade_date} 本地技术因子与接口不一致, 核对 [{len(remote)}] 只股票, "
+                                      f"{mismatched[['column', 'mismatched', 'max_abs_diff']].to_dict('records')}")
+        else:
+            self.get_logger().info(f"{trade_date} 本地技术因子与接口一致, 核对 [{len(remote)}] 只股票")
+        return report
+
+    def get_partition_backfill(self):
+        return PartitionBackfill(self.table_name, self._read_table_sql(), self.exec_sql, self._fetch_all_from_db,
+                                 logger=self.get_logger())
+
+    def ensure_partitions(self):
+        """
+        按年分区的表，检查并追加未来 _PARTITION_YEARS_AHEAD 年的分区；不分区的表无操作
+        """
+        until_year = datetime.datetime.now().year + TushareSync._PARTITION_YEARS_AHEAD
+        if self.get_partition_backfill().ensure_partitions(until_year) > 0:
+            self.get_logger().info(f"已追加分区至 {until_year} 年")
+
+    def backfill(self, start_year, end_year=None):
+        """
+        整年回补按年分区的表，每年一个分区:
+        1. 创建不分区、无二级索引的孪生表，写入该分区日期范围内的全部数据;
+           由 resample_from 表合成的表（weekly / monthly）由本地日线合成，不调用 Tushare
+        2. 补建索引后 EXCHANGE PARTITION 与线上表交换，线上表其余分区不受影响
+        某一天抓取失败时放弃该年的交换并报错，线上表保持不变
+
+        :param start_year: 开始年份
+        :param end_year: 结束年份，默认与开始年份相同
+        :return: 写入的总记录数
+        """
+        end_year = end_year if end_year else start_year
+        backfill = self.get_partition_backfill()
+        writer = self.get_writer()
+        sink = self.get_parquet_sink()
+        metrics = get_metrics()
+        total_count = 0
+
+        for year in range(int(start_year), int(end_year) + 1):
+            start_date, end_date = backfill.date_range(year)
+            self.get_logger().info(f"开始回补 {year} 年分区: {start_date} ~ {end_date}")
+            twin = backfill.prepare(year)
+            self._failed_dates = set()
+            year_count = 0
+            try:
+                for data in self._iter_backfill_pages(start_date, end_date):
+                    with slot(MYSQL), metrics.timer("write_seconds", self.table_name, self.api_name):
+                        writer.write(self.get_db_engine(), twin, data, self.limit, self.get_logger())
+                    if sink:
+                        sink.write(data)
+                    year_count += len(data)
+                if self._failed_dates:
+                    raise Exception(f"有日期抓取失败 {sorted(self._failed_dates)}, 放弃交换 {year} 年分区")
+            except Exception:
+                backfill.abort(year)
+                raise
+            backfill.finish(year)
+            if sink:
+                sink.close()
+            total_count += year_count
+            self.get_logger().info(f"{year} 年分区回补完成, 写入 [{year_count}] 条记录")
+
+        return total_count
 
-        self.after_sync()
+    def _iter_backfill_pages(self, start_date, end_date):
+        """
+        整年回补时逐页返回预处理后的数据: resample_from 表由本地日线一次合成, 其他表按日从 Tushare 分页抓取
+        """
+        if self.resample_from:
+            bars = self._resample_range(start_date, end_date)
+            if len(bars) > 0:
+                yield bars
+            return
+        for date_str in self._iter_sync_dates(start_date, end_date):
+            for _, _, tushare_data in self._iter_day_pages(date_str):
+                with get_metrics().timer("preprocess_seconds", self.table_name, self.api_name):
+                    tushare_data = self.prepare_data(tushare_data)
+                yield tushare_data
+
+    def sync(self, drop_exist=False):
+        """
+        同步数据
+        结束时写出运行指标报告 (utils/metrics.py), 未配置报告路径时不写出
+
+        :param drop_exist: 递增表是否重建后全量同步, 默认表已存在时增量同步
+        """
+        try:
+            self.before_sync()
+            if self.is_increasing and self.resample_from:
+                self.resample_sync(rebuild=drop_exist or not self._table_exist())
+            elif self.is_increasing and self.local_factors:
+                refresh_factors(self, rebuild=drop_exist)
+            elif self.is_increasing:
+                if self._table_exist() and not drop_exist:
+                    self.ensure_partitions()
+                    self.incremental_sync()
+                else:
+                    self.full_sync()
+            else:
+                self.update()
+
+            self.after_sync()
+            self.run_post_sync()
+        finally:
+            path = write_report(self.get_cfg())
+            if path:
+                self.get_logger().info(f"运行指标报告: [{path}]")
 
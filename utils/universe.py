@@ -0,0 +1,121 @@
+"""
+股票池（ts_code universe）
+
+按 ts_code 同步的表（fina_indicator、fina_mainbz、stk_rewards 等）原来每次同步都通过 get_ts_code_list
+从 Tushare 分页拉取 stock_basic，每页限流等待并在日志中打印完整的代码列表。
+
+UniverseService 在进程内缓存股票池，ttl 秒内各表共用:
+1. 依次尝试 loaders，通常先读本地 stock_basic 表，表不存在或为空时再从 Tushare 拉取一次
+2. 提供过滤视图: 日期窗口内上市的股票、指定交易所、指定市场
+
+配置:
+    [universe]
+    ttl=3600    # 股票池缓存秒数
+
+使用示例:
+    service = UniverseService([load_from_db, load_from_tushare], ttl=3600)
+    universe = service.get()
+    codes = universe.codes(start_date="20230101", end_date="20231231", exchange="SSE")
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+COLUMNS = ["ts_code", "exchange", "market", "list_status", "list_date", "delist_date"]
+DEFAULT_TTL = 3600
+
+
+def _normalize_date(series):
+    """
+    日期统一为 YYYYMMDD 字符串, 空值为 None
+    """
+    dates = series.astype(object).where(series.notna(), None)
+    return dates.map(lambda d: None if d is None or str(d).strip() in ("", "0") else str(d).replace("-", "")[:8])
+
+
+class StockUniverse:
+    def __init__(self, data):
+        """
+        :param data: stock_basic 数据, 至少包含 ts_code 字段, 缺少的字段视为空
+        """
+        data = data.reindex(columns=COLUMNS)
+        data = data[data["ts_code"].notna()].drop_duplicates("ts_code").reset_index(drop=True)
+        data["list_date"] = _normalize_date(data["list_date"])
+        data["delist_date"] = _normalize_date(data["delist_date"])
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def codes(self, start_date=None, end_date=None, exchange=None, market=None):
+        """
+        按条件过滤的股票代码列表, 保持原有顺序
+
+        :param start_date: 窗口开始日期, 去掉在此之前已退市的股票
+        :param end_date: 窗口结束日期, 去掉在此之后才上市的股票
+        :param exchange: 交易所, 如 SSE / SZSE / BSE
+        :param market: 市场类型, 如 主板 / 创业板 / 科创板
+        """
+        data = self.data
+        mask = pd.Series(True, index=data.index)
+        if end_date is not None:
+            mask &= data["list_date"].isna() | (data["list_date"] <= str(end_date))
+        if start_date is not None:
+            mask &= data["delist_date"].isna() | (data["delist_date"] >= str(start_date))
+        if exchange is not None:
+            mask &= data["exchange"] == exchange
+        if market is not None:
+            mask &= data["market"] == market
+        return data.loc[mask, "ts_code"].tolist()
+
+    def listed_at(self, date):
+        """
+        指定日期已上市且未退市的股票
+        """
+        return self.codes(start_date=date, end_date=date)
+
+
+class UniverseService:
+    def __init__(self, loaders, ttl=DEFAULT_TTL, clock=time.monotonic, logger=None):
+        """
+        :param loaders: 加载 stock_basic 数据的函数列表, 依次尝试, 返回 None 或空数据时使用下一个
+        :param ttl: 缓存秒数
+        :param clock: 返回当前时间的函数
+        :param logger: 日志对象
+        """
+        self.loaders = loaders
+        self.ttl = ttl
+        self.clock = clock
+        self.logger = logger
+        self._universe = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        获取股票池, 缓存过期时重新加载; 多个线程同时过期时只加载一次
+        """
+        with self._lock:
+            if self._universe is None or self.clock() - self._loaded_at >= self.ttl:
+                self._universe = self._load()
+                self._loaded_at = self.clock()
+            return self._universe
+
+    def invalidate(self):
+        """
+        清除缓存, 如 stock_basic 刚刚刷新
+        """
+        with self._lock:
+            self._universe = None
+
+    def _load(self):
+        for loader in self.loaders:
+            data = loader()
+            if data is not None and len(data) > 0:
+                universe = StockUniverse(data)
+                if self.logger:
+                    self.logger.info(f"加载股票池 [{len(universe)}] 只股票, 来源 [{loader.__name__}]")
+                return universe
+        raise Exception("无法加载股票池: stock_basic 没有数据")
@@ -0,0 +1,218 @@
+"""
+DataFrame 写库策略
+
+TushareSync 根据 SQL 脚本头部的 `-- write_mode:` 配置选择写库方式:
+- to_sql: 使用 pandas DataFrame.to_sql 写入（默认）
+- load_data: 先把数据写入临时 TSV 文件，再通过 LOAD DATA LOCAL INFILE 批量导入；
+             服务端或客户端未开启 local_infile 时自动回退到 to_sql，其他错误直接抛出；
+             LOCAL 导入会把重复键、类型转换错误降级为警告，导入后有警告时回滚并抛出 LoadDataWarning
+- upsert: 多行 INSERT ... ON DUPLICATE KEY UPDATE，按表的唯一键（如 ts_code, trade_date）覆盖已有记录；
+          写入是幂等的，同步前不需要先 DELETE 日期范围内的数据，值未变化的记录不会被修改
+
+使用示例:
+    writer = get_writer("load_data")
+    writer.write(engine, "daily", data, chunksize=10000)
+"""
+
+import csv
+import os
+import tempfile
+
+import pandas as pd
+
+_UPSERT_BATCH_ROWS = 1000 # upsert 每条 INSERT 语句的最大行数, 避免超过 max_allowed_packet
+
+# 表示不支持 LOAD DATA LOCAL 的 MySQL 错误码:
+# 1148 服务端禁止该命令, 3948 服务端或客户端未开启 local_infile, 2068 客户端拒绝读取本地文件
+_LOCAL_INFILE_ERROR_CODES = {1148, 2068, 3948}
+_LOAD_WARNINGS_LIMIT = 10 # 导入出现警告时, 错误信息中最多列出的警告条数
+
+
+class LoadDataWarning(Exception):
+    """
+    LOAD DATA LOCAL 导入产生了警告（如重复键被跳过、值被截断），数据已回滚
+    """
+
+
+def _escape_text_column(column: pd.Series) -> pd.Series:
+    """
+    按 LOAD DATA 默认格式转义文本列: 反斜杠、制表符、换行符
+    空值保持不变，由 to_csv 的 na_rep 输出为 \\N
+    """
+    mask = column.notna()
+    text = column[mask].astype(str)
+    text = (text.str.replace('\\', '\\\\', regex=False)
+                .str.replace('\t', '\\t', regex=False)
+                .str.replace('\n', '\\n', regex=False)
+                .str.replace('\r', '\\r', regex=False))
+    result = column.astype(object).copy()
+    result[mask] = text
+    return result
+
+
+def dataframe_to_tsv(data: pd.DataFrame, fp):
+    """
+    将 DataFrame 写成 LOAD DATA INFILE 默认格式的 TSV（无表头，NULL 写为 \\N）
+
+    Args:
+        data: 待写入数据
+        fp: 已打开的文本文件对象
+    """
+    data = data.copy()
+    for name in data.columns:
+        if data[name].dtype == object or pd.api.types.is_string_dtype(data[name]):
+            data[name] = _escape_text_column(data[name])
+
+    data.to_csv(fp, sep='\t', header=False, index=False, na_rep='\\N',
+                quoting=csv.QUOTE_NONE, lineterminator='\n')
+
+
+class ToSqlWriter:
+    """
+    使用 DataFrame.to_sql 写库
+    """
+    name = "to_sql"
+    idempotent = False # 重复写入是否覆盖已有记录, 否则同步前需要先清理数据
+
+    def write(self, engine, table_name, data, chunksize, logger=None):
+        data.to_sql(table_name, engine, index=False, if_exists="append", chunksize=chunksize)
+
+
+def is_local_infile_error(error):
+    """
+    异常是否表示 LOAD DATA LOCAL 被禁用或不支持; sqlalchemy 包装的异常取其原始异常判断
+    """
+    if isinstance(error, LoadDataWarning):
+        return False
+    error = getattr(error, "orig", None) or error
+    args = getattr(error, "args", ())
+    if args and isinstance(args[0], int) and args[0] in _LOCAL_INFILE_ERROR_CODES:
+        return True
+    message = str(error).lower()
+    return "local_infile" in message or "loading local data is disabled" in message
+
+
+class LoadDataWriter:
+    """
+    使用 LOAD DATA LOCAL INFILE 写库，不支持 LOCAL 导入时回退到 fallback 写入方式
+    """
+    name = "load_data"
+    idempotent = False
+
+    def __init__(self, fallback=None):
+        self.fallback = fallback if fallback else ToSqlWriter()
+        # 服务端不支持 LOAD DATA LOCAL 时，后续直接走 fallback，避免每页都失败一次
+        self._disabled = False
+
+    def write(self, engine, table_name, data, chunksize, logger=None):
+        if self._disabled:
+            self.fallback.write(engine, table_name, data, chunksize, logger)
+            return
+
+        try:
+            self._load(engine, table_name, data)
+        except Exception as e:
+            if not is_local_infile_error(e):
+                raise
+            self._disabled = True
+            if logger:
+                logger.warning(f"LOAD DATA LOCAL INFILE 导入失败, 改用 {self.fallback.name}: {e}")
+            self.fallback.write(engine, table_name, data, chunksize, logger)
+
+    def _load(self, engine, table_name, data):
+        fd, tsv_file = tempfile.mkstemp(prefix=f"{table_name}_", suffix=".tsv")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                dataframe_to_tsv(data, f)
+
+            columns = ",".join(f"`{name}`" for name in data.columns)
+            load_sql = (f"LOAD DATA LOCAL INFILE '{tsv_file.replace(os.sep, '/')}' "
+                        f"INTO TABLE `{table_name}` CHARACTER SET utf8mb4 "
+                        f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({columns})")
+
+            conn = engine.raw_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(load_sql)
+                # LOCAL 导入隐含 IGNORE: 重复键、转换错误只产生警告, 不会报错
+                cursor.execute(f"SHOW WARNINGS LIMIT {_LOAD_WARNINGS_LIMIT}")
+                warnings = list(cursor.fetchall())
+                cursor.close()
+                if warnings:
+                    conn.rollback()
+                    raise LoadDataWarning(f"LOAD DATA LOCAL INFILE 导入 {table_name} 产生警告, 已回滚: "
+                                          + "; ".join(" ".join(str(v) for v in w) for w in warnings))
+                conn.commit()
+            finally:
+                conn.close()
+        finally:
+            os.remove(tsv_file)
+
+
+def build_upsert_sql(table_name, columns, rows_count):
+    """
+    构建 rows_count 行的 INSERT ... ON DUPLICATE KEY UPDATE 语句, 参数占位符为 %s
+    """
+    names = ",".join(f"`{name}`" for name in columns)
+    row = "(" + ",".join(["%s"] * len(columns)) + ")"
+    updates = ",".join(f"`{name}`=VALUES(`{name}`)" for name in columns)
+    return (f"INSERT INTO `{table_name}` ({names}) VALUES {','.join([row] * rows_count)} "
+            f"ON DUPLICATE KEY UPDATE {updates}")
+
+
+def dataframe_to_rows(data: pd.DataFrame):
+    """
+    将 DataFrame 转为数据库驱动可接受的行列表: numpy 标量转为 Python 标量, 空值转为 None
+    """
+    data = data.astype(object)
+    data = data.where(data.notna(), None)
+    return [tuple(row) for row in data.itertuples(index=False, name=None)]
+
+
+class UpsertWriter:
+    """
+    使用多行 INSERT ... ON DUPLICATE KEY UPDATE 写库，依赖表上的唯一键判断记录是否已存在
+    """
+    name = "upsert"
+    idempotent = True
+
+    def write(self, engine, table_name, data, chunksize, logger=None):
+        if len(data) == 0:
+            return
+        columns = list(data.columns)
+        rows = dataframe_to_rows(data)
+        batch_rows = max(1, min(int(chunksize or _UPSERT_BATCH_ROWS), _UPSERT_BATCH_ROWS))
+
+        conn = engine.raw_connection()
+        try:
+            cursor = conn.cursor()
+            for start in range(0, len(rows), batch_rows):
+                batch = rows[start:start + batch_rows]
+                params = [value for row in batch for value in row]
+                cursor.execute(build_upsert_sql(table_name, columns, len(batch)), params)
+            cursor.close()
+            conn.commit()
+        finally:
+            conn.close()
+
+
+WRITE_MODES = {
+    ToSqlWriter.name: ToSqlWriter,
+    LoadDataWriter.name: LoadDataWriter,
+    UpsertWriter.name: UpsertWriter,
+}
+
+
+def get_writer(write_mode):
+    """
+    根据写库模式名创建写库对象
+
+    Args:
+        write_mode: 写库模式名，见 WRITE_MODES
+    Returns:
+        写库对象，提供 write(engine, table_name, data, chunksize, logger) 方法
+    """
+    write_mode = (write_mode or ToSqlWriter.name).strip().lower()
+    if write_mode not in WRITE_MODES:
+        raise Exception(f"未知的写库模式: {write_mode}, 可选值: {list(WRITE_MODES.keys())}")
+    return WRITE_MODES[write_mode]()